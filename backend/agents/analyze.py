@@ -203,7 +203,9 @@ async def health_check():
             "status": "healthy",
             "agent_type": "CognitiveAnalysisAgent",
             "memory_status": "active",
-            "llm_status": "connected"
+            "llm_status": "connected",
+            "hedging": cognitive_agent.get_hedging_stats(),
+            "model_routing": cognitive_agent.get_routing_stats()
         }
     except Exception as e:
         return {
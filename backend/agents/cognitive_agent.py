@@ -8,8 +8,9 @@ from __future__ import annotations
 
 import os
 import json
+import hashlib
 import logging
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple
 from datetime import datetime
 
 from langchain_openai import ChatOpenAI
@@ -17,6 +18,11 @@ from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.pydantic_v1 import BaseModel, Field
 from langchain.memory import ConversationBufferMemory
 
+from taxonomy import normalize_analysis
+
+from .hedging import HedgingPolicy
+from .model_router import ModelTierRouter, extract_token_usage
+
 # -----------------------------------------------------------------------------
 # Logging konfigürasyonu
 # -----------------------------------------------------------------------------
@@ -70,29 +76,43 @@ SYSTEM_PROMPT = (
     "}\n"
 )
 
+# Prompt sürümü: SYSTEM_PROMPT değiştiğinde otomatik değişir, Analysis satırlarına kaydedilir
+PROMPT_VERSION = hashlib.sha256(SYSTEM_PROMPT.encode("utf-8")).hexdigest()[:12]
+
+# Yapısal çağrı başarısız olup serbest metin fallback prompt'uyla üretilen analizler; güncel
+# sürümden farklı olduğu için toplu yeniden analizde tekrar seçilir
+FALLBACK_PROMPT_VERSION = f"{PROMPT_VERSION}-fallback"
+
+# Analiz tamamen başarısız olduğunda dönen mesaj (toplu işlerde hatalı sonucu ayırt etmek için)
+ANALYSIS_ERROR_MESSAGE = "Analiz sırasında teknik bir hata oluştu, lütfen tekrar deneyin."
+
 # -----------------------------------------------------------------------------
 # Agent Sınıfı
 # -----------------------------------------------------------------------------
 class CognitiveAnalysisAgent:
     """Bilişsel çarpıtma analizi için LangChain tabanlı agent"""
 
-    def __init__(self) -> None:
-        model_name = os.getenv("OPENAI_MODEL", "gpt-4o-mini")  # Hız/maliyet/kalite dengesi
+    def __init__(self, model_name: Optional[str] = None) -> None:
+        # Güvene dayalı model katmanlama (OPENAI_MODEL_TIERING ile açılır, açık model verilirse devre dışı)
+        self.router = ModelTierRouter.from_env()
+        if model_name:
+            self.router.enabled = False
+
+        if self.router.enabled:
+            model_name = self.router.fast_model
+        else:
+            model_name = model_name or os.getenv("OPENAI_MODEL", "gpt-4o-mini")  # Hız/maliyet/kalite dengesi
+        self.base_model = model_name
+        # Analiz satırlarına yazılan model sürümü (katmanlamada fast>strong konfigürasyonu)
+        self.model_name = self.router.version if self.router.enabled else model_name
         api_key = os.getenv("OPENAI_API_KEY")
+        self._api_key = api_key
 
         if not api_key:
             logger.warning("OPENAI_API_KEY bulunamadı. Lütfen ortam değişkenini ayarlayın.")
 
         # JSON çıktısını zorlamak için OpenAI JSON mode kullanımı
-        self.llm = ChatOpenAI(
-            model=model_name,
-            api_key=api_key,
-            temperature=0.0,
-            max_tokens=1000,  # Daha kısa çıktı için azaltıldı
-            timeout=60,        # Timeout artırıldı
-            max_retries=3,     # Retry sayısı artırıldı
-            model_kwargs={"response_format": {"type": "json_object"}},
-        )
+        self.llm = self._build_json_llm(model_name)
 
         # Metin çıktısı için ayrı LLM (JSON formatı zorunluluğu olmadan)
         self.text_llm = ChatOpenAI(
@@ -107,6 +127,10 @@ class CognitiveAnalysisAgent:
         # Yapısal çıktı (Pydantic) — AnalysisResult şemasına map eder
         self.structured_llm = self.llm.with_structured_output(AnalysisResult)
 
+        # Model başına yapısal zincirler (ham yanıt token kullanımı için include_raw=True)
+        self._structured_chains: Dict[str, Any] = {}
+        self._tier_counts: Dict[str, int] = {"single": 0, "fast": 0, "strong": 0, "escalated": 0}
+
         # Prompt
         self.analysis_prompt = ChatPromptTemplate.from_messages([
             ("system", SYSTEM_PROMPT),
@@ -119,6 +143,9 @@ class CognitiveAnalysisAgent:
             return_messages=True,
         )
 
+        # Kuyruk gecikmesi için hedged request politikası (OPENAI_HEDGING_ENABLED ile açılır)
+        self.hedging = HedgingPolicy.from_env()
+
         # Basit analiz için konfigürasyon (gelecek genişletmeler için placeholder)
         self._setup_simple_analysis()
 
@@ -129,8 +156,7 @@ class CognitiveAnalysisAgent:
         """Günlük yazısını analiz eder ve yapılandırılmış sonuç döndürür."""
         try:
             # 1) Yapısal çıktı ile birincil deneme
-            chain = self.analysis_prompt | self.structured_llm
-            result: AnalysisResult = await chain.ainvoke({"text": text})
+            result, routing = await self._analyze_structured(text)
 
             # 2) Önerileri zenginleştir (boşsa veya azsa)
             recs = list(result.recommendations or [])
@@ -148,9 +174,12 @@ class CognitiveAnalysisAgent:
                     recs.insert(0, crisis_tip)
 
             # 4) Zaman damgası ve user_id ile zenginleştir
-            payload = result.dict()
+            payload = normalize_analysis(result.dict())
             payload["recommendations"] = recs
             payload["analysis_timestamp"] = datetime.now().isoformat()
+            payload["prompt_version"] = PROMPT_VERSION
+            payload["model"] = self.model_name
+            payload["routing"] = routing
             if user_id is not None:
                 payload["user_id"] = user_id
 
@@ -163,8 +192,18 @@ class CognitiveAnalysisAgent:
             logger.exception("Analiz hatası")
             # 5) Fallback: Serbest metin yanıtını JSON'a dönüştürmeye çalışma (ek güvenlik)
             try:
-                raw = await self._analyze_text_async(text)
+                raw = normalize_analysis(await self._analyze_text_async(text))
                 raw["analysis_timestamp"] = datetime.now().isoformat()
+                raw["prompt_version"] = FALLBACK_PROMPT_VERSION
+                raw["model"] = self.model_name
+                raw["routing"] = {
+                    "tier": "fallback",
+                    "escalated": False,
+                    "reasons": [f"structured_error:{type(e).__name__}"],
+                    "final_model": self.model_name,
+                    "attempts": [],
+                    "cost_usd": None,
+                }
                 if user_id is not None:
                     raw["user_id"] = user_id
                 return raw
@@ -175,7 +214,7 @@ class CognitiveAnalysisAgent:
             return {
                 "distortions": [],
                 "risk_level": "belirsiz",
-                "recommendations": ["Analiz sırasında teknik bir hata oluştu, lütfen tekrar deneyin."],
+                "recommendations": [ANALYSIS_ERROR_MESSAGE],
                 "analysis_timestamp": datetime.now().isoformat(),
                 **({"user_id": user_id} if user_id is not None else {}),
             }
@@ -188,6 +227,19 @@ class CognitiveAnalysisAgent:
         """Memory'yi temizler."""
         self.memory.clear()
 
+    def get_hedging_stats(self) -> Dict[str, Any]:
+        """Hedged request istatistiklerini döndürür."""
+        return self.hedging.get_stats()
+
+    def get_routing_stats(self) -> Dict[str, Any]:
+        """Model katmanlama istatistiklerini döndürür."""
+        return {
+            "enabled": self.router.enabled,
+            "fast_model": self.router.fast_model if self.router.enabled else self.base_model,
+            "strong_model": self.router.strong_model if self.router.enabled else None,
+            "counts": dict(self._tier_counts),
+        }
+
     # ------------------------------------------------------------------
     # İç Yardımcılar
     # ------------------------------------------------------------------
@@ -195,6 +247,82 @@ class CognitiveAnalysisAgent:
         """Basit analiz için gerekli ayarlar (gelecek kullanım için placeholder)."""
         return
 
+    def _build_json_llm(self, model_name: str) -> ChatOpenAI:
+        """JSON mode zorunlu analiz LLM'i oluşturur."""
+        return ChatOpenAI(
+            model=model_name,
+            api_key=self._api_key,
+            temperature=0.0,
+            max_tokens=1000,  # Daha kısa çıktı için azaltıldı
+            timeout=60,        # Timeout artırıldı
+            max_retries=3,     # Retry sayısı artırıldı
+            model_kwargs={"response_format": {"type": "json_object"}},
+        )
+
+    def _get_structured_chain(self, model_name: str):
+        """Model için (önbellekli) yapısal analiz zinciri döndürür."""
+        chain = self._structured_chains.get(model_name)
+        if chain is None:
+            llm = self.llm if model_name == self.base_model else self._build_json_llm(model_name)
+            chain = self.analysis_prompt | llm.with_structured_output(AnalysisResult, include_raw=True)
+            self._structured_chains[model_name] = chain
+        return chain
+
+    async def _invoke_structured(self, model_name: str, text: str) -> Tuple[AnalysisResult, Dict[str, int]]:
+        """Tek model ile yapısal analiz yapar; sonucu ve token kullanımını döndürür."""
+        chain = self._get_structured_chain(model_name)
+        output = await self.hedging.run(lambda: chain.ainvoke({"text": text}))
+        if output.get("parsed") is None:
+            raise ValueError(f"Yapısal çıktı ayrıştırılamadı: {output.get('parsing_error')}")
+        return output["parsed"], extract_token_usage(output.get("raw"))
+
+    async def _analyze_structured(self, text: str) -> Tuple[AnalysisResult, Dict[str, Any]]:
+        """Yapısal analizi (katmanlama açıksa fast -> strong yükseltmesiyle) yapar.
+
+        Katman kararı, gerekçeler ve tahmini maliyet ``routing`` kaydı olarak döner.
+        """
+        router = self.router
+        if router.enabled:
+            tier, reasons = router.initial_tier(text)
+            model_name = router.model_for(tier)
+        else:
+            tier, reasons, model_name = "single", [], self.base_model
+
+        result, usage = await self._invoke_structured(model_name, text)
+        attempts = [{"model": model_name, **usage, "cost_usd": router.estimate_cost(model_name, usage)}]
+        escalated = False
+
+        if tier == ModelTierRouter.FAST:
+            escalation = router.escalation_reasons(result)
+            if escalation:
+                reasons.extend(escalation)
+                try:
+                    result, usage = await self._invoke_structured(router.strong_model, text)
+                    attempts.append({
+                        "model": router.strong_model,
+                        **usage,
+                        "cost_usd": router.estimate_cost(router.strong_model, usage),
+                    })
+                    tier, escalated = ModelTierRouter.STRONG, True
+                except Exception as e:
+                    # Güçlü model başarısızsa hızlı model sonucu ile devam et
+                    logger.warning(f"Model yükseltme hatası, hızlı model sonucu kullanılıyor: {e}")
+
+        self._tier_counts[tier] = self._tier_counts.get(tier, 0) + 1
+        if escalated:
+            self._tier_counts["escalated"] += 1
+
+        costs = [a["cost_usd"] for a in attempts if a["cost_usd"] is not None]
+        routing = {
+            "tier": tier,
+            "escalated": escalated,
+            "reasons": reasons,
+            "final_model": attempts[-1]["model"] if escalated else model_name,
+            "attempts": attempts,
+            "cost_usd": round(sum(costs), 6) if costs else None,
+        }
+        return result, routing
+
     async def _analyze_text_async(self, text: str) -> Dict[str, Any]:
         """Yapısal çağrı başarısız olursa: JSON modda tek atış fallback."""
         prompt = (
@@ -220,7 +348,7 @@ class CognitiveAnalysisAgent:
             "}"
         )
 
-        response = await self.llm.ainvoke(prompt)
+        response = await self.hedging.run(lambda: self.llm.ainvoke(prompt))
 
         # JSON parse
         try:
@@ -0,0 +1,167 @@
+"""
+Hedged Requests - LLM çağrılarında kuyruk gecikmesini (p99) azaltmak için hedging politikası
+İlk istek belirlenen yüzdelik gecikme içinde yanıt vermezse aynı istek ikinci kez gönderilir;
+ilk biten kazanır, diğeri iptal edilir. Hedge sayısı trafiğin belirli bir yüzdesiyle sınırlıdır.
+"""
+
+from __future__ import annotations
+
+import os
+import time
+import asyncio
+import logging
+import threading
+from collections import deque
+from typing import Any, Awaitable, Callable, Dict, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+def _env_flag(name: str, default: bool = False) -> bool:
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+class HedgingPolicy:
+    """Opt-in hedged request politikası.
+
+    Gecikme eşiği, son başarılı çağrıların süre penceresinden ``percentile``
+    yüzdeliği olarak hesaplanır. Yeterli örnek yoksa ``initial_delay`` kullanılır.
+    Hedge bütçesi: toplam isteklerin en fazla ``budget_percent`` kadarı hedge edilir.
+    """
+
+    def __init__(
+        self,
+        enabled: bool = False,
+        percentile: float = 95.0,
+        budget_percent: float = 5.0,
+        initial_delay: float = 3.0,
+        min_delay: float = 0.25,
+        window_size: int = 500,
+        min_samples: int = 20,
+    ) -> None:
+        if not 0 < percentile < 100:
+            raise ValueError("percentile 0-100 arasında olmalı")
+        if budget_percent < 0:
+            raise ValueError("budget_percent negatif olamaz")
+
+        self.enabled = enabled
+        self.percentile = percentile
+        self.budget_percent = budget_percent
+        self.initial_delay = initial_delay
+        self.min_delay = min_delay
+        self.min_samples = min_samples
+
+        self._latencies: deque = deque(maxlen=window_size)
+        self._lock = threading.Lock()
+        self._requests = 0
+        self._hedges = 0
+        self._hedge_wins = 0
+        self._budget_denied = 0
+
+    @classmethod
+    def from_env(cls) -> "HedgingPolicy":
+        """Ortam değişkenlerinden politika oluşturur (varsayılan: kapalı)."""
+        return cls(
+            enabled=_env_flag("OPENAI_HEDGING_ENABLED"),
+            percentile=float(os.getenv("OPENAI_HEDGE_PERCENTILE", "95")),
+            budget_percent=float(os.getenv("OPENAI_HEDGE_BUDGET_PERCENT", "5")),
+            initial_delay=float(os.getenv("OPENAI_HEDGE_INITIAL_DELAY", "3.0")),
+            min_delay=float(os.getenv("OPENAI_HEDGE_MIN_DELAY", "0.25")),
+            window_size=int(os.getenv("OPENAI_HEDGE_WINDOW", "500")),
+            min_samples=int(os.getenv("OPENAI_HEDGE_MIN_SAMPLES", "20")),
+        )
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+    async def run(self, call_factory: Callable[[], Awaitable[T]]) -> T:
+        """``call_factory`` ile üretilen çağrıyı hedging politikasıyla çalıştırır.
+
+        ``call_factory`` her çağrıldığında yeni ve bağımsız bir awaitable döndürmelidir.
+        """
+        if not self.enabled:
+            return await call_factory()
+
+        with self._lock:
+            self._requests += 1
+
+        start = time.monotonic()
+        primary = asyncio.ensure_future(call_factory())
+        tasks = {primary}
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=self.current_delay())
+            if done or not self._try_acquire_hedge():
+                result = await primary
+                self._record_latency(time.monotonic() - start)
+                return result
+
+            hedge = asyncio.ensure_future(call_factory())
+            tasks.add(hedge)
+            pending = set(tasks)
+            last_error: Optional[BaseException] = None
+
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is hedge:
+                            with self._lock:
+                                self._hedge_wins += 1
+                        self._record_latency(time.monotonic() - start)
+                        return task.result()
+                    last_error = task.exception()
+
+            # İki çağrı da hata verdi
+            raise last_error  # type: ignore[misc]
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+    def current_delay(self) -> float:
+        """Hedge tetikleme gecikmesini (saniye) döndürür."""
+        with self._lock:
+            samples = sorted(self._latencies)
+        if len(samples) < self.min_samples:
+            return max(self.initial_delay, self.min_delay)
+        index = min(len(samples) - 1, int(round(self.percentile / 100.0 * (len(samples) - 1))))
+        return max(samples[index], self.min_delay)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Hedging istatistiklerini döndürür."""
+        with self._lock:
+            requests = self._requests
+            hedges = self._hedges
+            stats = {
+                "enabled": self.enabled,
+                "requests": requests,
+                "hedges": hedges,
+                "hedge_wins": self._hedge_wins,
+                "budget_denied": self._budget_denied,
+                "hedge_rate_percent": round(hedges / requests * 100, 2) if requests else 0.0,
+                "budget_percent": self.budget_percent,
+                "percentile": self.percentile,
+            }
+        stats["current_delay_seconds"] = round(self.current_delay(), 3)
+        return stats
+
+    # ------------------------------------------------------------------
+    # İç Yardımcılar
+    # ------------------------------------------------------------------
+    def _try_acquire_hedge(self) -> bool:
+        with self._lock:
+            allowed = (self._hedges + 1) <= self._requests * self.budget_percent / 100.0
+            if allowed:
+                self._hedges += 1
+            else:
+                self._budget_denied += 1
+            return allowed
+
+    def _record_latency(self, seconds: float) -> None:
+        with self._lock:
+            self._latencies.append(seconds)
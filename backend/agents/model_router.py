@@ -0,0 +1,129 @@
+"""
+Model Tiering Router - Güvene dayalı model katmanlama
+Girişler önce ucuz/hızlı modele gönderilir; dönen çarpıtma güven skorları düşükse,
+risk seviyesi belirsizse veya metin uzunsa güçlü modele yükseltilir.
+Katman kararı ve tahmini maliyet her analize kaydedilir.
+"""
+
+import os
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# USD / 1M token (girdi, çıktı) - OPENAI_PRICING ile ezilebilir (örn: "gpt-4o=2.5:10,gpt-4o-mini=0.15:0.6")
+MODEL_PRICING: Dict[str, Tuple[float, float]] = {
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4o": (2.50, 10.00),
+    "gpt-4.1-nano": (0.10, 0.40),
+    "gpt-4.1-mini": (0.40, 1.60),
+    "gpt-4.1": (2.00, 8.00),
+    "gpt-4": (30.00, 60.00),
+}
+
+# Şemadaki geçerli risk seviyeleri; bunların dışındaki değerler belirsiz kabul edilir
+KNOWN_RISK_LEVELS = {"düşük", "orta", "yüksek"}
+
+
+def _load_pricing() -> Dict[str, Tuple[float, float]]:
+    pricing = dict(MODEL_PRICING)
+    override = os.getenv("OPENAI_PRICING", "")
+    for item in filter(None, (part.strip() for part in override.split(","))):
+        try:
+            model, prices = item.split("=", 1)
+            prompt_price, completion_price = prices.split(":", 1)
+            pricing[model.strip()] = (float(prompt_price), float(completion_price))
+        except ValueError:
+            logger.warning(f"Geçersiz OPENAI_PRICING girdisi yok sayıldı: {item}")
+    return pricing
+
+
+def extract_token_usage(message: Any) -> Dict[str, int]:
+    """LangChain AIMessage'dan token kullanımını çıkarır."""
+    usage = getattr(message, "usage_metadata", None) or {}
+    if usage:
+        return {
+            "prompt_tokens": int(usage.get("input_tokens", 0)),
+            "completion_tokens": int(usage.get("output_tokens", 0)),
+        }
+    token_usage = (getattr(message, "response_metadata", None) or {}).get("token_usage") or {}
+    return {
+        "prompt_tokens": int(token_usage.get("prompt_tokens", 0)),
+        "completion_tokens": int(token_usage.get("completion_tokens", 0)),
+    }
+
+
+class ModelTierRouter:
+    """Hızlı/güçlü model arasında katman kararı veren router"""
+
+    FAST = "fast"
+    STRONG = "strong"
+
+    def __init__(
+        self,
+        enabled: bool = False,
+        fast_model: str = "gpt-4o-mini",
+        strong_model: str = "gpt-4o",
+        min_confidence: float = 0.6,
+        max_fast_chars: int = 1500,
+    ) -> None:
+        self.enabled = enabled
+        self.fast_model = fast_model
+        self.strong_model = strong_model
+        self.min_confidence = min_confidence
+        self.max_fast_chars = max_fast_chars
+        self.pricing = _load_pricing()
+
+    @classmethod
+    def from_env(cls) -> "ModelTierRouter":
+        """Ortam değişkenlerinden router oluşturur (varsayılan: kapalı)."""
+        return cls(
+            enabled=os.getenv("OPENAI_MODEL_TIERING", "0").strip().lower() in ("1", "true", "yes", "on"),
+            fast_model=os.getenv("OPENAI_FAST_MODEL", "gpt-4o-mini"),
+            strong_model=os.getenv("OPENAI_STRONG_MODEL", "gpt-4o"),
+            min_confidence=float(os.getenv("TIER_MIN_CONFIDENCE", "0.6")),
+            max_fast_chars=int(os.getenv("TIER_MAX_FAST_CHARS", "1500")),
+        )
+
+    @property
+    def version(self) -> str:
+        """Analiz satırlarına model sürümü olarak yazılan katman konfigürasyonu."""
+        return f"tiered:{self.fast_model}>{self.strong_model}"
+
+    def initial_tier(self, text: str) -> Tuple[str, List[str]]:
+        """İlk denenecek katmanı seçer. Uzun metinler doğrudan güçlü modele gider."""
+        if len(text) > self.max_fast_chars:
+            return self.STRONG, [f"uzun_metin>{self.max_fast_chars}"]
+        return self.FAST, []
+
+    def escalation_reasons(self, result: Any) -> List[str]:
+        """Hızlı model sonucunun güçlü modele yükseltilmesi için gerekçeleri döndürür."""
+        reasons: List[str] = []
+
+        risk_level = (getattr(result, "risk_level", "") or "").strip().lower()
+        if risk_level not in KNOWN_RISK_LEVELS:
+            reasons.append(f"belirsiz_risk:{risk_level or 'boş'}")
+
+        confidences = [
+            d.confidence for d in (getattr(result, "distortions", None) or [])
+            if d.confidence is not None
+        ]
+        if confidences and min(confidences) < self.min_confidence:
+            reasons.append(f"düşük_güven:{min(confidences):.2f}<{self.min_confidence}")
+
+        return reasons
+
+    def model_for(self, tier: str) -> str:
+        return self.strong_model if tier == self.STRONG else self.fast_model
+
+    def estimate_cost(self, model: str, usage: Dict[str, int]) -> Optional[float]:
+        """Token kullanımından USD maliyet tahmini (bilinmeyen modelde None)."""
+        prices = self.pricing.get(model)
+        if prices is None:
+            return None
+        prompt_price, completion_price = prices
+        cost = (
+            usage.get("prompt_tokens", 0) * prompt_price
+            + usage.get("completion_tokens", 0) * completion_price
+        ) / 1_000_000
+        return round(cost, 6)
@@ -5,8 +5,9 @@ Bu agent, kullanıcının bilişsel çarpıtma türüne göre özel BDT teknikle
 
 import os
 import json
+import asyncio
 import logging
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple
 from datetime import datetime
 
 from langchain_openai import ChatOpenAI
@@ -14,7 +15,8 @@ from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.pydantic_v1 import BaseModel, Field
 
 # ChromaDB entegrasyonu
-from services.chroma_service import get_chroma_service
+from services.chroma_service import get_chroma_service, is_loading as chroma_is_loading, is_ready as chroma_is_ready, start_warmup
+from taxonomy import normalize_distortion
 
 # -----------------------------------------------------------------------------
 # Logging konfigürasyonu
@@ -318,25 +320,33 @@ class RAGResponse(BaseModel):
     personalized_advice: str = Field(description="Kişiselleştirilmiş tavsiye")
     next_steps: List[str] = Field(description="Sonraki adımlar")
 
+class DistortionAdvice(BaseModel):
+    """Tek çarpıtma türü için kişiselleştirilmiş tavsiye"""
+    distortion_type: str = Field(description="Çarpıtma türü (verilen anahtar aynen)")
+    advice: str = Field(description="Kişiselleştirilmiş tavsiye (2-3 cümle)")
+
+class MultiAdviceResponse(BaseModel):
+    """Çoklu çarpıtma kişiselleştirme yanıtı"""
+    advices: List[DistortionAdvice] = Field(description="Her çarpıtma türü için bir tavsiye")
+
 # -----------------------------------------------------------------------------
 # RAG Agent Sınıfı
 # -----------------------------------------------------------------------------
 class RAGAgent:
     """Kişiselleştirilmiş terapi teknikleri için RAG agent"""
 
-    def __init__(self) -> None:
+    def __init__(self, blocking_chroma_load: bool = True) -> None:
+        """``blocking_chroma_load=False`` (API): ChromaDB hazır değilse istek beklemez, arka plan
+        ısınması başlatılır ve fallback moda düşülür. Scriptlerde (varsayılan) servis ilk
+        ihtiyaçta senkron yüklenir.
+        """
         model_name = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
         api_key = os.getenv("OPENAI_API_KEY")
 
-        # ChromaDB servisi
-        try:
-            self.chroma_service = get_chroma_service()
-            self.use_chroma = True
-            logger.info("ChromaDB servisi başarıyla başlatıldı")
-        except Exception as e:
-            logger.warning(f"ChromaDB başlatılamadı: {e}. Fallback moda geçiliyor.")
-            self.chroma_service = None
-            self.use_chroma = False
+        # ChromaDB servisi ilk ihtiyaç anında (veya açılıştaki arka plan ısınmasıyla) yüklenir
+        self._chroma_service = None
+        self._chroma_failed = False
+        self.blocking_chroma_load = blocking_chroma_load
 
         if not api_key:
             logger.warning("OPENAI_API_KEY bulunamadı. RAG sistemi API key olmadan çalışacak.")
@@ -358,6 +368,36 @@ class RAGAgent:
                 self.llm = None
                 self.structured_llm = None
 
+    @property
+    def chroma_service(self):
+        """ChromaService (hazır değilse None).
+
+        Arka planda yükleniyorsa istek bloklanmaz, fallback moda düşülür. API'de
+        (``blocking_chroma_load=False``) ısınma kapalı ya da hiç başlatılmamışsa burada arka
+        planda başlatılır; model yüklemesi event loop'u bloklamaz. Yalnızca scriptlerde servis
+        burada senkron olarak yüklenir.
+        """
+        if self._chroma_service is None and not self._chroma_failed:
+            if chroma_is_ready():
+                self._chroma_service = get_chroma_service()
+                return self._chroma_service
+            if not self.blocking_chroma_load:
+                start_warmup()
+                return None
+            if chroma_is_loading():
+                return None
+            try:
+                self._chroma_service = get_chroma_service()
+                logger.info("ChromaDB servisi başarıyla başlatıldı")
+            except Exception as e:
+                logger.warning(f"ChromaDB başlatılamadı: {e}. Fallback moda geçiliyor.")
+                self._chroma_failed = True
+        return self._chroma_service
+
+    @property
+    def use_chroma(self) -> bool:
+        return self.chroma_service is not None
+
     async def get_therapy_techniques(self, distortion_type: str, user_context: Optional[str] = None, user_id: Optional[str] = None) -> Dict[str, Any]:
         """Belirli bir çarpıtma türü için terapi teknikleri önerir (ChromaDB + Statik)"""
         try:
@@ -431,12 +471,66 @@ class RAGAgent:
             return self._get_fallback_response(distortion_type)
 
     async def get_multiple_techniques(self, distortion_types: List[str], user_context: Optional[str] = None, user_id: Optional[str] = None) -> Dict[str, Any]:
-        """Birden fazla çarpıtma türü için teknikler önerir"""
+        """Birden fazla çarpıtma türü için teknikler önerir.
+
+        Tüm türler için tek vektör sorgusu, tek geçmiş/kalıp okuması ve tek LLM
+        kişiselleştirme çağrısı yapılır; maliyet tür sayısıyla büyümez.
+        """
         try:
+            normalized_types = [self._normalize_distortion_type(t) for t in distortion_types]
+            known_types = list(dict.fromkeys(t for t in normalized_types if t in BDT_TECHNIQUES))
+
+            # 1. Tek ChromaDB sorgusu ($in filtresi), sonuçlar türe göre bölünmüş
+            chroma_by_type: Dict[str, List[Dict]] = {}
+            if self.use_chroma and user_context and known_types:
+                try:
+                    chroma_by_type = await self.chroma_service.find_relevant_techniques_multi(
+                        query_text=user_context,
+                        distortion_types=known_types,
+                        n_per_type=3
+                    )
+                except Exception as e:
+                    logger.warning(f"ChromaDB çoklu arama hatası: {e}")
+
+            # 2. Statik tekniklerle birleştir
+            combined_by_type = {
+                t: self._combine_techniques(chroma_by_type.get(t, []), BDT_TECHNIQUES[t]["techniques"])
+                for t in known_types
+            }
+
+            # 3. Geçmiş ve kalıplar tüm türler için bir kez (eşzamanlı) okunur
+            similar_count = 0
+            user_patterns: Dict[str, Any] = {}
+            if user_context and user_id and self.use_chroma:
+                try:
+                    similar_count, user_patterns = await self._fetch_history(user_id, user_context)
+                except Exception as e:
+                    logger.warning(f"Geçmiş verileri alınamadı: {e}")
+
+            # 4. Tek LLM çağrısıyla tüm türler için tavsiye
+            advice_by_type: Dict[str, str] = {}
+            if user_context and known_types:
+                advice_by_type = await self._generate_multi_personalized_advice(
+                    user_context=user_context,
+                    distortion_types=known_types,
+                    similar_count=similar_count,
+                    user_patterns=user_patterns
+                )
+
             all_techniques = []
-            for distortion_type in distortion_types:
-                techniques = await self.get_therapy_techniques(distortion_type, user_context, user_id)
-                all_techniques.append(techniques)
+            for original, normalized_type in zip(distortion_types, normalized_types):
+                if normalized_type not in BDT_TECHNIQUES:
+                    all_techniques.append(self._get_fallback_response(original))
+                    continue
+                all_techniques.append(self._build_technique_response(
+                    distortion_type=normalized_type,
+                    techniques=combined_by_type[normalized_type],
+                    advice=advice_by_type.get(normalized_type),
+                    chroma_count=len(chroma_by_type.get(normalized_type, [])),
+                    similar_count=similar_count,
+                    user_patterns=user_patterns,
+                    with_history=bool(user_context and user_id)
+                ))
 
             return {
                 "multiple_distortions": True,
@@ -450,41 +544,95 @@ class RAGAgent:
             logger.exception("Çoklu RAG teknikleri alma hatası")
             return {"error": "Teknikler alınırken hata oluştu"}
 
-    def _normalize_distortion_type(self, distortion_type: str) -> str:
-        """Çarpıtma türünü normalize eder"""
-        type_lower = distortion_type.lower().strip()
-        
-        # Türkçe eşleştirmeler
-        mappings = {
-            "felaketleştirme": "felaketleştirme",
-            "felaketlestirme": "felaketleştirme",
-            "zihin okuma": "zihin okuma",
-            "zihin_okuma": "zihin okuma",  # Alt çizgi formatı
-            "genelleme": "genelleme",
-            "kişiselleştirme": "kişiselleştirme",
-            "kisisellestirme": "kişiselleştirme",
-            "kisisellestirme": "kişiselleştirme",  # Alt çizgi formatı
-            "etiketleme": "etiketleme",
-            "ya hep ya hiç": "ya hep ya hiç",
-            "ya hep ya hic": "ya hep ya hiç",
-            "ya_hep_ya_hic": "ya hep ya hiç",  # Alt çizgi formatı
-            "büyütme": "büyütme/küçültme",
-            "buyutme": "büyütme/küçültme",
-            "buyutme_kucultme": "büyütme/küçültme",  # Alt çizgi formatı
-            "küçültme": "büyütme/küçültme",
-            "kucultme": "büyütme/küçültme",
-            "kehanetçilik": "kehanetçilik",
-            "kehanetcilik": "kehanetçilik",
-            "keyfi çıkarsama": "keyfi çıkarsama",
-            "keyfi_cikarsama": "keyfi çıkarsama",  # Alt çizgi formatı
-            "meli malı": "meli/malı düşünceleri",
-            "meli/malı": "meli/malı düşünceleri",
-            "meli-malı": "meli/malı düşünceleri",
-            "meli_mali": "meli/malı düşünceleri"  # Alt çizgi formatı
+    def _build_technique_response(
+        self,
+        distortion_type: str,
+        techniques: List[Dict],
+        advice: Optional[str],
+        chroma_count: int,
+        similar_count: int,
+        user_patterns: Dict,
+        with_history: bool
+    ) -> Dict[str, Any]:
+        """Çoklu akışta tek tür için get_therapy_techniques ile aynı biçimde yanıt üretir"""
+        base_info = BDT_TECHNIQUES[distortion_type]
+        response = {
+            "distortion_type": distortion_type,
+            "distortion_name": base_info["name"],
+            "distortion_description": base_info["description"],
+            "techniques": techniques,
+            "personalized_advice": advice or f"{base_info['name']} çarpıtması için ChromaDB'den geliştirilmiş teknikler hazırladık.",
+            "generated_at": datetime.now().isoformat()
         }
-        
-        normalized = mappings.get(type_lower, type_lower)
-        return normalized
+        if with_history:
+            response.update({
+                "similar_experiences_count": similar_count,
+                "user_patterns": user_patterns.get('most_common_distortions', [])[:3] if user_patterns else [],
+                "next_steps": self._generate_personalized_next_steps(user_patterns, techniques),
+                "source": "personalized_chromadb",
+            })
+        else:
+            response.update({
+                "next_steps": [
+                    "Önerilen tekniklerden birini seçin ve bugün uygulayın",
+                    "Haftada en az 3 kez bu teknikleri tekrarlayın",
+                    "İlerlemenizi günlüğünüzde takip edin",
+                    "Zorlandığınızda bir uzmandan destek almayı düşünün"
+                ],
+                "source": "hybrid" if chroma_count else "static",
+                "chroma_results": chroma_count,
+            })
+        return response
+
+    async def _generate_multi_personalized_advice(
+        self,
+        user_context: str,
+        distortion_types: List[str],
+        similar_count: int,
+        user_patterns: Dict
+    ) -> Dict[str, str]:
+        """Tüm çarpıtma türleri için tavsiyeleri tek structured LLM çağrısıyla üretir"""
+        try:
+            if not self.llm:
+                return {}
+
+            context_parts = [f"Mevcut durum: {user_context}"]
+            if similar_count:
+                context_parts.append(f"Benzer geçmiş deneyimler: {similar_count} adet")
+            if user_patterns and user_patterns.get('most_common_distortions'):
+                common = user_patterns['most_common_distortions'][:3]
+                context_parts.append(f"En sık karşılaştığınız çarpıtmalar: {', '.join([c[0] for c in common])}")
+
+            type_lines = "\n".join(
+                f"- {t}: {BDT_TECHNIQUES[t]['name']}" for t in distortion_types
+            )
+            prompt = f"""
+            Kullanıcı profili: {' | '.join(context_parts)}
+            Çarpıtma türleri (anahtar: ad):
+            {type_lines}
+            
+            Her çarpıtma türü için ayrı, kişiselleştirilmiş, destekleyici ve cesaret verici bir tavsiye yazın.
+            - distortion_type alanına yukarıdaki anahtarı aynen yazın
+            - Kullanıcının durumuna özel olarak konuşun
+            - Pratik ve uygulanabilir olsun
+            - Her tavsiyeyi 2-3 cümle ile sınırlayın
+            - Türkçe yazın ve "sen" hitabı kullanın
+            """
+
+            structured_llm = self.llm.with_structured_output(MultiAdviceResponse)
+            response = await structured_llm.ainvoke(prompt)
+            return {
+                self._normalize_distortion_type(item.distortion_type): item.advice.strip()
+                for item in response.advices
+            }
+
+        except Exception as e:
+            logger.error(f"Çoklu kişiselleştirilmiş tavsiye oluşturma hatası: {e}")
+            return {}
+
+    def _normalize_distortion_type(self, distortion_type: str) -> str:
+        """Çarpıtma türünü kanonik taksonomi anahtarına normalize eder"""
+        return normalize_distortion(distortion_type)
 
     async def _personalize_techniques(self, base_techniques: Dict, user_context: str, distortion_type: str) -> Dict[str, Any]:
         """Kullanıcı bağlamına göre teknikleri kişiselleştirir"""
@@ -691,6 +839,22 @@ class RAGAgent:
                 "difficulty": "kolay"
             }
     
+    async def _fetch_history(self, user_id: str, user_context: str) -> Tuple[int, Dict[str, Any]]:
+        """Benzer geçmiş giriş sayısı ve kullanıcı kalıpları (iki okuma eşzamanlı; gecikme toplam değil en uzunu).
+
+        Prompt'ta yalnızca sayı kullanıldığından benzerlik sorgusu doküman/metadata taşımayan
+        sayım yolundan gider.
+        """
+        similar_count, user_patterns = await asyncio.gather(
+            self.chroma_service.count_similar_entries(
+                user_id=user_id,
+                query_text=user_context,
+                n_results=3
+            ),
+            self.chroma_service.get_user_patterns(user_id),
+        )
+        return similar_count, user_patterns
+    
     async def _personalize_with_history(
         self, 
         techniques: List[Dict], 
@@ -700,27 +864,18 @@ class RAGAgent:
     ) -> Dict[str, Any]:
         """Kullanıcının geçmiş verileriyle kişiselleştirme yapar"""
         try:
-            # Kullanıcının geçmiş benzer deneyimlerini bul
-            similar_entries = []
+            # Geçmiş benzer deneyim sayısı ve kullanıcı kalıpları birbirinden bağımsızdır, eşzamanlı okunur
+            similar_count = 0
             user_patterns = {}
             
             if self.use_chroma:
-                # Benzer geçmiş girişler
-                similar_entries = await self.chroma_service.find_similar_entries(
-                    user_id=user_id,
-                    query_text=user_context,
-                    distortion_type=distortion_type,
-                    n_results=3
-                )
-                
-                # Kullanıcı kalıpları
-                user_patterns = await self.chroma_service.get_user_patterns(user_id)
+                similar_count, user_patterns = await self._fetch_history(user_id, user_context)
             
             # Kişiselleştirilmiş tavsiye oluştur
             personalized_advice = await self._generate_personalized_advice(
                 user_context=user_context,
                 distortion_type=distortion_type,
-                similar_entries=similar_entries,
+                similar_count=similar_count,
                 user_patterns=user_patterns,
                 techniques=techniques
             )
@@ -733,7 +888,7 @@ class RAGAgent:
                 "distortion_description": base_info.get("description", ""),
                 "techniques": techniques,
                 "personalized_advice": personalized_advice,
-                "similar_experiences_count": len(similar_entries),
+                "similar_experiences_count": similar_count,
                 "user_patterns": user_patterns.get('most_common_distortions', [])[:3] if user_patterns else [],
                 "next_steps": self._generate_personalized_next_steps(user_patterns, techniques),
                 "source": "personalized_chromadb",
@@ -753,7 +908,7 @@ class RAGAgent:
         self,
         user_context: str,
         distortion_type: str,
-        similar_entries: List[Dict],
+        similar_count: int,
         user_patterns: Dict,
         techniques: List[Dict]
     ) -> str:
@@ -765,8 +920,8 @@ class RAGAgent:
             # Kontext hazırla
             context_parts = [f"Mevcut durum: {user_context}"]
             
-            if similar_entries:
-                context_parts.append(f"Benzer geçmiş deneyimler: {len(similar_entries)} adet")
+            if similar_count:
+                context_parts.append(f"Benzer geçmiş deneyimler: {similar_count} adet")
             
             if user_patterns and user_patterns.get('most_common_distortions'):
                 common = user_patterns['most_common_distortions'][:3]
@@ -830,17 +985,25 @@ class RAGAgent:
     # ChromaDB Data Management
     # -----------------------------------------------------------------------------
     
-    async def add_user_entry_to_chroma(self, entry_id: str, user_id: str, text: str, analysis_result: Dict[str, Any]) -> bool:
-        """Kullanıcı girişini ChromaDB'ye ekler"""
+    async def add_user_entry_to_chroma(
+        self,
+        entry_id: str,
+        user_id: str,
+        text: str,
+        analysis_result: Dict[str, Any],
+        analysis_id: Optional[str] = None
+    ) -> bool:
+        """Kullanıcı girişini (ve analysis_id verilirse analiz sonucunu) tek embedding ile ChromaDB'ye ekler"""
         try:
             if not self.use_chroma:
                 return False
                 
-            return await self.chroma_service.add_user_entry(
+            return await self.chroma_service.index_entry(
                 entry_id=str(entry_id),
                 user_id=str(user_id),
                 text=text,
-                analysis_result=analysis_result
+                analysis_result=analysis_result,
+                analysis_id=str(analysis_id) if analysis_id is not None else None
             )
             
         except Exception as e:
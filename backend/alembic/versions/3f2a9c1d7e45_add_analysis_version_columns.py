@@ -0,0 +1,36 @@
+"""Add prompt/model version columns to analyses
+
+Revision ID: 3f2a9c1d7e45
+Revises: 06e08cec7061
+Create Date: 2025-08-28 10:12:03.417211
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f2a9c1d7e45'
+down_revision: Union[str, Sequence[str], None] = '06e08cec7061'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('analyses', sa.Column('prompt_version', sa.String(), nullable=True))
+    op.add_column('analyses', sa.Column('model_version', sa.String(), nullable=True))
+    op.add_column('analyses', sa.Column('analyzed_at', sa.DateTime(), nullable=True))
+    op.create_index(op.f('ix_analyses_prompt_version'), 'analyses', ['prompt_version'], unique=False)
+    op.create_index(op.f('ix_analyses_model_version'), 'analyses', ['model_version'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_analyses_model_version'), table_name='analyses')
+    op.drop_index(op.f('ix_analyses_prompt_version'), table_name='analyses')
+    op.drop_column('analyses', 'analyzed_at')
+    op.drop_column('analyses', 'model_version')
+    op.drop_column('analyses', 'prompt_version')
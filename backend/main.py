@@ -1,4 +1,5 @@
 from fastapi import FastAPI, HTTPException, Depends, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
 from sqlalchemy.orm import Session
 from datetime import timedelta
@@ -13,6 +14,7 @@ from models import Base, User, Entry, Analysis
 from schemas import UserCreate, UserLogin, UserResponse, Token, EntryCreate, EntryUpdate, EntryResponse
 from auth import get_password_hash, verify_password, create_access_token, get_current_user, ACCESS_TOKEN_EXPIRE_MINUTES
 from agents.analyze import router as analyze_router
+from taxonomy import normalize_analysis
 from typing import List
 
 # Load environment variables
@@ -82,6 +84,24 @@ def login(user_credentials: UserLogin, db: Session = Depends(get_db)):
 def get_current_user_info(current_user: User = Depends(get_current_user)):
     return current_user
 
+def submit_entry_index(db_entry: Entry, db_analysis: Optional[Analysis], analysis_data: Optional[dict]) -> None:
+    """Girişi (ve varsa analizini) arka plan indeksleyicisine bırakır; upsert olduğu için düzenlemede de kullanılır"""
+    try:
+        from services.analysis_indexer import get_analysis_indexer
+        get_analysis_indexer().submit(
+            entry_id=str(db_entry.id),
+            user_id=str(db_entry.user_id),
+            text=db_entry.text,
+            analysis_result=analysis_data or {},
+            analysis_id=str(db_analysis.id) if db_analysis else None,
+            mood_score=db_entry.mood_score,
+            created_at=db_entry.created_at.isoformat() if db_entry.created_at else None,
+            analyzed_at=db_analysis.analyzed_at.isoformat() if db_analysis and db_analysis.analyzed_at else None
+        )
+    except Exception:
+        # ChromaDB hatası ana işlemi etkilemesin
+        pass
+
 # Entry endpoints (protected)
 @app.post("/entries/", response_model=EntryResponse)
 def create_entry(entry: EntryCreate, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
@@ -99,7 +119,7 @@ def create_entry(entry: EntryCreate, current_user: User = Depends(get_current_us
     
     # Frontend'den gelen analiz sonucunu kontrol et
     if hasattr(entry, 'analysis') and entry.analysis:
-        analysis_data = entry.analysis
+        analysis_data = normalize_analysis(entry.analysis)
     else:
         # Yeni analiz yap
         try:
@@ -132,37 +152,17 @@ def create_entry(entry: EntryCreate, current_user: User = Depends(get_current_us
     if analysis_data:
         db_analysis = Analysis(
             entry_id=db_entry.id,
-            result=analysis_data
+            result=analysis_data,
+            prompt_version=analysis_data.get("prompt_version"),
+            model_version=analysis_data.get("model"),
+            analyzed_at=datetime.utcnow()
         )
         db.add(db_analysis)
         db.commit()
         db.refresh(db_analysis)
         
-        # ChromaDB'ye entry ve analiz sonucunu ekle
-        try:
-            from agents.rag_agent import RAGAgent
-            rag_agent = RAGAgent()
-            
-            # Entry'yi ChromaDB'ye ekle (async olarak)
-            import asyncio
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            
-            try:
-                loop.run_until_complete(
-                    rag_agent.add_user_entry_to_chroma(
-                        entry_id=str(db_entry.id),
-                        user_id=str(current_user.id),
-                        text=entry.text,
-                        analysis_result=analysis_data
-                    )
-                )
-            finally:
-                loop.close()
-                
-        except Exception:
-            # ChromaDB hatası ana işlemi etkilemesin
-            pass
+        # ChromaDB'ye entry ve analiz sonucunu arka plan indeksleyicisiyle (toplu) ekle
+        submit_entry_index(db_entry, db_analysis, analysis_data)
 
     entry_dict = {
         "id": db_entry.id,
@@ -217,12 +217,57 @@ def get_entries(current_user: User = Depends(get_current_user), db: Session = De
 
 
 
+# Arşiv "benzer geçmiş deneyimler": giriş indekslenirken hesaplanan komşu listesinden okunur.
+# Handler async (Chroma servisi async API sunar); SQL sorguları thread havuzunda çalışır.
+@app.get("/entries/{entry_id}/similar")
+async def get_similar_entries(entry_id: int, limit: int = 5, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+    db_entry = await run_in_threadpool(
+        lambda: db.query(Entry).filter(Entry.id == entry_id, Entry.user_id == current_user.id).first()
+    )
+    if not db_entry:
+        raise HTTPException(status_code=404, detail="Entry not found")
+
+    from services.chroma_service import ChromaServiceBusyError, get_chroma_service, get_service_status, is_ready
+    if not is_ready():
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail={"message": "Vektör araması henüz hazır değil", "chroma": get_service_status()},
+        )
+
+    try:
+        result = await get_chroma_service().get_entry_neighbors(str(current_user.id), str(entry_id), limit)
+    except ChromaServiceBusyError as e:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e))
+
+    # Silinmiş girişler listede kalmış olabilir; SQL'de olmayanlar atlanır
+    scores = {int(n["entry_id"]): n["similarity_score"] for n in result["neighbors"] if str(n["entry_id"]).isdigit()}
+    rows = {
+        e.id: e for e in await run_in_threadpool(
+            lambda: db.query(Entry).filter(Entry.id.in_(list(scores)), Entry.user_id == current_user.id).all()
+        )
+    } if scores else {}
+
+    similar = [
+        {
+            "id": neighbor_id,
+            "text": rows[neighbor_id].text,
+            "mood_score": rows[neighbor_id].mood_score,
+            "created_at": rows[neighbor_id].created_at,
+            "similarity_score": score,
+        }
+        for neighbor_id, score in scores.items()
+        if neighbor_id in rows
+    ]
+    return {"entry_id": entry_id, "similar_entries": similar, "source": result["source"]}
+
 @app.put("/entries/{entry_id}", response_model=EntryResponse)
 def update_entry(entry_id: int, entry_update: EntryUpdate, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
     db_entry = db.query(Entry).filter(Entry.id == entry_id, Entry.user_id == current_user.id).first()
     if not db_entry:
         raise HTTPException(status_code=404, detail="Entry not found")
     
+    text_changed = entry_update.text is not None and entry_update.text != db_entry.text
+    mood_changed = entry_update.mood_score is not None and entry_update.mood_score != db_entry.mood_score
     if entry_update.text is not None:
         db_entry.text = entry_update.text
     if entry_update.mood_score is not None:
@@ -243,6 +288,10 @@ def update_entry(entry_id: int, entry_update: EntryUpdate, current_user: User =
         elif isinstance(raw, dict):
             analysis_data = raw
 
+    # Vektörler, BM25 postingleri ve komşu listeleri yeni metinle yeniden yazılır (upsert)
+    if text_changed or mood_changed:
+        submit_entry_index(db_entry, db_entry.analysis if analysis_data else None, analysis_data)
+
     entry_dict = {
         "id": db_entry.id,
         "text": db_entry.text,
@@ -261,9 +310,11 @@ def delete_entry(entry_id: int, current_user: User = Depends(get_current_user),
         raise HTTPException(status_code=404, detail="Entry not found")
     
     # İlişkili analiz kaydı varsa önce onu sil
+    analysis_id = None
     try:
         analysis_obj = db.query(Analysis).filter(Analysis.entry_id == db_entry.id).first()
         if analysis_obj:
+            analysis_id = analysis_obj.id
             db.delete(analysis_obj)
             db.flush()
     except Exception:
@@ -272,12 +323,51 @@ def delete_entry(entry_id: int, current_user: User = Depends(get_current_user),
 
     db.delete(db_entry)
     db.commit()
+
+    # Vektörler, kalıp sayaçları, BM25 ve komşu listeleri arka planda güncellenir (indeksleme kuyruğu sırasıyla)
+    try:
+        from services.analysis_indexer import get_analysis_indexer
+        get_analysis_indexer().submit_delete(str(entry_id), str(current_user.id), str(analysis_id) if analysis_id else None)
+    except Exception:
+        # ChromaDB hatası ana işlemi etkilemesin; kalan vektörler chroma_maintenance orphans ile temizlenir
+        pass
     return {"message": "Entry deleted successfully"}
 
 # Health check
 @app.get("/")
 def read_root():
     return {"message": "Zihin Aynası API is running"}
+
+# Embedding modeli açılışı bloklamasın: ChromaDB arka planda ısınır
+@app.on_event("startup")
+def warmup_vector_services():
+    if os.getenv("CHROMA_WARMUP", "1").strip().lower() in ("0", "false", "no", "off"):
+        return
+    from services.chroma_service import start_warmup
+    start_warmup()
+
+# Kuyruktaki indeksleme işlerini kapanışta yaz
+@app.on_event("shutdown")
+def flush_analysis_indexer():
+    from services.analysis_indexer import get_analysis_indexer
+    get_analysis_indexer().stop()
+
+# Readiness probe: API hemen hazırdır, vektör özellikleri ısınma bitince açılır
+@app.get("/ready")
+def readiness(vector: bool = False):
+    from services.chroma_service import get_service_status, is_ready
+    from services.analysis_indexer import get_analysis_indexer
+    vector_ready = is_ready()
+    body = {
+        "api": "ready",
+        "vector_search": "ready" if vector_ready else get_service_status()["state"],
+        "chroma": get_service_status(),
+        "indexer": get_analysis_indexer().get_stats(),
+    }
+    if vector and not vector_ready:
+        # ?vector=true: vektör özellikleri hazır olana kadar 503
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=body)
+    return body
     
 app.include_router(analyze_router, prefix="/analyze", tags=["AI Analysis"])
 
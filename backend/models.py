@@ -25,4 +25,7 @@ class Analysis(Base):
     id = Column(Integer, primary_key=True, index=True)
     entry_id = Column(Integer, ForeignKey('entries.id'), nullable=False, unique=True)
     result = Column(JSON, nullable=False)  # GPT çıktısı JSONB olarak saklanacak
+    prompt_version = Column(String, nullable=True, index=True)  # Analizi üreten SYSTEM_PROMPT sürümü
+    model_version = Column(String, nullable=True, index=True)   # Analizi üreten OpenAI modeli
+    analyzed_at = Column(DateTime, nullable=True)
     entry = relationship('Entry', back_populates='analysis') 
\ No newline at end of file
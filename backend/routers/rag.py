@@ -3,12 +3,14 @@ RAG Router - Kişiselleştirilmiş Terapi Teknikleri API
 """
 
 from fastapi import APIRouter, HTTPException, Depends, status
-from typing import List, Optional
+from datetime import datetime
+from typing import List, Literal, Optional
 from pydantic import BaseModel
 
 from models import User
 from auth import get_current_user
 from agents.rag_agent import RAGAgent
+from services.chroma_service import ChromaServiceBusyError, get_service_status
 
 router = APIRouter()
 
@@ -27,9 +29,18 @@ class SimilarEntriesRequest(BaseModel):
     query_text: str
     distortion_type: Optional[str] = None
     n_results: int = 5
+    # Sadece /similar-entries/: vektör sorgusunun where filtresine iner
+    distortion_types: Optional[List[str]] = None
+    since: Optional[datetime] = None
+    until: Optional[datetime] = None
 
-# RAG agent instance
-rag_agent = RAGAgent()
+class HybridSearchRequest(BaseModel):
+    query_text: str
+    n_results: int = 5
+    mode: Literal["auto", "hybrid", "keyword", "semantic"] = "auto"
+
+# RAG agent instance (istekler ChromaDB yüklemesini beklemez)
+rag_agent = RAGAgent(blocking_chroma_load=False)
 
 @router.post("/techniques/")
 async def get_therapy_techniques(
@@ -129,6 +140,7 @@ async def rag_health_check():
             "available_distortions": len(distortions),
             "total_techniques": sum(summary.values()),
             "chromadb_status": chroma_status,
+            "chromadb_warmup": get_service_status(),
             "agent_type": "RAG Agent - Terapi Teknikleri (ChromaDB Enhanced)"
         }
         
@@ -162,6 +174,9 @@ async def find_similar_entries(
             user_id=str(current_user.id),
             query_text=request.query_text,
             distortion_type=request.distortion_type,
+            distortion_types=request.distortion_types,
+            since=request.since,
+            until=request.until,
             n_results=request.n_results
         )
         
@@ -171,17 +186,63 @@ async def find_similar_entries(
                 "similar_entries": similar_entries,
                 "query": request.query_text,
                 "total_found": len(similar_entries),
-                "distortion_filter": request.distortion_type
+                "distortion_filter": request.distortion_type,
+                "distortion_types_filter": request.distortion_types,
+                "since": request.since.isoformat() if request.since else None,
+                "until": request.until.isoformat() if request.until else None
             },
             "user_id": current_user.id
         }
         
+    except ChromaServiceBusyError as e:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e))
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Benzer girişler aranırken hata oluştu: {str(e)}"
         )
 
+@router.post("/similar-entries/hybrid/")
+async def hybrid_search_entries(
+    request: HybridSearchRequest,
+    current_user: User = Depends(get_current_user)
+):
+    """Kullanıcının girişlerinde BM25 + semantik hibrit arama (RRF ile birleştirilmiş)"""
+    try:
+        if not rag_agent.use_chroma:
+            return {
+                "success": False,
+                "message": "ChromaDB mevcut değil",
+                "data": []
+            }
+        
+        search = await rag_agent.chroma_service.hybrid_search_entries(
+            user_id=str(current_user.id),
+            query_text=request.query_text,
+            n_results=request.n_results,
+            mode=request.mode
+        )
+        
+        return {
+            "success": True,
+            "data": {
+                "similar_entries": search["results"],
+                "query": request.query_text,
+                "total_found": len(search["results"]),
+                "mode": search["mode"],
+                "terms": search["terms"]
+            },
+            "user_id": current_user.id
+        }
+        
+    except ChromaServiceBusyError as e:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e))
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Hibrit arama hatası: {str(e)}"
+        )
+
 @router.get("/user-insights/")
 async def get_user_insights(
     current_user: User = Depends(get_current_user)
@@ -225,6 +286,8 @@ async def get_chroma_statistics(
             "user_id": current_user.id
         }
         
+    except ChromaServiceBusyError as e:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e))
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -265,6 +328,8 @@ async def semantic_technique_search(
             "user_id": current_user.id
         }
         
+    except ChromaServiceBusyError as e:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e))
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
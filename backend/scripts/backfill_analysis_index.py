@@ -0,0 +1,136 @@
+"""
+Analiz İndeksi Backfill CLI
+Mevcut `analyses` satırlarını (giriş metniyle birlikte) keyset pagination ile sayfa sayfa
+okur ve büyük embedding batch'leriyle ChromaDB'nin user_entries ve analysis_results
+koleksiyonlarına yazar. İlerleme checkpoint dosyasına kaydedilir; yarıda kesilirse
+kaldığı analysis_id'den devam eder.
+
+Kullanım:
+    python scripts/backfill_analysis_index.py --dry-run
+    python scripts/backfill_analysis_index.py --page-size 1000 --embed-batch-size 256
+    python scripts/backfill_analysis_index.py --reset
+"""
+
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import logging
+from typing import Any, Dict, List
+
+# Backend root dizinini ekle
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import SessionLocal
+from models import Analysis, Entry
+from services.chroma_service import get_chroma_service
+from scripts.checkpoint import JsonCheckpoint
+from taxonomy import normalize_analysis
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def fetch_page(db, last_id: int, page_size: int):
+    """Keyset pagination ile bir sonraki analiz sayfasını getirir"""
+    return (
+        db.query(
+            Analysis.id, Analysis.entry_id, Analysis.result, Analysis.analyzed_at,
+            Entry.text, Entry.user_id, Entry.mood_score, Entry.created_at,
+        )
+        .join(Entry, Entry.id == Analysis.entry_id)
+        .filter(Analysis.id > last_id)
+        .order_by(Analysis.id)
+        .limit(page_size)
+        .all()
+    )
+
+
+def to_index_items(rows) -> List[Dict[str, Any]]:
+    """Satırları ChromaService.index_entries_batch öğelerine çevirir"""
+    items = []
+    for row in rows:
+        result = row.result
+        if isinstance(result, str):
+            try:
+                result = json.loads(result)
+            except json.JSONDecodeError:
+                result = {}
+        items.append({
+            "entry_id": str(row.entry_id),
+            "user_id": str(row.user_id),
+            "text": row.text,
+            "analysis_result": normalize_analysis(result or {}),
+            "analysis_id": str(row.id),
+            "mood_score": row.mood_score,
+            # Zaman filtreleri ve kalıp ilk/son zamanları backfill anına değil gerçek zamana dayansın
+            "created_at": row.created_at.isoformat() if row.created_at else None,
+            "analyzed_at": row.analyzed_at.isoformat() if row.analyzed_at else None,
+        })
+    return items
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Mevcut analizleri ChromaDB'ye indeksler")
+    parser.add_argument("--page-size", type=int, default=500, help="Veritabanından tek seferde okunan satır")
+    parser.add_argument("--embed-batch-size", type=int, default=256, help="Tek forward pass'e giren doküman sayısı")
+    parser.add_argument("--limit", type=int, default=0, help="En fazla işlenecek satır (0: hepsi)")
+    parser.add_argument("--checkpoint", default=".backfill_analysis_checkpoint.json", help="Checkpoint dosyası")
+    parser.add_argument("--reset", action="store_true", help="Checkpoint'i yok say, baştan başla")
+    parser.add_argument("--dry-run", action="store_true", help="Sadece indekslenecek satırları say")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        if args.dry_run:
+            total = db.query(Analysis.id).join(Entry, Entry.id == Analysis.entry_id).count()
+            logger.info(f"{total} analiz satırı indekslenecek")
+            return
+
+        service = get_chroma_service()
+        service.embed_batch_size = args.embed_batch_size
+
+        checkpoint = JsonCheckpoint(args.checkpoint, {"job": "backfill_analysis_index"})
+        state = checkpoint.load(reset=args.reset)
+        last_id = state.get("last_id", 0)
+        processed = state.get("processed", 0)
+        indexed = state.get("indexed", 0)
+        if last_id:
+            logger.info(f"Checkpoint bulundu, analysis_id>{last_id} üzerinden devam ediliyor")
+
+        started = time.monotonic()
+        while True:
+            page_size = args.page_size
+            if args.limit:
+                page_size = min(page_size, args.limit - processed)
+                if page_size <= 0:
+                    break
+
+            rows = fetch_page(db, last_id, page_size)
+            if not rows:
+                checkpoint.clear()
+                break
+
+            written = await service.index_entries_batch(to_index_items(rows))
+            if written != len(rows):
+                # Checkpoint ilerletilmez; tekrar çalıştırıldığında aynı sayfadan devam edilir
+                logger.error(f"analysis_id>{last_id} sayfası yazılamadı, durduruluyor")
+                break
+
+            last_id = rows[-1].id
+            processed += len(rows)
+            indexed += written
+            checkpoint.save(last_id=last_id, processed=processed, indexed=indexed)
+
+            elapsed = max(time.monotonic() - started, 1e-6)
+            logger.info(f"analysis_id<={last_id}: {indexed} indekslendi ({processed / elapsed:.1f} satır/sn)")
+
+        logger.info(f"Tamamlandı: {indexed} analiz indekslendi")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
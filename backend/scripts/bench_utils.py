@@ -0,0 +1,46 @@
+"""
+Benchmark Yardımcıları
+Benchmark scriptlerinin paylaştığı sentetik Türkçe metin üretimi ve yüzdelik hesaplama.
+"""
+
+import random
+from typing import List, Sequence
+
+_SUBJECTS = [
+    "Bugün işte", "Sınavda", "Annemle konuşurken", "Toplantıda", "Arkadaşlarımla", "Patronum",
+    "Sevgilim", "Okulda", "Evde tek başıma", "Otobüste", "Doktor randevusunda", "Spor salonunda",
+]
+_THOUGHTS = [
+    "her şeyin kötü gideceğini düşündüm", "herkesin benden nefret ettiğini hissettim",
+    "hiçbir zaman başarılı olamayacağım", "bu tamamen benim hatamdı", "ben tam bir başarısızım",
+    "ya mükemmel olmalı ya da hiç olmamalı", "küçük bir hata yaptım ama felaket gibi geldi",
+    "yarın da kesin kötü geçecek", "bana öyle baktığına göre kızgın olmalı",
+    "her zaman daha çok çalışmalıyım", "kimse beni anlamıyor", "işimi kaybedeceğimden korkuyorum",
+]
+_ENDINGS = [
+    "Çok yorgunum.", "Biraz rahatladım.", "Kaygım arttı.", "Uyuyamadım.", "Ağlamak istedim.",
+    "Sonra yürüyüşe çıktım.", "Kendimi suçlu hissettim.", "Nefes egzersizi yaptım.",
+]
+
+
+def synthetic_entries(count: int, seed: int = 42) -> List[str]:
+    """Türkçe günlük yazısına benzeyen sentetik metinler üretir."""
+    rng = random.Random(seed)
+    texts = []
+    for i in range(count):
+        sentences = [
+            f"{rng.choice(_SUBJECTS)} {rng.choice(_THOUGHTS)}."
+            for _ in range(rng.randint(1, 3))
+        ]
+        sentences.append(rng.choice(_ENDINGS))
+        texts.append(" ".join(sentences) + f" (#{i})")
+    return texts
+
+
+def percentile(samples: Sequence[float], pct: float) -> float:
+    """Basit yüzdelik hesabı (en yakın sıra)."""
+    ordered = sorted(samples)
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))
+    return ordered[index]
@@ -0,0 +1,71 @@
+"""
+ChromaService Toplu Ekleme Benchmark'ı
+add_user_entries_batch ile farklı batch boyutlarında saniyedeki doküman sayısını ölçer.
+Geçici bir ChromaDB dizini kullanır, mevcut chroma_db'ye dokunmaz.
+
+Kullanım:
+    python scripts/benchmark_chroma_batch.py --documents 512 --batch-sizes 1 32 256
+"""
+
+import os
+import sys
+import time
+import shutil
+import asyncio
+import argparse
+import logging
+import tempfile
+
+# Backend root dizinini ekle
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.chroma_service import ChromaService
+from scripts.bench_utils import synthetic_entries
+
+logging.basicConfig(level=logging.WARNING)
+logger = logging.getLogger(__name__)
+
+
+async def run_benchmark(service: ChromaService, texts, batch_size: int, run_id: str) -> float:
+    """Metinleri verilen batch boyutuyla ekler, doküman/sn döndürür"""
+    items = [
+        {
+            "entry_id": f"{run_id}_{i}",
+            "user_id": "bench_user",
+            "text": text,
+            "analysis_result": {"distortions": [{"type": "Felaketleştirme"}], "risk_level": "düşük"},
+        }
+        for i, text in enumerate(texts)
+    ]
+
+    start = time.perf_counter()
+    for offset in range(0, len(items), batch_size):
+        await service.add_user_entries_batch(items[offset:offset + batch_size])
+    elapsed = time.perf_counter() - start
+    return len(items) / elapsed
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="ChromaService toplu ekleme benchmark'ı")
+    parser.add_argument("--documents", type=int, default=512)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 32, 256])
+    args = parser.parse_args()
+
+    persist_dir = tempfile.mkdtemp(prefix="chroma_bench_")
+    try:
+        service = ChromaService(persist_directory=persist_dir)
+        texts = synthetic_entries(args.documents)
+
+        # Model ısınması (ilk forward pass ölçüme dahil edilmesin)
+        service._embed(texts[:8])
+
+        print(f"{args.documents} doküman, embed batch={service.embed_batch_size}")
+        for batch_size in args.batch_sizes:
+            docs_per_second = await run_benchmark(service, texts, batch_size, f"b{batch_size}")
+            print(f"  batch_size={batch_size:>4}: {docs_per_second:8.1f} doküman/sn")
+    finally:
+        shutil.rmtree(persist_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,185 @@
+"""
+Embedding Backend Benchmark'ı
+torch / onnx / onnx-int8 backend'lerini aynı metinler üzerinde karşılaştırır:
+throughput (doküman/sn), tek sorgu gecikmesi (p50/p95), süreç RSS'i ve Türkçe test
+sorgularında PyTorch baseline'ına göre retrieval uyumu (top-k örtüşmesi, kosinüs benzerliği).
+
+Her backend ayrı bir alt süreçte ölçülür, böylece RSS değerleri birbirini etkilemez.
+
+Kullanım:
+    python scripts/benchmark_embedding_backends.py
+    python scripts/benchmark_embedding_backends.py --documents 1024 --batch-size 64 --top-k 5
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import logging
+import tempfile
+import subprocess
+
+import numpy as np
+
+# Backend root dizinini ekle
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scripts.bench_utils import percentile, synthetic_entries
+
+logging.basicConfig(level=logging.WARNING)
+logger = logging.getLogger(__name__)
+
+# Günlük girişlerinden teknik/benzer giriş aramasında kullanılan tipik Türkçe sorgular
+TURKISH_QUERIES = [
+    "Bu işi kaybedeceğim ve hiçbir yerde iş bulamayacağım",
+    "Herkes benim hakkımda kötü düşünüyor",
+    "Sınavda başarısız olursam hayatım mahvolur",
+    "Her zaman her şeyi yanlış yapıyorum",
+    "Arkadaşım mesajıma cevap vermedi, kesin bana kızgın",
+    "Ben tam bir başarısızım",
+    "Ya mükemmel olmalı ya da hiç yapmamalıyım",
+    "Toplantıdaki küçük hatam her şeyi berbat etti",
+    "Yarın da kesin kötü geçecek",
+    "Daha çok çalışmalıyım, asla dinlenmemeliyim",
+    "Annem üzgünse bu benim suçum",
+    "Kimse beni sevmiyor ve hep yalnız kalacağım",
+]
+
+
+def _rss_mb() -> float:
+    """Güncel RSS (MB) - Linux'ta /proc, diğerlerinde ru_maxrss"""
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _corpus(documents: int):
+    """BDT teknik dokümanları + sentetik günlük girişleri"""
+    from agents.rag_agent import BDT_TECHNIQUES
+
+    corpus = [
+        f"{t['title']}\n{t['description']}\n{t['exercise']}"
+        for data in BDT_TECHNIQUES.values()
+        for t in data["techniques"]
+    ]
+    return corpus + synthetic_entries(documents)
+
+
+def run_worker(backend: str, documents: int, batch_size: int, latency_runs: int, out_dir: str) -> None:
+    """Tek backend'i ölçer, sonuçları out_dir'e yazar (alt süreçte çalışır)"""
+    from services.embedding_backends import create_embedding_function
+
+    rss_before = _rss_mb()
+    load_start = time.perf_counter()
+    embed = create_embedding_function(backend=backend)
+    load_seconds = time.perf_counter() - load_start
+
+    corpus = _corpus(documents)
+    embed(corpus[:8])  # Isınma
+
+    start = time.perf_counter()
+    corpus_vectors = []
+    for offset in range(0, len(corpus), batch_size):
+        corpus_vectors.extend(embed(corpus[offset:offset + batch_size]))
+    throughput = len(corpus) / (time.perf_counter() - start)
+
+    latencies = []
+    for i in range(latency_runs):
+        query = TURKISH_QUERIES[i % len(TURKISH_QUERIES)]
+        start = time.perf_counter()
+        embed([query])
+        latencies.append(time.perf_counter() - start)
+
+    query_vectors = embed(TURKISH_QUERIES)
+    np.save(os.path.join(out_dir, f"{backend}_corpus.npy"), np.asarray(corpus_vectors, dtype=np.float32))
+    np.save(os.path.join(out_dir, f"{backend}_queries.npy"), np.asarray(query_vectors, dtype=np.float32))
+
+    with open(os.path.join(out_dir, f"{backend}.json"), "w") as f:
+        json.dump({
+            "backend": backend,
+            "embedding_class": type(embed).__name__,
+            "load_seconds": load_seconds,
+            "throughput": throughput,
+            "p50_ms": percentile(latencies, 50) * 1000,
+            "p95_ms": percentile(latencies, 95) * 1000,
+            "rss_mb": _rss_mb(),
+            "rss_delta_mb": _rss_mb() - rss_before,
+        }, f)
+
+
+def _normalize(matrix: np.ndarray) -> np.ndarray:
+    return matrix / np.clip(np.linalg.norm(matrix, axis=1, keepdims=True), 1e-12, None)
+
+
+def retrieval_agreement(out_dir: str, backend: str, baseline: str, top_k: int):
+    """Baseline'a göre ortalama top-k örtüşmesi ve sorgu vektörü kosinüs benzerliği"""
+    base_corpus = _normalize(np.load(os.path.join(out_dir, f"{baseline}_corpus.npy")))
+    base_queries = _normalize(np.load(os.path.join(out_dir, f"{baseline}_queries.npy")))
+    corpus = _normalize(np.load(os.path.join(out_dir, f"{backend}_corpus.npy")))
+    queries = _normalize(np.load(os.path.join(out_dir, f"{backend}_queries.npy")))
+
+    base_top = np.argsort(-(base_queries @ base_corpus.T), axis=1)[:, :top_k]
+    top = np.argsort(-(queries @ corpus.T), axis=1)[:, :top_k]
+    overlaps = [len(set(a) & set(b)) / top_k for a, b in zip(base_top, top)]
+    top1 = float(np.mean(base_top[:, 0] == top[:, 0]))
+    cosine = float(np.mean(np.sum(base_queries * queries, axis=1)))
+    return float(np.mean(overlaps)), top1, cosine
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Embedding backend karşılaştırması")
+    parser.add_argument("--backends", nargs="+", default=["torch", "onnx", "onnx-int8"])
+    parser.add_argument("--documents", type=int, default=512, help="Sentetik giriş sayısı (BDT tekniklerine ek)")
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--latency-runs", type=int, default=100, help="Tek sorgu gecikmesi ölçüm sayısı")
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    parser.add_argument("--out-dir", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(args.worker, args.documents, args.batch_size, args.latency_runs, args.out_dir)
+        return
+
+    out_dir = tempfile.mkdtemp(prefix="embedding_bench_")
+    try:
+        results = []
+        for backend in args.backends:
+            subprocess.run(
+                [
+                    sys.executable, os.path.abspath(__file__),
+                    "--worker", backend, "--out-dir", out_dir,
+                    "--documents", str(args.documents),
+                    "--batch-size", str(args.batch_size),
+                    "--latency-runs", str(args.latency_runs),
+                ],
+                check=True,
+            )
+            with open(os.path.join(out_dir, f"{backend}.json")) as f:
+                results.append(json.load(f))
+
+        baseline = "torch" if "torch" in args.backends else args.backends[0]
+        print(f"{'backend':<10} {'dok/sn':>8} {'p50':>8} {'p95':>8} {'RSS':>9} {'yükleme':>8} "
+              f"{'top-' + str(args.top_k):>7} {'top-1':>6} {'kosinüs':>8}")
+        for result in results:
+            overlap, top1, cosine = retrieval_agreement(out_dir, result["backend"], baseline, args.top_k)
+            print(
+                f"{result['backend']:<10} {result['throughput']:>8.1f} {result['p50_ms']:>6.1f}ms "
+                f"{result['p95_ms']:>6.1f}ms {result['rss_mb']:>7.0f}MB {result['load_seconds']:>7.1f}s "
+                f"{overlap * 100:>6.1f}% {top1 * 100:>5.0f}% {cosine:>8.4f}"
+            )
+            if result["backend"] != "torch" and result["embedding_class"] != "OnnxEmbeddingFunction":
+                print(f"  uyarı: {result['backend']} başlatılamadı, torch'a düşüldü")
+        print(f"(retrieval uyumu baseline: {baseline}, {len(TURKISH_QUERIES)} Türkçe sorgu)")
+    finally:
+        shutil.rmtree(out_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Hedged Request Benchmark
+CognitiveAnalysisAgent'ı hedging kapalı/açık olarak stand-in sunucuya karşı çalıştırır
+ve p50/p95/p99 gecikmelerini raporlar.
+
+Önce stand-in sunucuyu başlatın:
+    python scripts/llm_standin_server.py --slow-rate 0.05 --slow-ms 4000
+Sonra:
+    python scripts/benchmark_hedging.py --requests 400 --concurrency 8
+"""
+
+import os
+import sys
+import time
+import asyncio
+import argparse
+import logging
+
+# Backend root dizinini ekle
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scripts.bench_utils import percentile
+
+logging.basicConfig(level=logging.WARNING)
+logger = logging.getLogger(__name__)
+
+TEST_TEXT = (
+    "Bugün işte çok kötü bir gün geçirdim. Patronum bana kızdı ve ben artık hiçbir işi doğru "
+    "yapamayacağımı düşünüyorum. Bu işi kaybedeceğim ve hiçbir yerde iş bulamayacağım."
+)
+
+
+async def _run(hedging_enabled: bool, total: int, concurrency: int):
+    os.environ["OPENAI_HEDGING_ENABLED"] = "1" if hedging_enabled else "0"
+    from agents.cognitive_agent import CognitiveAnalysisAgent
+
+    agent = CognitiveAnalysisAgent()
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one():
+        async with semaphore:
+            start = time.perf_counter()
+            await agent.analyze_entry(TEST_TEXT)
+            latencies.append(time.perf_counter() - start)
+
+    await asyncio.gather(*(one() for _ in range(total)))
+    return latencies, agent.get_hedging_stats()
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Hedged request gecikme benchmark'ı")
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--base-url", default=os.getenv("OPENAI_BASE_URL", "http://127.0.0.1:8787/v1"))
+    args = parser.parse_args()
+
+    os.environ["OPENAI_BASE_URL"] = args.base_url
+    os.environ.setdefault("OPENAI_API_KEY", "standin")
+
+    for enabled in (False, True):
+        latencies, stats = await _run(enabled, args.requests, args.concurrency)
+        label = "hedging açık " if enabled else "hedging kapalı"
+        print(
+            f"{label}: p50={percentile(latencies, 50) * 1000:.0f}ms "
+            f"p95={percentile(latencies, 95) * 1000:.0f}ms "
+            f"p99={percentile(latencies, 99) * 1000:.0f}ms "
+            f"hedges={stats['hedges']} (%{stats['hedge_rate_percent']}) wins={stats['hedge_wins']}"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
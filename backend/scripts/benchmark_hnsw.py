@@ -0,0 +1,183 @@
+"""
+HNSW Parametre Benchmark'ı
+ChromaService koleksiyonları için HNSW ayarlarını (space, M, ef_construction, ef_search)
+seçmeye yardımcı olur. Her boyut ve ayar kombinasyonu için geçici bir Chroma dizininde
+koleksiyon kurulur; kurulum süresi, diskteki indeks boyutu, sorgu p50/p99 ve tam
+(brute-force NumPy) aramaya göre recall@k raporlanır.
+
+Vektörler, Türkçe günlük şablonlarına (bench_utils) karşılık gelen küme merkezleri etrafında
+üretilir: gerçek girişler gibi birbirine yakın gruplar oluşur, fakat 1M vektör embedding
+modelinden geçirilmeden saniyeler içinde hazırlanır. `--real-embeddings` ile küçük boyutlarda
+gerçek model vektörleri kullanılabilir.
+
+Ayarlar CHROMA_HNSW_* ortam değişkenleriyle aynı isimlerdir (bkz. README).
+
+Kullanım:
+    python scripts/benchmark_hnsw.py                                   # 10k, 100k, 1M
+    python scripts/benchmark_hnsw.py --sizes 10000 --configs M=16,ef_search=10 M=32,ef_search=64
+    python scripts/benchmark_hnsw.py --sizes 5000 --real-embeddings --space cosine
+"""
+
+import os
+import sys
+import time
+import shutil
+import argparse
+import logging
+import tempfile
+from typing import Any, Dict, List
+
+import numpy as np
+
+# Backend root dizinini ekle
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scripts.bench_utils import percentile, synthetic_entries
+
+logging.basicConfig(level=logging.WARNING)
+logger = logging.getLogger(__name__)
+
+DEFAULT_CONFIGS = [
+    "M=16,ef_construction=100,ef_search=10",   # Chroma varsayılanı
+    "M=16,ef_construction=100,ef_search=64",
+    "M=32,ef_construction=200,ef_search=100",
+]
+
+# Komut satırı adı -> Chroma metadata anahtarı
+CONFIG_KEYS = {
+    "M": "hnsw:M",
+    "ef_construction": "hnsw:construction_ef",
+    "ef_search": "hnsw:search_ef",
+}
+
+
+def parse_config(spec: str) -> Dict[str, int]:
+    """'M=16,ef_search=64' -> {"hnsw:M": 16, "hnsw:search_ef": 64}"""
+    config = {}
+    for part in spec.split(","):
+        name, _, value = part.partition("=")
+        if name.strip() not in CONFIG_KEYS:
+            raise ValueError(f"Bilinmeyen HNSW ayarı: {name} (geçerli: {', '.join(CONFIG_KEYS)})")
+        config[CONFIG_KEYS[name.strip()]] = int(value)
+    return config
+
+
+def synthetic_vectors(count: int, dim: int, seed: int = 42) -> np.ndarray:
+    """Şablon kümeleri etrafında normalize edilmiş float32 vektörler (parça parça üretilir)"""
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((144, dim)).astype(np.float32)
+    vectors = np.empty((count, dim), dtype=np.float32)
+    for start in range(0, count, 100_000):
+        end = min(start + 100_000, count)
+        labels = rng.integers(len(centers), size=end - start)
+        chunk = centers[labels] + 0.6 * rng.standard_normal((end - start, dim)).astype(np.float32)
+        vectors[start:end] = chunk / np.linalg.norm(chunk, axis=1, keepdims=True)
+    return vectors
+
+
+def real_vectors(count: int) -> np.ndarray:
+    from services.embedding_backends import create_embedding_function
+
+    embed = create_embedding_function()
+    texts = synthetic_entries(count)
+    vectors: List[Any] = []
+    for start in range(0, count, 256):
+        vectors.extend(embed(texts[start:start + 256]))
+    return np.asarray(vectors, dtype=np.float32)
+
+
+def exact_top_k(vectors: np.ndarray, queries: np.ndarray, k: int, space: str) -> List[set]:
+    """Tam arama: l2 için en küçük mesafe, cosine / ip için en büyük iç çarpım"""
+    truth = []
+    if space == "l2":
+        norms = (vectors ** 2).sum(axis=1)
+    elif space == "cosine":
+        norms = np.linalg.norm(vectors, axis=1)
+    for query in queries:
+        if space == "l2":
+            scores = -(norms - 2 * (vectors @ query))
+        elif space == "cosine":
+            scores = (vectors @ query) / norms
+        else:
+            scores = vectors @ query
+        top = np.argpartition(-scores, k - 1)[:k]
+        truth.append({str(i) for i in top})
+    return truth
+
+
+def _dir_size_mb(path: str) -> float:
+    total = 0
+    for root, _, files in os.walk(path):
+        total += sum(os.path.getsize(os.path.join(root, name)) for name in files)
+    return total / (1024 * 1024)
+
+
+def run_config(workdir: str, vectors: np.ndarray, queries: np.ndarray, truth: List[set], space: str,
+               config: Dict[str, int], k: int) -> Dict[str, Any]:
+    import chromadb
+
+    path = tempfile.mkdtemp(prefix="hnsw_", dir=workdir)
+    try:
+        client = chromadb.PersistentClient(path=path)
+        collection = client.create_collection(name="bench_entries", metadata={"hnsw:space": space, **config})
+        max_batch = int(client.get_max_batch_size())
+
+        start = time.perf_counter()
+        for offset in range(0, len(vectors), max_batch):
+            chunk = vectors[offset:offset + max_batch]
+            collection.add(ids=[str(i) for i in range(offset, offset + len(chunk))], embeddings=chunk)
+        build_seconds = time.perf_counter() - start
+        disk_mb = _dir_size_mb(path)
+
+        latencies, recalls = [], []
+        for query, expected in zip(queries, truth):
+            start = time.perf_counter()
+            ids = collection.query(query_embeddings=[query], n_results=k, include=[])["ids"][0]
+            latencies.append(time.perf_counter() - start)
+            recalls.append(len(set(ids) & expected) / k)
+
+        return {
+            "build_s": build_seconds,
+            "disk_mb": disk_mb,
+            "p50_ms": percentile(latencies, 50) * 1000,
+            "p99_ms": percentile(latencies, 99) * 1000,
+            "recall": float(np.mean(recalls)),
+        }
+    finally:
+        shutil.rmtree(path, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Chroma HNSW ayarları için kurulum/gecikme/recall benchmark'ı")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--configs", nargs="+", default=DEFAULT_CONFIGS, help="Örn. M=32,ef_construction=200,ef_search=64")
+    parser.add_argument("--space", choices=["l2", "cosine", "ip"], default="l2")
+    parser.add_argument("--dim", type=int, default=384, help="Embedding boyutu (MiniLM-L12: 384)")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--real-embeddings", action="store_true", help="Sentetik Türkçe metinleri gerçek modelle embed et (yavaş)")
+    args = parser.parse_args()
+
+    configs = [(spec, parse_config(spec)) for spec in args.configs]
+    workdir = tempfile.mkdtemp(prefix="hnsw_bench_")
+    try:
+        print(f"{'boyut':>9} {'ayar':<40} {'kurulum':>9} {'disk':>9} {'p50':>8} {'p99':>8} {'recall@' + str(args.k):>9}")
+        for size in args.sizes:
+            total = size + args.queries
+            all_vectors = real_vectors(total) if args.real_embeddings else synthetic_vectors(total, args.dim)
+            # Sorgular indekse eklenmeyen, aynı dağılımdan gelen vektörlerdir
+            vectors, queries = all_vectors[:size], all_vectors[size:]
+            truth = exact_top_k(vectors, queries, args.k, args.space)
+
+            for spec, config in configs:
+                result = run_config(workdir, vectors, queries, truth, args.space, config, args.k)
+                print(
+                    f"{size:>9} {spec:<40} {result['build_s']:>8.1f}s {result['disk_mb']:>7.0f}MB "
+                    f"{result['p50_ms']:>6.2f}ms {result['p99_ms']:>6.2f}ms {result['recall']:>9.3f}"
+                )
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
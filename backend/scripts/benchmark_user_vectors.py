@@ -0,0 +1,149 @@
+"""
+Kullanıcı Vektör Deposu Benchmark'ı
+Benzer giriş aramasını iki yolla karşılaştırır:
+    chroma : tek koleksiyon, HNSW + where={"user_id": ...} filtresi (mevcut yol)
+    memmap : kullanıcı başına float16 memmap dosyası, tam NumPy top-k (SIMILAR_ENTRIES_BACKEND=memmap)
+
+Sentetik, normalize edilmiş vektörler kullanılır (kullanıcı başına sabit seed, bellekte
+tutulmaz). Gecikme p50/p95/p99, recall@k (tam aramaya göre), kurulum süresi ve disk
+boyutu raporlanır. Geçici dizin kullanır, mevcut chroma_db'ye dokunmaz.
+
+Kullanım:
+    python scripts/benchmark_user_vectors.py                      # 10k kullanıcı x 1k giriş
+    python scripts/benchmark_user_vectors.py --users 500 --entries 200 --queries 100
+    python scripts/benchmark_user_vectors.py --skip-chroma
+"""
+
+import os
+import sys
+import time
+import shutil
+import argparse
+import logging
+import tempfile
+
+import numpy as np
+
+# Backend root dizinini ekle
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.user_vector_store import UserVectorStore, normalize_rows
+from scripts.bench_utils import percentile
+
+logging.basicConfig(level=logging.WARNING)
+logger = logging.getLogger(__name__)
+
+
+def user_vectors(user_index: int, entries: int, dim: int) -> np.ndarray:
+    """Kullanıcının sentetik giriş vektörleri (kullanıcı merkezi etrafında kümelenmiş)"""
+    rng = np.random.default_rng(user_index)
+    center = rng.standard_normal(dim)
+    return normalize_rows(center + 0.8 * rng.standard_normal((entries, dim)))
+
+
+def _dir_size_mb(path: str) -> float:
+    total = 0
+    for root, _, files in os.walk(path):
+        total += sum(os.path.getsize(os.path.join(root, name)) for name in files)
+    return total / (1024 * 1024)
+
+
+def build_memmap(root: str, users: int, entries: int, dim: int) -> UserVectorStore:
+    store = UserVectorStore(root)
+    for u in range(users):
+        vectors = user_vectors(u, entries, dim)
+        ids = [f"entry_{u}_{i}" for i in range(entries)]
+        store.ensure_user(str(u), lambda: (ids, vectors, [""] * entries, [{"user_id": str(u)}] * entries))
+    return store
+
+
+def build_chroma(path: str, users: int, entries: int, dim: int):
+    import chromadb
+
+    client = chromadb.PersistentClient(path=path)
+    collection = client.get_or_create_collection(name="bench_user_entries")
+    max_batch = int(client.get_max_batch_size())
+
+    ids, embeddings, metadatas = [], [], []
+    for u in range(users):
+        ids.extend(f"entry_{u}_{i}" for i in range(entries))
+        embeddings.extend(user_vectors(u, entries, dim))
+        metadatas.extend({"user_id": str(u)} for _ in range(entries))
+        if len(ids) >= max_batch or u == users - 1:
+            for start in range(0, len(ids), max_batch):
+                collection.add(
+                    ids=ids[start:start + max_batch],
+                    embeddings=embeddings[start:start + max_batch],
+                    metadatas=metadatas[start:start + max_batch],
+                )
+            ids, embeddings, metadatas = [], [], []
+    return collection
+
+
+def make_queries(count: int, users: int, entries: int, dim: int, k: int, seed: int = 7):
+    """(user_id, sorgu vektörü, tam aramayla bulunan top-k id kümesi) listesi"""
+    rng = np.random.default_rng(seed)
+    queries = []
+    for _ in range(count):
+        u = int(rng.integers(users))
+        vectors = user_vectors(u, entries, dim)
+        query = normalize_rows(vectors[int(rng.integers(entries))] + 0.3 * rng.standard_normal(dim))[0]
+        truth = {f"entry_{u}_{i}" for i in np.argsort(-(vectors @ query))[:k]}
+        queries.append((u, query, truth))
+    return queries
+
+
+def measure(label: str, search, queries, k: int) -> None:
+    latencies, recalls = [], []
+    for u, query, truth in queries:
+        start = time.perf_counter()
+        ids = search(u, query)
+        latencies.append(time.perf_counter() - start)
+        recalls.append(len(set(ids) & truth) / k)
+    print(
+        f"{label:<7} p50={percentile(latencies, 50) * 1000:.2f}ms p95={percentile(latencies, 95) * 1000:.2f}ms "
+        f"p99={percentile(latencies, 99) * 1000:.2f}ms recall@{k}={np.mean(recalls):.3f}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benzer giriş araması: Chroma vs kullanıcı başına memmap")
+    parser.add_argument("--users", type=int, default=10000)
+    parser.add_argument("--entries", type=int, default=1000, help="Kullanıcı başına giriş")
+    parser.add_argument("--dim", type=int, default=384, help="Embedding boyutu (MiniLM-L12: 384)")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--skip-chroma", action="store_true", help="Sadece memmap yolunu ölç")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="user_vectors_bench_")
+    try:
+        total = args.users * args.entries
+        print(f"{args.users} kullanıcı x {args.entries} giriş = {total} vektör (dim={args.dim})")
+        queries = make_queries(args.queries, args.users, args.entries, args.dim, args.k)
+
+        memmap_dir = os.path.join(workdir, "memmap")
+        start = time.perf_counter()
+        store = build_memmap(memmap_dir, args.users, args.entries, args.dim)
+        print(f"memmap kurulum: {time.perf_counter() - start:.1f}s, disk: {_dir_size_mb(memmap_dir):.0f}MB")
+        measure("memmap", lambda u, q: [r["id"] for r in store.search(str(u), q, args.k)], queries, args.k)
+
+        if not args.skip_chroma:
+            chroma_dir = os.path.join(workdir, "chroma")
+            start = time.perf_counter()
+            collection = build_chroma(chroma_dir, args.users, args.entries, args.dim)
+            print(f"chroma kurulum: {time.perf_counter() - start:.1f}s, disk: {_dir_size_mb(chroma_dir):.0f}MB")
+            measure(
+                "chroma",
+                lambda u, q: collection.query(
+                    query_embeddings=[q], n_results=args.k, where={"user_id": str(u)}, include=[]
+                )["ids"][0],
+                queries,
+                args.k,
+            )
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
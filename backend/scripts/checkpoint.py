@@ -0,0 +1,60 @@
+"""
+Script Checkpoint Yardımcısı
+Uzun süren toplu işlerin (yeniden analiz, indeksleme) kaldığı yerden devam edebilmesi için
+JSON tabanlı, atomik yazılan ilerleme dosyası.
+"""
+
+import os
+import json
+import logging
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class JsonCheckpoint:
+    """Basit anahtar/değer checkpoint dosyası (os.replace ile atomik kayıt)"""
+
+    def __init__(self, path: str, job_key: Optional[Dict[str, Any]] = None):
+        self.path = path
+        self.job_key = job_key or {}
+        self.state: Dict[str, Any] = {}
+
+    def load(self, reset: bool = False) -> Dict[str, Any]:
+        """Checkpoint'i yükler. İş parametreleri farklıysa baştan başlar."""
+        if reset or not os.path.exists(self.path):
+            self.state = {}
+            return self.state
+
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"Checkpoint okunamadı, baştan başlanıyor: {e}")
+            self.state = {}
+            return self.state
+
+        if data.get("job_key") != self.job_key:
+            logger.warning("Checkpoint farklı parametrelerle oluşturulmuş, baştan başlanıyor")
+            self.state = {}
+        else:
+            self.state = data.get("state", {})
+        return self.state
+
+    def save(self, **updates: Any) -> None:
+        """Durumu günceller ve diske atomik olarak yazar."""
+        self.state.update(updates)
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"job_key": self.job_key, "state": self.state}, f, ensure_ascii=False, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+
+    def clear(self) -> None:
+        """İş tamamlandığında checkpoint dosyasını siler."""
+        self.state = {}
+        if os.path.exists(self.path):
+            os.remove(self.path)
@@ -0,0 +1,449 @@
+"""
+ChromaDB Bakım CLI
+`chroma_db/` dizini için yedekleme, sıkıştırma, bütünlük kontrolü ve boyut raporu.
+
+Alt komutlar:
+    stats     Koleksiyon başına vektör sayısı ve diskteki bayt boyutu (vektör segmenti +
+              paylaşılan chroma.sqlite3 + yan depolar)
+    snapshot  Anlık yedek: SQLite dosyaları sqlite3 backup API'si ile (yazmalar sürerken de
+              tutarlı), HNSW segment dizinleri dosya kopyasıyla alınır; manifest.json'a
+              koleksiyon sayıları ve alias'lar yazılır. HNSW dosyaları Chroma tarafından
+              periyodik olarak diske yazıldığından tam nokta-zaman yedeği için API yazmaları
+              (ve arka plan indeksleyici) durdurulmalıdır.
+    compact   WAL checkpoint + VACUUM (chroma.sqlite3 ve yan depolar); `--drop-unaliased` ile
+              alias dosyasında geçmeyen eski gölge koleksiyonları siler. Süren bir
+              `reindex_chroma.py` işinin checkpoint'indeki gölgeler ve `--min-age-hours`'tan
+              yeni koleksiyonlar korunur. HNSW'deki silinmiş öğelerin yeri ancak
+              `reindex_chroma.py` ile geri kazanılır.
+    orphans   user_entries / analysis_results vektörlerini SQL `entries` / `analyses`
+              tablolarıyla karşılaştırır; `--delete` ile yetimleri batch'ler halinde siler
+              (kalıp özetleri, BM25 indeksi, komşu listeleri ve kullanıcı vektör dosyaları da güncellenir).
+
+Kullanım:
+    python scripts/chroma_maintenance.py stats
+    python scripts/chroma_maintenance.py snapshot --dest ./backups --archive
+    python scripts/chroma_maintenance.py compact --drop-unaliased
+    python scripts/chroma_maintenance.py orphans --delete --batch-size 500
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import sqlite3
+import argparse
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+# Backend root dizinini ekle
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.chroma_service import ALIASES_FILE, COLLECTIONS, create_chroma_client, open_side_stores, read_aliases
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+CHROMA_SQLITE = "chroma.sqlite3"
+# reindex_chroma.py gölge adlarının zaman damgası: <mantıksal>__20240101T120000
+SHADOW_STAMP_FORMAT = "%Y%m%dT%H%M%S"
+
+# Mantıksal koleksiyon -> SQL satır kimliğini taşıyan metadata alanı
+ORPHAN_TARGETS = {
+    "user_entries": "entry_id",
+    "analysis_results": "analysis_id",
+}
+
+
+# -----------------------------------------------------------------------------
+# Yardımcılar
+# -----------------------------------------------------------------------------
+class MaintenanceContext:
+    """Bakım komutları için Chroma client'ı, alias eşlemesi ve yan depolar.
+
+    ChromaService kullanılmaz: komutlar vektör üretmediği için embedding modeli (~500 MB)
+    yüklenmez. Yan depolar yalnızca `orphans --delete` ihtiyaç duyduğunda açılır.
+    """
+
+    def __init__(self, persist_directory: str):
+        self.persist_directory = persist_directory
+        self.client, self.chroma_mode = create_chroma_client(persist_directory)
+        self._stores: Optional[Dict[str, Any]] = None
+
+    def load_aliases(self) -> Dict[str, str]:
+        return read_aliases(self.persist_directory)
+
+    def get_collection(self, logical_name: str):
+        """Alias'ın gösterdiği fiziksel koleksiyon (embedding fonksiyonsuz; yalnızca get/count/delete)"""
+        return self.client.get_collection(name=self.load_aliases().get(logical_name, logical_name))
+
+    def drop_collection(self, physical_name: str) -> None:
+        self.client.delete_collection(name=physical_name)
+
+    def _store(self, name: str):
+        if self._stores is None:
+            self._stores = open_side_stores(self.persist_directory)
+        return self._stores[name]
+
+    @property
+    def pattern_store(self):
+        return self._store("pattern_store")
+
+    @property
+    def keyword_index(self):
+        return self._store("keyword_index")
+
+    @property
+    def neighbor_store(self):
+        return self._store("neighbor_store")
+
+    @property
+    def user_vectors(self):
+        return self._store("user_vectors")
+
+
+def _path_size(path: str) -> int:
+    if os.path.isfile(path):
+        return os.path.getsize(path)
+    total = 0
+    for root, _, files in os.walk(path):
+        total += sum(os.path.getsize(os.path.join(root, name)) for name in files)
+    return total
+
+
+def _human(size: float) -> str:
+    for unit in ("B", "KB", "MB"):
+        if size < 1024:
+            return f"{size:.1f}{unit}"
+        size /= 1024
+    return f"{size:.1f}GB"
+
+
+def _sqlite_files(directory: str) -> List[str]:
+    """Chroma dizinindeki SQLite dosyaları (chroma.sqlite3 + yan depolar, alt dizinler dahil)"""
+    found = []
+    for root, _, files in os.walk(directory):
+        found.extend(os.path.join(root, name) for name in files if name.endswith((".sqlite3", ".sqlite")))
+    return sorted(found)
+
+
+def _collection_names(chroma) -> List[str]:
+    # chromadb 0.6+ isim listesi, 1.x Collection nesneleri döndürebilir
+    return [c if isinstance(c, str) else c.name for c in chroma.client.list_collections()]
+
+
+def _vector_segment_dirs(persist_directory: str) -> Dict[str, List[str]]:
+    """Fiziksel koleksiyon adı -> HNSW segment dizinleri (chroma.sqlite3 şemasından)"""
+    segments: Dict[str, List[str]] = {}
+    try:
+        conn = sqlite3.connect(f"file:{os.path.join(persist_directory, CHROMA_SQLITE)}?mode=ro", uri=True)
+        try:
+            rows = conn.execute(
+                "SELECT c.name, s.id FROM segments s JOIN collections c ON c.id = s.collection "
+                "WHERE s.scope = 'VECTOR'"
+            ).fetchall()
+        finally:
+            conn.close()
+    except sqlite3.Error as e:
+        logger.warning(f"Segment tablosu okunamadı, koleksiyon boyutları hesaplanamayacak: {e}")
+        return segments
+    for name, segment_id in rows:
+        path = os.path.join(persist_directory, segment_id)
+        if os.path.isdir(path):
+            segments.setdefault(name, []).append(path)
+    return segments
+
+
+# -----------------------------------------------------------------------------
+# stats
+# -----------------------------------------------------------------------------
+def collect_stats(chroma) -> Dict[str, Any]:
+    persist_directory = chroma.persist_directory
+    aliases = chroma.load_aliases()
+    segment_dirs = _vector_segment_dirs(persist_directory)
+
+    collections = {}
+    for name in _collection_names(chroma):
+        logical = next((l for l in COLLECTIONS if aliases.get(l, l) == name), None)
+        collections[name] = {
+            "logical_name": logical,
+            "vectors": chroma.client.get_collection(name=name).count(),
+            "vector_bytes": sum(_path_size(path) for path in segment_dirs.get(name, [])),
+        }
+
+    return {
+        "persist_directory": persist_directory,
+        "collections": collections,
+        "chroma_sqlite_bytes": _path_size(os.path.join(persist_directory, CHROMA_SQLITE)),
+        "side_stores": {
+            os.path.relpath(path, persist_directory): _path_size(path)
+            for path in _sqlite_files(persist_directory)
+            if os.path.basename(path) != CHROMA_SQLITE
+        },
+        "total_bytes": _path_size(persist_directory),
+    }
+
+
+def cmd_stats(chroma, args) -> None:
+    stats = collect_stats(chroma)
+    if args.json:
+        print(json.dumps(stats, ensure_ascii=False, indent=2))
+        return
+
+    print(f"Dizin: {stats['persist_directory']}  (toplam {_human(stats['total_bytes'])})")
+    print(f"{'koleksiyon':<45} {'mantıksal':<20} {'vektör':>10} {'HNSW':>10}")
+    for name, info in sorted(stats["collections"].items()):
+        print(f"{name:<45} {info['logical_name'] or '-':<20} {info['vectors']:>10} {_human(info['vector_bytes']):>10}")
+    print(f"{CHROMA_SQLITE:<45} {'(metadata/doküman)':<20} {'':>10} {_human(stats['chroma_sqlite_bytes']):>10}")
+    for name, size in sorted(stats["side_stores"].items()):
+        print(f"{name:<45} {'(yan depo)':<20} {'':>10} {_human(size):>10}")
+
+
+# -----------------------------------------------------------------------------
+# snapshot
+# -----------------------------------------------------------------------------
+def cmd_snapshot(chroma, args) -> None:
+    source = chroma.persist_directory
+    target = os.path.join(args.dest, f"chroma_snapshot_{time.strftime('%Y%m%dT%H%M%S')}")
+    os.makedirs(target)
+
+    sqlite_files = set(_sqlite_files(source))
+    for path in sqlite_files:
+        # backup API okuyucu/yazıcıları durdurmadan tutarlı bir kopya üretir
+        destination = os.path.join(target, os.path.relpath(path, source))
+        os.makedirs(os.path.dirname(destination), exist_ok=True)
+        src = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+        dst = sqlite3.connect(destination)
+        try:
+            src.backup(dst)
+        finally:
+            dst.close()
+            src.close()
+
+    skipped_suffixes = ("-wal", "-shm", ".tmp")
+    for root, _, files in os.walk(source):
+        for name in files:
+            path = os.path.join(root, name)
+            if path in sqlite_files or name.endswith(skipped_suffixes):
+                continue
+            destination = os.path.join(target, os.path.relpath(path, source))
+            os.makedirs(os.path.dirname(destination), exist_ok=True)
+            shutil.copy2(path, destination)
+
+    manifest = {
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "source": source,
+        "aliases": chroma.load_aliases(),
+        "collections": {name: info["vectors"] for name, info in collect_stats(chroma)["collections"].items()},
+    }
+    with open(os.path.join(target, "manifest.json"), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+
+    if args.archive:
+        archive = shutil.make_archive(target, "gztar", root_dir=args.dest, base_dir=os.path.basename(target))
+        shutil.rmtree(target)
+        target = archive
+    logger.info(f"Yedek alındı: {target} ({_human(_path_size(target))})")
+
+
+# -----------------------------------------------------------------------------
+# compact
+# -----------------------------------------------------------------------------
+def reindex_shadows(checkpoint_path: str) -> Set[str]:
+    """Süren (ya da yarıda kalmış) reindex işinin checkpoint'teki gölge koleksiyonları"""
+    try:
+        with open(checkpoint_path, "r", encoding="utf-8") as f:
+            state = json.load(f).get("state", {})
+    except FileNotFoundError:
+        return set()
+    except (OSError, json.JSONDecodeError) as e:
+        raise SystemExit(f"Reindex checkpoint'i okunamadı ({checkpoint_path}): {e}")
+    return {name for name in (state.get("shadows") or {}).values() if name}
+
+
+def droppable_collections(
+    names: Iterable[str],
+    live: Set[str],
+    protected: Set[str],
+    min_age: timedelta,
+    now: Optional[datetime] = None,
+) -> List[str]:
+    """Silinebilecek gölge koleksiyonlar: alias'sız, checkpoint'te olmayan ve yeterince eski"""
+    now = now or datetime.now()
+    droppable = []
+    for name in names:
+        logical, _, stamp = name.partition("__")
+        if name in live or logical not in COLLECTIONS:
+            continue
+        if not stamp:
+            # İlk swap'tan kalan asıl koleksiyon; reindex gölgesi olamaz
+            droppable.append(name)
+            continue
+        if name in protected:
+            logger.info(f"Süren reindex'in gölge koleksiyonu korundu: {name}")
+            continue
+        try:
+            created = datetime.strptime(stamp, SHADOW_STAMP_FORMAT)
+        except ValueError:
+            logger.warning(f"Zaman damgası çözülemeyen koleksiyon atlandı: {name}")
+            continue
+        if now - created < min_age:
+            logger.info(f"Yeni gölge koleksiyon korundu ({created:%Y-%m-%d %H:%M}): {name}")
+            continue
+        droppable.append(name)
+    return droppable
+
+
+def cmd_compact(chroma, args) -> None:
+    persist_directory = chroma.persist_directory
+    before = _path_size(persist_directory)
+
+    if args.drop_unaliased:
+        aliases = chroma.load_aliases()
+        live = {aliases.get(name, name) for name in COLLECTIONS}
+        protected = reindex_shadows(args.reindex_checkpoint)
+        min_age = timedelta(hours=args.min_age_hours)
+        for name in droppable_collections(_collection_names(chroma), live, protected, min_age):
+            chroma.drop_collection(name)
+            logger.info(f"Kullanılmayan gölge koleksiyon silindi: {name}")
+
+    for path in _sqlite_files(persist_directory):
+        conn = sqlite3.connect(path, timeout=30)
+        try:
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            conn.execute("VACUUM")
+            logger.info(f"VACUUM: {os.path.relpath(path, persist_directory)}")
+        except sqlite3.OperationalError as e:
+            # Çalışan API süreci yazma kilidini tutuyor olabilir
+            logger.warning(f"{path} sıkıştırılamadı: {e}")
+        finally:
+            conn.close()
+
+    after = _path_size(persist_directory)
+    logger.info(f"Sıkıştırma tamamlandı: {_human(before)} -> {_human(after)}")
+
+
+# -----------------------------------------------------------------------------
+# orphans
+# -----------------------------------------------------------------------------
+def _existing_ids(db, model, ids: Iterable[int], chunk_size: int = 1000) -> Set[int]:
+    ids = list(ids)
+    found: Set[int] = set()
+    for start in range(0, len(ids), chunk_size):
+        chunk = ids[start:start + chunk_size]
+        found.update(row[0] for row in db.query(model.id).filter(model.id.in_(chunk)).all())
+    return found
+
+
+def find_orphans(chroma, db, logical_name: str, page_size: int) -> List[Dict[str, Any]]:
+    """Kimliği SQL tablosunda olmayan (ya da kimlik alanı bozuk) vektörler"""
+    from models import Analysis, Entry
+
+    model = Entry if logical_name == "user_entries" else Analysis
+    field = ORPHAN_TARGETS[logical_name]
+    collection = chroma.get_collection(logical_name)
+
+    candidates: List[Dict[str, Any]] = []
+    total = collection.count()
+    for offset in range(0, total, page_size):
+        page = collection.get(limit=page_size, offset=offset, include=["metadatas"])
+        for vector_id, metadata in zip(page["ids"], page["metadatas"]):
+            metadata = metadata or {}
+            try:
+                sql_id = int(metadata.get(field))
+            except (TypeError, ValueError):
+                sql_id = None
+            candidates.append({"id": vector_id, "sql_id": sql_id, "user_id": metadata.get("user_id")})
+
+    existing = _existing_ids(db, model, {c["sql_id"] for c in candidates if c["sql_id"] is not None})
+    return [c for c in candidates if c["sql_id"] is None or c["sql_id"] not in existing]
+
+
+def delete_orphans(chroma, logical_name: str, orphans: List[Dict[str, Any]], batch_size: int) -> None:
+    collection = chroma.get_collection(logical_name)
+    for start in range(0, len(orphans), batch_size):
+        batch = orphans[start:start + batch_size]
+        collection.delete(ids=[orphan["id"] for orphan in batch])
+
+        # Yan depolar Chroma'dan türetildiği için aynı kayıtlar oradan da düşülür
+        vector_ids: Dict[str, List[str]] = {}
+        for orphan in batch:
+            user_id = str(orphan["user_id"]) if orphan["user_id"] is not None else None
+            if user_id is None:
+                continue
+            if logical_name == "analysis_results" and orphan["sql_id"] is not None:
+                chroma.pattern_store.remove(user_id, str(orphan["sql_id"]))
+            if logical_name == "user_entries":
+                chroma.keyword_index.remove(user_id, orphan["id"])
+                if chroma.neighbor_store is not None and orphan["sql_id"] is not None:
+                    chroma.neighbor_store.remove(user_id, str(orphan["sql_id"]))
+                vector_ids.setdefault(user_id, []).append(orphan["id"])
+        if chroma.user_vectors is not None:
+            for user_id, ids in vector_ids.items():
+                chroma.user_vectors.remove_many(user_id, ids)
+        logger.info(f"{logical_name}: {min(start + batch_size, len(orphans))}/{len(orphans)} yetim silindi")
+
+
+def cmd_orphans(chroma, args) -> None:
+    from database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        for logical_name in args.collections:
+            orphans = find_orphans(chroma, db, logical_name, args.page_size)
+            logger.info(f"{logical_name}: {len(orphans)} yetim vektör")
+            for orphan in orphans[:args.show]:
+                logger.info(f"  {orphan['id']} (sql_id={orphan['sql_id']}, user_id={orphan['user_id']})")
+            if args.delete and orphans:
+                delete_orphans(chroma, logical_name, orphans, args.batch_size)
+    finally:
+        db.close()
+
+
+# -----------------------------------------------------------------------------
+# Ana akış
+# -----------------------------------------------------------------------------
+def main():
+    parser = argparse.ArgumentParser(description="ChromaDB yedekleme, sıkıştırma ve bütünlük araçları")
+    parser.add_argument("--persist-directory", default=os.path.join(os.getcwd(), "chroma_db"), help="ChromaService ile aynı dizin")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    stats = subparsers.add_parser("stats", help="Koleksiyon başına vektör sayısı ve boyut")
+    stats.add_argument("--json", action="store_true", help="JSON çıktı")
+
+    snapshot = subparsers.add_parser("snapshot", help="chroma_db dizininin tutarlı yedeği")
+    snapshot.add_argument("--dest", default="./chroma_backups", help="Yedeklerin yazılacağı dizin")
+    snapshot.add_argument("--archive", action="store_true", help="Yedeği .tar.gz olarak sıkıştır")
+
+    compact = subparsers.add_parser("compact", help="WAL checkpoint + VACUUM")
+    compact.add_argument("--drop-unaliased", action="store_true", help=f"{ALIASES_FILE} dışında kalan eski gölge koleksiyonları sil")
+    compact.add_argument("--reindex-checkpoint", default=".reindex_chroma_checkpoint.json", help="Gölgeleri korunacak reindex_chroma.py checkpoint dosyası")
+    compact.add_argument("--min-age-hours", type=float, default=24.0, help="Bundan yeni gölge koleksiyonları silme")
+
+    orphans = subparsers.add_parser("orphans", help="SQL tablolarında karşılığı olmayan vektörler")
+    orphans.add_argument("--collections", nargs="+", choices=sorted(ORPHAN_TARGETS), default=sorted(ORPHAN_TARGETS))
+    orphans.add_argument("--page-size", type=int, default=1000, help="Chroma'dan tek seferde okunan kayıt")
+    orphans.add_argument("--batch-size", type=int, default=500, help="Tek delete çağrısındaki kayıt")
+    orphans.add_argument("--show", type=int, default=10, help="Listelenecek örnek yetim sayısı")
+    orphans.add_argument("--delete", action="store_true", help="Yetimleri sil (varsayılan: sadece raporla)")
+
+    args = parser.parse_args()
+    chroma = MaintenanceContext(args.persist_directory)
+    if chroma.chroma_mode == "http" and args.command in ("stats", "snapshot", "compact"):
+        # Vektörler ve chroma.sqlite3 Chroma sunucusunun `--path` dizinindedir; buradaki dosya
+        # işlemleri yalnızca yerel alias dosyası ve yan depoları kapsar
+        logger.warning(
+            f"CHROMA_MODE=http: {args.command} yalnızca {chroma.persist_directory} içindeki yerel dosyaları kapsar; "
+            "sunucu dizini için komutu sunucu makinesinde CHROMA_MODE=embedded ile (sunucu durdurulmuşken) çalıştırın"
+        )
+    {
+        "stats": cmd_stats,
+        "snapshot": cmd_snapshot,
+        "compact": cmd_compact,
+        "orphans": cmd_orphans,
+    }[args.command](chroma, args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Paylaşılan Embedding Sunucusu
+Çok worker'lı gunicorn kurulumunda MiniLM modelini tek süreçte yükler; API worker'ları
+EMBEDDING_BACKEND=remote ile metinleri buraya gönderir ve modeli kendileri yüklemez.
+Farklı worker'lardan eşzamanlı gelen istekler QueryBatcher ile tek forward pass'te
+birleştirilir. Vektörler ham float32 bayt (satır sırası istekteki metin sırası) döner.
+
+Sunucunun kendisi EMBEDDING_BACKEND (torch / onnx / onnx-int8) ile yerel modeli seçer;
+`remote` burada geçersizdir.
+
+Kullanım:
+    python scripts/embedding_server.py --port 8790 --backend onnx-int8
+    EMBEDDING_BACKEND=remote EMBEDDING_SERVER_URL=http://127.0.0.1:8790 gunicorn main:app ...
+"""
+
+import os
+import sys
+import queue
+import asyncio
+import argparse
+import logging
+from typing import List
+
+import numpy as np
+import uvicorn
+from fastapi import FastAPI, HTTPException
+from fastapi.responses import Response
+from pydantic import BaseModel
+
+# Backend root dizinini ekle
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.embedding_backends import EMBEDDING_MODEL_NAME, create_embedding_function
+from services.query_batcher import QueryBatcher
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class EmbedRequest(BaseModel):
+    texts: List[str]
+
+
+def create_app(backend: str, window_ms: float, max_batch: int, max_queue: int) -> FastAPI:
+    if backend == "remote":
+        raise ValueError("Embedding sunucusu remote backend ile çalıştırılamaz")
+    embedding_function = create_embedding_function(backend=backend, model_name=EMBEDDING_MODEL_NAME)
+    dim = len(embedding_function(["ısınma"])[0])
+
+    def _embed_batch(items: List[List[str]]) -> List[bytes]:
+        """Her istek bir metin listesidir; hepsi tek çağrıda embed edilip isteklere geri bölünür"""
+        texts = [text for item in items for text in item]
+        matrix = np.asarray(embedding_function(texts), dtype=np.float32).reshape(len(texts), dim)
+        results, offset = [], 0
+        for item in items:
+            results.append(matrix[offset:offset + len(item)].tobytes())
+            offset += len(item)
+        return results
+
+    batcher = QueryBatcher(_embed_batch, window_ms=window_ms, max_batch=max_batch, max_queue=max_queue, name="embedding-server")
+
+    app = FastAPI(title="Embedding Server")
+
+    @app.get("/health")
+    async def health():
+        return {"model": EMBEDDING_MODEL_NAME, "backend": backend, "dim": dim, "batcher": batcher.get_stats()}
+
+    @app.post("/embed")
+    async def embed(request: EmbedRequest):
+        if not request.texts:
+            return Response(content=b"", media_type="application/octet-stream")
+        try:
+            future = batcher.submit(request.texts)
+        except queue.Full:
+            raise HTTPException(status_code=503, detail="Embedding kuyruğu dolu")
+        try:
+            payload = await asyncio.wrap_future(future)
+        except Exception as e:
+            logger.error(f"Embedding hatası: {e}")
+            raise HTTPException(status_code=500, detail="Embedding hesaplanamadı")
+        return Response(content=payload, media_type="application/octet-stream")
+
+    @app.on_event("shutdown")
+    def _stop_batcher():
+        batcher.stop()
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="API worker'larının paylaştığı embedding sunucusu")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8790)
+    parser.add_argument("--backend", default=os.getenv("EMBEDDING_BACKEND", "torch"), help="torch / onnx / onnx-int8")
+    parser.add_argument("--window-ms", type=float, default=5.0, help="İstekleri tek forward pass'te toplama penceresi")
+    parser.add_argument("--max-batch", type=int, default=32, help="Tek batch'teki en fazla istek")
+    parser.add_argument("--max-queue", type=int, default=512)
+    args = parser.parse_args()
+
+    app = create_app(args.backend.strip().lower(), args.window_ms, args.max_batch, args.max_queue)
+    logger.info(f"Embedding sunucusu: http://{args.host}:{args.port} ({args.backend})")
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+Giriş Embedding PCA Eğitimi ve Recall/Bellek Raporu
+user_entries koleksiyonundaki tam boyutlu vektörlerden örnek alır, farklı PCA boyutlarını
+ve float16 saklamayı tam hassasiyetli (float32, 384 boyut) aramaya göre karşılaştırır:
+recall@k, vektör başına bayt, 1M vektör için tahmini HNSW belleği. `--save-dim` verilirse
+o boyuttaki projeksiyon ENTRY_PCA_PATH (varsayılan chroma_db/entry_pca.npz) dosyasına yazılır.
+
+Sorgular örnekten ayrılan (eğitime girmeyen) vektörlerdir. Koleksiyonda yeterli giriş yoksa
+`--synthetic` ile bench_utils metinleri embed edilir.
+
+Devreye alma:
+    python scripts/fit_entry_pca.py --save-dim 128
+    ENTRY_EMBEDDING_TRANSFORM=pca python scripts/reindex_chroma.py --collections entries
+
+Kullanım:
+    python scripts/fit_entry_pca.py                          # sadece rapor (64/128/192)
+    python scripts/fit_entry_pca.py --dims 96 128 --sample 50000 --k 10
+    python scripts/fit_entry_pca.py --synthetic 20000 --save-dim 128
+"""
+
+import os
+import sys
+import argparse
+import logging
+
+import numpy as np
+
+# Backend root dizinini ekle
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.chroma_service import get_chroma_service
+from services.embedding_transform import DEFAULT_PCA_FILE, fit_pca
+from scripts.bench_utils import synthetic_entries
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# HNSW level-0 katmanında vektör başına bağlantı listesi (M=16 varsayılanı: 2*M adet int32)
+HNSW_LINK_BYTES = 2 * 16 * 4
+
+
+def load_sample(service, sample: int, synthetic: int) -> np.ndarray:
+    if synthetic:
+        texts = synthetic_entries(synthetic)
+        return np.asarray(service._embed(texts), dtype=np.float32)
+    results = service.entries_collection.get(limit=sample, include=["embeddings"])
+    return np.asarray(results["embeddings"], dtype=np.float32)
+
+
+def exact_top_k(base: np.ndarray, queries: np.ndarray, k: int) -> np.ndarray:
+    """L2 mesafesine göre tam top-k (Chroma varsayılan uzayı)"""
+    norms = (base ** 2).sum(axis=1)
+    scores = norms[None, :] - 2 * (queries @ base.T)
+    return np.argpartition(scores, k - 1, axis=1)[:, :k]
+
+
+def recall(truth: np.ndarray, found: np.ndarray) -> float:
+    k = truth.shape[1]
+    return float(np.mean([len(set(t) & set(f)) / k for t, f in zip(truth, found)]))
+
+
+def report_row(label: str, dim: int, bytes_per_value: int, recall_at_k: float, full_bytes: int) -> None:
+    vector_bytes = dim * bytes_per_value
+    index_mb = (vector_bytes + HNSW_LINK_BYTES) * 1_000_000 / (1024 * 1024)
+    saved = 1 - (vector_bytes + HNSW_LINK_BYTES) / (full_bytes + HNSW_LINK_BYTES)
+    print(f"{label:<16} {dim:>5} {vector_bytes:>8}B {index_mb:>9.0f}MB {saved * 100:>8.1f}% {recall_at_k:>9.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="user_entries için PCA projeksiyonu öğrenir ve recall/bellek raporlar")
+    parser.add_argument("--dims", type=int, nargs="+", default=[64, 128, 192], help="Değerlendirilecek PCA boyutları")
+    parser.add_argument("--save-dim", type=int, default=0, help="Bu boyuttaki projeksiyonu kaydet (0: kaydetme)")
+    parser.add_argument("--sample", type=int, default=20000, help="Koleksiyondan okunacak en fazla vektör")
+    parser.add_argument("--synthetic", type=int, default=0, help="Koleksiyon yerine N sentetik metni embed et")
+    parser.add_argument("--queries", type=int, default=500, help="Eğitimden ayrılan sorgu vektörü sayısı")
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--output", default=None, help="PCA dosyası (varsayılan: ENTRY_PCA_PATH veya chroma_db/entry_pca.npz)")
+    args = parser.parse_args()
+
+    service = get_chroma_service()
+    if service.entry_transform is not None:
+        logger.error("ENTRY_EMBEDDING_TRANSFORM=pca açık; tam boyutlu vektörler için dönüşüm kapalıyken çalıştırın")
+        sys.exit(1)
+
+    vectors = load_sample(service, args.sample, args.synthetic)
+    if len(vectors) <= args.queries + max(args.dims + [args.save_dim]):
+        logger.error(f"Yetersiz örnek ({len(vectors)} vektör); --synthetic ile sentetik veri kullanın")
+        sys.exit(1)
+
+    rng = np.random.default_rng(42)
+    order = rng.permutation(len(vectors))
+    queries, base = vectors[order[:args.queries]], vectors[order[args.queries:]]
+    full_dim = base.shape[1]
+    full_bytes = full_dim * 4
+    truth = exact_top_k(base, queries, args.k)
+
+    print(f"{len(base)} vektör, {len(queries)} sorgu, boyut {full_dim}")
+    print(f"{'saklama':<16} {'boyut':>5} {'vektör':>9} {'1M HNSW':>11} {'tasarruf':>9} {'recall@' + str(args.k):>9}")
+    report_row("float32", full_dim, 4, 1.0, full_bytes)
+
+    half_base, half_queries = base.astype(np.float16).astype(np.float32), queries.astype(np.float16).astype(np.float32)
+    report_row("float16*", full_dim, 2, recall(truth, exact_top_k(half_base, half_queries, args.k)), full_bytes)
+
+    transforms = {}
+    for dim in sorted(set(args.dims + ([args.save_dim] if args.save_dim else []))):
+        transform = fit_pca(base, dim)
+        transforms[dim] = transform
+        found = exact_top_k(transform.apply(base), transform.apply(queries), args.k)
+        variance = float(transform.explained_variance_ratio.sum()) * 100
+        report_row(f"pca (%{variance:.0f} var)", dim, 4, recall(truth, found), full_bytes)
+
+    print("* float16 yalnızca SIMILAR_ENTRIES_BACKEND=memmap dosyalarında geçerlidir; Chroma HNSW float32 saklar.")
+    print(f"  1M HNSW sütunu vektör + level-0 bağlantıları ({HNSW_LINK_BYTES}B, M=16) içindir.")
+
+    if args.save_dim:
+        path = args.output or os.getenv("ENTRY_PCA_PATH") or os.path.join(service.persist_directory, DEFAULT_PCA_FILE)
+        transforms[args.save_dim].save(path)
+        logger.info(f"PCA ({full_dim} -> {args.save_dim}) kaydedildi: {path}")
+        logger.info("Devreye almak için: ENTRY_EMBEDDING_TRANSFORM=pca python scripts/reindex_chroma.py --collections entries")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+OpenAI Uyumlu Yerel Stand-in Sunucu
+Hedging ve yük testleri için gecikme enjekte edilebilen sahte /v1/chat/completions endpoint'i.
+
+Kullanım:
+    python scripts/llm_standin_server.py --port 8787 --latency-ms 400 --slow-rate 0.05 --slow-ms 4000
+    OPENAI_BASE_URL=http://127.0.0.1:8787/v1 OPENAI_API_KEY=test python scripts/benchmark_hedging.py
+"""
+
+import json
+import time
+import uuid
+import random
+import asyncio
+import argparse
+import logging
+
+import uvicorn
+from fastapi import FastAPI, Request
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Sabit analiz yanıtı (AnalysisResult şemasına uygun)
+CANNED_ANALYSIS = {
+    "distortions": [
+        {
+            "type": "Felaketleştirme",
+            "sentence": "Bu işi kaybedeceğim ve hiçbir yerde iş bulamayacağım.",
+            "explanation": "Bu düşünce şu nedenle çarpıtmadır: en kötü senaryoyu kesin kabul ediyorsun.",
+            "alternative": "Zor bir gün geçirdim ama bu işimi kaybedeceğim anlamına gelmiyor.",
+            "severity": "orta",
+            "confidence": 0.85
+        }
+    ],
+    "risk_level": "düşük",
+    "recommendations": ["Şu ana odaklanmayı dene."]
+}
+
+
+def create_app(latency_ms: float, jitter: float, slow_rate: float, slow_ms: float) -> FastAPI:
+    app = FastAPI(title="LLM Stand-in")
+    app.state.requests = 0
+
+    def _sample_latency() -> float:
+        if random.random() < slow_rate:
+            return slow_ms / 1000.0
+        return max(0.0, random.lognormvariate(0, jitter) * latency_ms / 1000.0)
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        app.state.requests += 1
+        await asyncio.sleep(_sample_latency())
+
+        payload = json.dumps(CANNED_ANALYSIS, ensure_ascii=False)
+        message = {"role": "assistant", "content": payload}
+        finish_reason = "stop"
+
+        # with_structured_output function calling ile çağırır
+        tools = body.get("tools") or []
+        if tools:
+            message = {
+                "role": "assistant",
+                "content": None,
+                "tool_calls": [{
+                    "id": f"call_{uuid.uuid4().hex[:12]}",
+                    "type": "function",
+                    "function": {"name": tools[0]["function"]["name"], "arguments": payload},
+                }],
+            }
+            finish_reason = "tool_calls"
+
+        return {
+            "id": f"chatcmpl-{uuid.uuid4().hex}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "standin"),
+            "choices": [{"index": 0, "message": message, "finish_reason": finish_reason}],
+            "usage": {"prompt_tokens": 420, "completion_tokens": 180, "total_tokens": 600},
+        }
+
+    @app.get("/stats")
+    async def stats():
+        return {"requests": app.state.requests}
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="OpenAI uyumlu gecikme enjekte eden stand-in sunucu")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8787)
+    parser.add_argument("--latency-ms", type=float, default=400, help="Medyan gecikme (ms)")
+    parser.add_argument("--jitter", type=float, default=0.25, help="Lognormal sigma")
+    parser.add_argument("--slow-rate", type=float, default=0.05, help="Yavaş yanıt olasılığı (0-1)")
+    parser.add_argument("--slow-ms", type=float, default=4000, help="Yavaş yanıt gecikmesi (ms)")
+    args = parser.parse_args()
+
+    logger.info(
+        f"Stand-in sunucu: medyan {args.latency_ms}ms, %{args.slow_rate * 100:.1f} oranında {args.slow_ms}ms"
+    )
+    app = create_app(args.latency_ms, args.jitter, args.slow_rate, args.slow_ms)
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
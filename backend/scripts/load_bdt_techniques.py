@@ -1,6 +1,7 @@
 """
 BDT Tekniklerini ChromaDB'ye Yükler
 Bu script mevcut BDT_TECHNIQUES sözlüğündeki teknikleri ChromaDB'ye aktarır.
+Yazma upsert ile yapıldığından tekrar çalıştırmak güvenlidir (mevcut teknikler güncellenir).
 """
 
 import os
@@ -26,30 +27,22 @@ async def load_bdt_techniques():
         
         logger.info("BDT teknikleri ChromaDB'ye yükleniyor...")
         
-        total_techniques = 0
-        loaded_techniques = 0
-        
-        # Her çarpıtma türü için
+        # Tüm teknikleri tek listede topla
+        techniques = []
         for distortion_type, distortion_data in BDT_TECHNIQUES.items():
             logger.info(f"İşleniyor: {distortion_data['name']}")
             
-            # Her teknik için
             for idx, technique in enumerate(distortion_data['techniques']):
-                technique_id = f"{distortion_type}_{idx}"
-                total_techniques += 1
-                
-                # ChromaDB'ye ekle
-                success = await chroma_service.add_therapy_technique(
-                    technique_id=technique_id,
-                    technique_data=technique,
-                    distortion_type=distortion_type
-                )
-                
-                if success:
-                    loaded_techniques += 1
-                    logger.info(f"{technique['title']} -> ChromaDB")
-                else:
-                    logger.error(f"{technique['title']} -> Hata!")
+                techniques.append({
+                    "technique_id": f"{distortion_type}_{idx}",
+                    "technique_data": technique,
+                    "distortion_type": distortion_type
+                })
+        
+        total_techniques = len(techniques)
+        
+        # Tek embedding geçişi ve tek add çağrısı ile ChromaDB'ye ekle
+        loaded_techniques = await chroma_service.add_therapy_techniques_batch(techniques)
         
         logger.info(f"Özet: {loaded_techniques}/{total_techniques} teknik yüklendi")
         
@@ -0,0 +1,73 @@
+"""
+Giriş Metadata Geçişi
+Zaman/çarpıtma filtresi eklenmeden önce indekslenmiş user_entries kayıtlarına
+`created_at_ts` (epoch saniye) ve `dist_<tür>` boolean bayraklarını ekler. Sadece metadata
+güncellenir (collection.update); embedding yeniden hesaplanmaz. Bu alanlar olmayan
+girişler `since` / `until` / çarpıtma filtreli benzer giriş aramalarında eşleşmez.
+
+Kullanım:
+    python scripts/migrate_entry_metadata.py --dry-run
+    python scripts/migrate_entry_metadata.py --page-size 2000
+"""
+
+import os
+import sys
+import argparse
+import logging
+
+# Backend root dizinini ekle
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.chroma_service import get_chroma_service, to_epoch
+from taxonomy import distortion_flag
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def migrated_metadata(metadata):
+    """Eksik alanları eklenmiş metadata (değişiklik gerekmiyorsa None)"""
+    updated = dict(metadata)
+    if "created_at_ts" not in updated:
+        try:
+            updated["created_at_ts"] = to_epoch(updated.get("created_at") or 0)
+        except ValueError:
+            updated["created_at_ts"] = 0
+    for distortion_type in (updated.get("distortions") or "").split(","):
+        if distortion_type.strip():
+            updated[distortion_flag(distortion_type.strip())] = True
+    return updated if updated != metadata else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="user_entries metadata'sına zaman damgası ve çarpıtma bayrakları ekler")
+    parser.add_argument("--page-size", type=int, default=1000, help="Tek seferde okunan kayıt")
+    parser.add_argument("--dry-run", action="store_true", help="Sadece güncellenecek kayıtları say")
+    args = parser.parse_args()
+
+    collection = get_chroma_service().entries_collection
+    total = collection.count()
+    scanned = 0
+    updated = 0
+
+    # update sırayı değiştirmediği için offset ile sayfalama güvenlidir
+    for offset in range(0, total, args.page_size):
+        page = collection.get(limit=args.page_size, offset=offset, include=["metadatas"])
+        ids, metadatas = [], []
+        for entry_id, metadata in zip(page["ids"], page["metadatas"]):
+            new_metadata = migrated_metadata(metadata or {})
+            if new_metadata is not None:
+                ids.append(entry_id)
+                metadatas.append(new_metadata)
+
+        scanned += len(page["ids"])
+        if ids and not args.dry_run:
+            collection.update(ids=ids, metadatas=metadatas)
+        updated += len(ids)
+        logger.info(f"{scanned}/{total} tarandı, {updated} güncellen{'ecek' if args.dry_run else 'di'}")
+
+    logger.info(f"Tamamlandı: {updated} giriş {'güncellenecek' if args.dry_run else 'güncellendi'}")
+
+
+if __name__ == "__main__":
+    main()
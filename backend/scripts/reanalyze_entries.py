@@ -0,0 +1,299 @@
+"""
+Toplu Yeniden Analiz CLI
+SYSTEM_PROMPT veya OPENAI_MODEL değiştiğinde, farklı prompt/model sürümüyle üretilmiş
+Analysis satırlarını sınırlı eşzamanlılık ve hız limiti ile yeniden analiz eder.
+`--prompt-version` / `--model-version` ile yalnızca belirli bir eski sürümün satırları
+hedeflenebilir (`none`: sürümü boş satırlar); fallback prompt'uyla üretilmiş analizler
+(`<sürüm>-fallback`) güncel sayılmaz ve yeniden seçilir.
+
+Sonuçlar sayfa sayfa toplu olarak yazılır; ilerleme checkpoint dosyasına kaydedilir.
+Başarısız satırların ID'leri de checkpoint'te tutulur ve taramanın sonunda (ya da sonraki
+çalıştırmada) yeniden denenir.
+
+Yazılan her sayfa ChromaDB'ye de (analiz metadata'sı, çarpıtma bayrakları, kalıp sayaçları)
+aynı yazma yoluyla yeniden indekslenir. `--skip-index` verilirse ya da indeksleme başarısız
+olursa iş sonunda `scripts/backfill_analysis_index.py` çalıştırılmalıdır.
+
+Kullanım:
+    python scripts/reanalyze_entries.py --dry-run
+    python scripts/reanalyze_entries.py --concurrency 8 --rate 5 --batch-size 100
+    python scripts/reanalyze_entries.py --model gpt-4o --checkpoint .reanalyze.json
+    python scripts/reanalyze_entries.py --prompt-version 3f2a9c1b7e44 --limit 500
+    python scripts/reanalyze_entries.py --skip-index   # sonra: scripts/backfill_analysis_index.py
+"""
+
+import os
+import sys
+import time
+import asyncio
+import argparse
+import logging
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+# Backend root dizinini ekle
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import and_, or_
+
+from database import SessionLocal
+from models import Analysis, Entry
+from agents.cognitive_agent import CognitiveAnalysisAgent, PROMPT_VERSION, ANALYSIS_ERROR_MESSAGE
+from scripts.checkpoint import JsonCheckpoint
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class RateLimiter:
+    """Saniyedeki istek sayısını sınırlayan basit aralık tabanlı limiter"""
+
+    def __init__(self, rate_per_second: float):
+        self.interval = 1.0 / rate_per_second if rate_per_second > 0 else 0.0
+        self._next_slot = 0.0
+        self._lock = asyncio.Lock()
+
+    async def wait(self) -> None:
+        if not self.interval:
+            return
+        async with self._lock:
+            now = time.monotonic()
+            delay = self._next_slot - now
+            if delay > 0:
+                await asyncio.sleep(delay)
+                now = time.monotonic()
+            self._next_slot = max(now, self._next_slot) + self.interval
+
+
+def _version_filter(column, version: Optional[str]):
+    """Kaynak sürüm filtresi: `none` sürümü boş satırları seçer"""
+    if version is None:
+        return None
+    if version.lower() == "none":
+        return column.is_(None)
+    return column == version
+
+
+def _stale_filter(prompt_version: str, model: str, source_prompt: Optional[str] = None, source_model: Optional[str] = None):
+    """Hedef prompt/model sürümünden farklı (veya sürümsüz) satırlar; verilirse yalnızca kaynak sürümdekiler"""
+    conditions = [or_(
+        Analysis.prompt_version.is_(None),
+        Analysis.prompt_version != prompt_version,
+        Analysis.model_version.is_(None),
+        Analysis.model_version != model,
+    )]
+    for condition in (
+        _version_filter(Analysis.prompt_version, source_prompt),
+        _version_filter(Analysis.model_version, source_model),
+    ):
+        if condition is not None:
+            conditions.append(condition)
+    return and_(*conditions)
+
+
+def _base_query(db):
+    return (
+        db.query(Analysis.id, Analysis.entry_id, Entry.text, Entry.user_id, Entry.mood_score, Entry.created_at)
+        .join(Entry, Entry.id == Analysis.entry_id)
+    )
+
+
+def fetch_page(db, last_id: int, page_size: int, stale):
+    """Keyset pagination ile bir sonraki eski analiz sayfasını getirir"""
+    return (
+        _base_query(db)
+        .filter(Analysis.id > last_id, stale)
+        .order_by(Analysis.id)
+        .limit(page_size)
+        .all()
+    )
+
+
+def fetch_by_ids(db, ids: List[int], stale):
+    """Önceki sayfalarda başarısız olmuş (ve hâlâ eski sürümdeki) satırlar"""
+    return _base_query(db).filter(Analysis.id.in_(ids), stale).order_by(Analysis.id).all()
+
+
+def _is_failed(result: Dict[str, Any]) -> bool:
+    return ANALYSIS_ERROR_MESSAGE in (result.get("recommendations") or [])
+
+
+async def reanalyze_page(
+    agent: CognitiveAnalysisAgent,
+    rows,
+    semaphore: asyncio.Semaphore,
+    limiter: RateLimiter,
+) -> List[Optional[Dict[str, Any]]]:
+    """Bir sayfadaki satırları eşzamanlı olarak yeniden analiz eder"""
+
+    async def one(row) -> Optional[Dict[str, Any]]:
+        async with semaphore:
+            await limiter.wait()
+            result = await agent.analyze_entry(text=row.text, user_id=str(row.user_id))
+            return None if _is_failed(result) else result
+
+    return await asyncio.gather(*(one(row) for row in rows))
+
+
+def write_batch(db, rows, results, prompt_version: str, model: str, analyzed_at: datetime) -> int:
+    """Başarılı sonuçları tek bir bulk update ile yazar"""
+    mappings = [
+        {
+            "id": row.id,
+            "result": result,
+            # Fallback sonuçları kendi sürümüyle yazılır; sonraki çalıştırmada tekrar seçilir
+            "prompt_version": result.get("prompt_version") or prompt_version,
+            "model_version": model,
+            "analyzed_at": analyzed_at,
+        }
+        for row, result in zip(rows, results)
+        if result is not None
+    ]
+    if mappings:
+        db.bulk_update_mappings(Analysis, mappings)
+        db.commit()
+    return len(mappings)
+
+
+def to_index_items(rows, results, analyzed_at: datetime) -> List[Dict[str, Any]]:
+    """Yazılan sonuçları ChromaService.index_entries_batch öğelerine çevirir"""
+    return [
+        {
+            "entry_id": str(row.entry_id),
+            "user_id": str(row.user_id),
+            "text": row.text,
+            "analysis_result": result,
+            "analysis_id": str(row.id),
+            "mood_score": row.mood_score,
+            "created_at": row.created_at.isoformat() if row.created_at else None,
+            "analyzed_at": analyzed_at.isoformat(),
+        }
+        for row, result in zip(rows, results)
+        if result is not None
+    ]
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Eski prompt/model sürümlü analizleri yeniden üretir")
+    parser.add_argument("--model", default=None, help="Hedef model (varsayılan: OPENAI_MODEL veya katmanlama konfigürasyonu)")
+    parser.add_argument("--concurrency", type=int, default=4, help="Eşzamanlı LLM çağrısı sayısı")
+    parser.add_argument("--rate", type=float, default=2.0, help="Saniyedeki en fazla LLM çağrısı (0: limitsiz)")
+    parser.add_argument("--batch-size", type=int, default=100, help="Sayfa ve toplu yazma boyutu")
+    parser.add_argument("--limit", type=int, default=0, help="En fazla işlenecek satır (0: hepsi)")
+    parser.add_argument("--prompt-version", default=None, help="Yalnızca bu prompt sürümündeki satırlar (none: sürümsüz)")
+    parser.add_argument("--model-version", default=None, help="Yalnızca bu model sürümündeki satırlar (none: sürümsüz)")
+    parser.add_argument("--checkpoint", default=".reanalyze_checkpoint.json", help="Checkpoint dosyası")
+    parser.add_argument("--reset", action="store_true", help="Checkpoint'i yok say, baştan başla")
+    parser.add_argument("--skip-index", action="store_true", help="ChromaDB'yi güncelleme (sonra backfill_analysis_index.py çalıştırılmalı)")
+    parser.add_argument("--dry-run", action="store_true", help="Sadece yeniden analiz edilecek satırları say")
+    args = parser.parse_args()
+
+    prompt_version = PROMPT_VERSION
+    # Katmanlama açıksa model sürümü "tiered:fast>strong" olur
+    agent = CognitiveAnalysisAgent(model_name=args.model)
+    model = agent.model_name
+    stale = _stale_filter(prompt_version, model, args.prompt_version, args.model_version)
+    db = SessionLocal()
+    try:
+        if args.dry_run:
+            count = db.query(Analysis.id).filter(stale).count()
+            logger.info(
+                f"Hedef: prompt={prompt_version} model={model} (kaynak prompt={args.prompt_version or '*'} "
+                f"model={args.model_version or '*'}) -> {count} satır yeniden analiz edilecek"
+            )
+            return
+
+        checkpoint = JsonCheckpoint(args.checkpoint, {
+            "prompt_version": prompt_version,
+            "model": model,
+            "source_prompt_version": args.prompt_version,
+            "source_model_version": args.model_version,
+        })
+        state = checkpoint.load(reset=args.reset)
+        last_id = state.get("last_id", 0)
+        processed = state.get("processed", 0)
+        updated = state.get("updated", 0)
+        failed_ids: List[int] = state.get("failed_ids", [])
+        if last_id:
+            logger.info(f"Checkpoint bulundu, analysis_id>{last_id} üzerinden devam ediliyor ({len(failed_ids)} hatalı satır yeniden denenecek)")
+
+        # Chroma yalnızca yazma gerektiğinde (modeliyle birlikte) yüklenir
+        service = None
+        if not args.skip_index:
+            from services.chroma_service import get_chroma_service
+            service = get_chroma_service()
+        index_failed = False
+
+        semaphore = asyncio.Semaphore(args.concurrency)
+        limiter = RateLimiter(args.rate)
+        started = time.monotonic()
+
+        async def run_rows(rows) -> List[int]:
+            """Satırları analiz edip yazar, başarısız olanların ID'lerini döndürür"""
+            nonlocal index_failed
+            results = await reanalyze_page(agent, rows, semaphore, limiter)
+            analyzed_at = datetime.utcnow()
+            written = write_batch(db, rows, results, prompt_version, model, analyzed_at)
+            if service is not None and written:
+                # SQL ile aynı sonuç Chroma metadata'sına, çarpıtma bayraklarına ve kalıp sayaçlarına da yazılır
+                if await service.index_entries_batch(to_index_items(rows, results, analyzed_at)) != written:
+                    index_failed = True
+                    logger.error(f"analysis_id<={rows[-1].id} sayfası ChromaDB'ye yazılamadı")
+            return [row.id for row, result in zip(rows, results) if result is None]
+
+        # 1) Keyset taraması: her sayfadan sonra hatalı ID'ler checkpoint'e yazılır
+        while True:
+            page_size = args.batch_size
+            if args.limit:
+                page_size = min(page_size, args.limit - processed)
+                if page_size <= 0:
+                    break
+
+            rows = fetch_page(db, last_id, page_size, stale)
+            if not rows:
+                break
+
+            page_failed = await run_rows(rows)
+            last_id = rows[-1].id
+            processed += len(rows)
+            updated += len(rows) - len(page_failed)
+            failed_ids.extend(page_failed)
+            checkpoint.save(last_id=last_id, processed=processed, updated=updated, failed_ids=failed_ids)
+
+            elapsed = max(time.monotonic() - started, 1e-6)
+            logger.info(
+                f"analysis_id<={last_id}: {processed} işlendi, {updated} güncellendi, "
+                f"{len(failed_ids)} hatalı ({processed / elapsed:.1f} satır/sn)"
+            )
+
+        # 2) Hatalı satırlar bir kez daha denenir (önceki çalıştırmalardan kalanlar dahil)
+        if failed_ids:
+            logger.info(f"{len(failed_ids)} hatalı satır yeniden deneniyor")
+            remaining: List[int] = []
+            for start in range(0, len(failed_ids), args.batch_size):
+                rows = fetch_by_ids(db, failed_ids[start:start + args.batch_size], stale)
+                if rows:
+                    page_failed = await run_rows(rows)
+                    updated += len(rows) - len(page_failed)
+                    remaining.extend(page_failed)
+            failed_ids = remaining
+            checkpoint.save(updated=updated, failed_ids=failed_ids)
+
+        if failed_ids:
+            # Checkpoint korunur; sonraki çalıştırma bu satırları yeniden dener
+            logger.warning(f"{len(failed_ids)} satır hâlâ hatalı, checkpoint korundu: {failed_ids[:20]}")
+        elif not args.limit or processed < args.limit:
+            checkpoint.clear()
+
+        logger.info(f"Tamamlandı: {updated} güncellendi, {len(failed_ids)} hatalı (prompt={prompt_version}, model={model})")
+        if updated and (service is None or index_failed):
+            logger.warning(
+                "ChromaDB analiz indeksi SQL'in gerisinde: "
+                "`python scripts/backfill_analysis_index.py --reset` çalıştırılmalı"
+            )
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,279 @@
+"""
+ChromaDB Tam Yeniden İndeksleme CLI
+Vektör deposunu gerçek kaynak olan SQL tablolarından (entries + analyses) ve
+BDT_TECHNIQUES sözlüğünden yeniden kurar. Embedding modeli değiştiğinde veya koleksiyonlar
+bozulduğunda kullanılır.
+
+- Embedding'ler çok süreçli (ProcessPoolExecutor) hesaplanır; her worker modeli bir kez yükler.
+- Yazma canlı koleksiyona değil gölge koleksiyona (`<ad>__<zaman>`) yapılır.
+- Tüm gölge koleksiyonlar dolunca tüm alias'lar tek os.replace ile birlikte değiştirilir;
+  çalışan API süreçleri bir sonraki Chroma çağrısında yeni koleksiyonlara geçer.
+- Eski koleksiyonlar silinmez: alias değişikliğini henüz görmemiş worker'lar onları
+  sorgulamaya devam edebilir. Tüm worker'lar geçtikten sonra
+  `chroma_maintenance.py compact --drop-unaliased` ile silinir.
+- İlerleme checkpoint dosyasına yazılır; yarıda kesilirse aynı gölge koleksiyona kaldığı
+  entry_id'den devam eder.
+- Swap'tan hemen önce tarama sırasında eklenen girişler (checkpoint'teki son entry_id'den
+  yeni olanlar) gölge koleksiyona taşınır.
+- Ana süreç embedding modelini yüklemez (embedding worker'larda yapılır); yalnızca Chroma
+  client'ı ve koleksiyon config'i için model yüklemeyen bir embedder kullanılır.
+
+Kullanım:
+    python scripts/reindex_chroma.py
+    python scripts/reindex_chroma.py --collections entries --workers 4 --page-size 2000
+    EMBEDDING_BACKEND=onnx-int8 python scripts/reindex_chroma.py --reset
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional
+
+# Backend root dizinini ekle
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import SessionLocal
+from models import Analysis, Entry
+from services.chroma_service import ChromaService
+from services.embedding_backends import EMBEDDING_MODEL_NAME, ConfigOnlyEmbeddingFunction, register_with_chroma
+from scripts.checkpoint import JsonCheckpoint
+from taxonomy import normalize_analysis
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# --collections seçeneği -> yeniden kurulan mantıksal koleksiyonlar
+TARGETS = {
+    "entries": ["user_entries", "analysis_results"],
+    "techniques": ["therapy_techniques"],
+}
+
+
+# -----------------------------------------------------------------------------
+# Çok süreçli embedding
+# -----------------------------------------------------------------------------
+_worker_embed = None
+
+
+def _init_worker(backend: str, threads: int) -> None:
+    """Her worker sürecinde modeli bir kez yükler"""
+    global _worker_embed
+    try:
+        import torch
+        torch.set_num_threads(threads)
+    except ImportError:
+        pass
+    os.environ["EMBEDDING_ONNX_THREADS"] = str(threads)
+
+    from services.embedding_backends import create_embedding_function
+    _worker_embed = create_embedding_function(backend=backend)
+
+
+def _embed_chunk(texts: List[str]) -> List[Any]:
+    return list(_worker_embed(texts))
+
+
+class ParallelEmbedder:
+    """Metinleri parçalara bölüp worker süreçlerine dağıtır, sırayı koruyarak birleştirir"""
+
+    def __init__(self, workers: int, chunk_size: int, backend: str):
+        threads = max(1, (os.cpu_count() or 1) // workers)
+        self.chunk_size = chunk_size
+        self.pool = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(backend, threads),
+        )
+
+    def embed(self, texts: List[str]) -> List[Any]:
+        chunks = [texts[i:i + self.chunk_size] for i in range(0, len(texts), self.chunk_size)]
+        embeddings: List[Any] = []
+        for chunk_embeddings in self.pool.map(_embed_chunk, chunks):
+            embeddings.extend(chunk_embeddings)
+        return embeddings
+
+    def close(self) -> None:
+        self.pool.shutdown()
+
+
+# -----------------------------------------------------------------------------
+# Kaynaklar
+# -----------------------------------------------------------------------------
+def _parse_result(result: Any) -> Dict[str, Any]:
+    if isinstance(result, str):
+        try:
+            result = json.loads(result)
+        except json.JSONDecodeError:
+            result = {}
+    return normalize_analysis(result or {})
+
+
+def fetch_entry_page(db, last_id: int, page_size: int):
+    """Keyset pagination ile girişleri (varsa analizleriyle) getirir"""
+    return (
+        db.query(
+            Entry.id, Entry.user_id, Entry.text, Entry.mood_score, Entry.created_at,
+            Analysis.id.label("analysis_id"), Analysis.result, Analysis.analyzed_at,
+        )
+        .outerjoin(Analysis, Analysis.entry_id == Entry.id)
+        .filter(Entry.id > last_id)
+        .order_by(Entry.id)
+        .limit(page_size)
+        .all()
+    )
+
+
+def reindex_entries(db, service, embedder: ParallelEmbedder, shadows, checkpoint: JsonCheckpoint, args) -> int:
+    """user_entries ve analysis_results gölge koleksiyonlarını tek embedding geçişiyle doldurur.
+
+    Checkpoint'teki son entry_id'den devam eder; bu çağrıda işlenen giriş sayısını döndürür.
+    """
+    entries_shadow = service.create_shadow_collection("user_entries", shadows["user_entries"])
+    analysis_shadow = service.create_shadow_collection("analysis_results", shadows["analysis_results"])
+
+    state = checkpoint.state
+    last_id = state.get("entries_last_id", 0)
+    processed = state.get("entries_processed", 0)
+    if last_id:
+        logger.info(f"Checkpoint bulundu, entry_id>{last_id} üzerinden devam ediliyor")
+
+    started = time.monotonic()
+    indexed = 0
+    while True:
+        rows = fetch_entry_page(db, last_id, args.page_size)
+        if not rows:
+            break
+
+        entry_records = []
+        analysis_records = []
+        analysis_positions = []
+        for position, row in enumerate(rows):
+            result = _parse_result(row.result) if row.analysis_id is not None else {}
+            entry_records.append(service._entry_record(
+                entry_id=str(row.id),
+                user_id=str(row.user_id),
+                text=row.text,
+                analysis_result=result,
+                mood_score=row.mood_score,
+                created_at=row.created_at.isoformat() if row.created_at else None,
+            ))
+            if row.analysis_id is not None:
+                analysis_records.append(service._analysis_record(
+                    analysis_id=str(row.analysis_id),
+                    user_id=str(row.user_id),
+                    entry_text=row.text,
+                    analysis_data=result,
+                    analyzed_at=row.analyzed_at.isoformat() if row.analyzed_at else None,
+                ))
+                analysis_positions.append(position)
+
+        # Analiz kayıtları giriş vektörünü yeniden kullanır (index_entries_batch ile aynı)
+        embeddings = embedder.embed([record[1] for record in entry_records])
+        service._upsert_records(entries_shadow, entry_records, service._transform_entries(embeddings))
+        if analysis_records:
+            service._upsert_records(
+                analysis_shadow, analysis_records, [embeddings[i] for i in analysis_positions]
+            )
+
+        last_id = rows[-1].id
+        processed += len(rows)
+        indexed += len(rows)
+        checkpoint.save(entries_last_id=last_id, entries_processed=processed)
+
+        elapsed = max(time.monotonic() - started, 1e-6)
+        logger.info(f"entry_id<={last_id}: {processed} giriş yeniden indekslendi ({len(rows) / elapsed:.1f} satır/sn)")
+        started = time.monotonic()
+    return indexed
+
+
+def reindex_techniques(service, embedder: ParallelEmbedder, shadows) -> None:
+    """therapy_techniques gölge koleksiyonunu BDT_TECHNIQUES'ten doldurur"""
+    from agents.rag_agent import BDT_TECHNIQUES
+
+    shadow = service.create_shadow_collection("therapy_techniques", shadows["therapy_techniques"])
+    records = [
+        service._technique_record(f"{distortion_type}_{idx}", technique, distortion_type)
+        for distortion_type, data in BDT_TECHNIQUES.items()
+        for idx, technique in enumerate(data["techniques"])
+    ]
+    service._upsert_records(shadow, records, embedder.embed([record[1] for record in records]))
+    logger.info(f"{len(records)} teknik yeniden indekslendi")
+
+
+# -----------------------------------------------------------------------------
+# Ana akış
+# -----------------------------------------------------------------------------
+def main():
+    parser = argparse.ArgumentParser(description="ChromaDB koleksiyonlarını SQL tablolarından yeniden kurar")
+    parser.add_argument("--collections", nargs="+", choices=sorted(TARGETS), default=sorted(TARGETS))
+    parser.add_argument("--workers", type=int, default=max(1, (os.cpu_count() or 2) // 2), help="Embedding süreç sayısı")
+    parser.add_argument("--chunk-size", type=int, default=64, help="Worker başına tek seferde embed edilen metin")
+    parser.add_argument("--page-size", type=int, default=1000, help="Veritabanından tek seferde okunan satır")
+    parser.add_argument("--backend", default=os.getenv("EMBEDDING_BACKEND", "torch"), help="torch / onnx / onnx-int8")
+    parser.add_argument("--checkpoint", default=".reindex_chroma_checkpoint.json", help="Checkpoint dosyası")
+    parser.add_argument("--reset", action="store_true", help="Checkpoint'i ve yarım gölge koleksiyonları yok say")
+    args = parser.parse_args()
+
+    logical_names = [name for target in args.collections for name in TARGETS[target]]
+    # Embedding worker süreçlerde yapılır; ana süreç modeli yüklemez
+    embedding_function = ConfigOnlyEmbeddingFunction(EMBEDDING_MODEL_NAME)
+    register_with_chroma(embedding_function)
+    service = ChromaService(embedding_function=embedding_function)
+    checkpoint = JsonCheckpoint(args.checkpoint, {
+        "collections": sorted(args.collections),
+        "model": EMBEDDING_MODEL_NAME,
+        "backend": args.backend,
+    })
+    state = checkpoint.load(reset=args.reset)
+
+    # Gölge koleksiyon adları checkpoint'e yazılır; resume'da aynı koleksiyonlara devam edilir
+    shadows: Dict[str, Optional[str]] = state.get("shadows") or {}
+    stamp = time.strftime("%Y%m%dT%H%M%S")
+    for name in logical_names:
+        shadows.setdefault(name, f"{name}__{stamp}")
+    checkpoint.save(shadows=shadows)
+    logger.info(f"Gölge koleksiyonlar: {shadows}")
+
+    embedder = ParallelEmbedder(args.workers, args.chunk_size, args.backend)
+    db = SessionLocal()
+    try:
+        if "techniques" in args.collections and not state.get("techniques_done"):
+            reindex_techniques(service, embedder, shadows)
+            checkpoint.save(techniques_done=True)
+
+        if "entries" in args.collections:
+            if not state.get("entries_done"):
+                reindex_entries(db, service, embedder, shadows, checkpoint, args)
+                checkpoint.save(entries_done=True)
+            # Tarama sürerken canlı koleksiyona yazılan girişler swap'tan hemen önce gölgeye taşınır
+            high_water = state.get("entries_last_id", 0)
+            caught_up = reindex_entries(db, service, embedder, shadows, checkpoint, args)
+            logger.info(f"Swap öncesi son tarama: entry_id>{high_water} için {caught_up} giriş eklendi")
+    finally:
+        db.close()
+        embedder.close()
+
+    # Atomik swap: tüm alias'lar tek os.replace ile yeni koleksiyonları gösterir
+    previous = service.swap_collections({name: shadows[name] for name in logical_names})
+    stale = sorted(old for name, old in previous.items() if old != shadows[name])
+
+    if "entries" in args.collections:
+        # Kalıp özetleri ve kullanıcı vektör dosyaları yeni koleksiyonlardan ilk okumada yeniden oluşur
+        service.reset_derived_indexes()
+
+    checkpoint.clear()
+    logger.info("Yeniden indeksleme tamamlandı")
+    if stale:
+        # Alias'ı henüz yenilememiş worker'lar eski koleksiyonları sorgulayabilir; hemen silinmez
+        logger.info(f"Eski koleksiyonlar korundu: {', '.join(stale)}")
+        logger.info("Tüm worker'lar yeni koleksiyonlara geçtikten sonra: python scripts/chroma_maintenance.py compact --drop-unaliased")
+
+
+if __name__ == "__main__":
+    main()
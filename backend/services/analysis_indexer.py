@@ -0,0 +1,210 @@
+"""
+Arka Plan Analiz İndeksleyici - Yeni Entry/Analysis satırlarını ChromaDB'ye toplu yazar
+create_entry isteği indekslemeyi beklemez: öğe kuyruğa bırakılır, ayrı bir thread öğeleri
+CHROMA_INDEX_BATCH_SIZE adede ya da CHROMA_INDEX_FLUSH_SECONDS süresine kadar biriktirip
+tek `index_entries_batch` çağrısıyla (tek embedding geçişi) hem user_entries hem de
+analysis_results koleksiyonlarına yazar. Silinen girişler de aynı kuyruktan geçer; böylece
+henüz yazılmamış bir girişin silmesi eklemeden önce çalışıp kaydı geri getirmez.
+
+Kuyruk doluysa öğe düşürülür ve sayılır; kaçan satırlar
+`scripts/backfill_analysis_index.py` ile tamamlanabilir.
+"""
+
+import os
+import time
+import queue
+import asyncio
+import logging
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+class AnalysisIndexer:
+    """Kuyruk + tek worker thread ile toplu ChromaDB indeksleyici"""
+
+    def __init__(
+        self,
+        batch_size: Optional[int] = None,
+        flush_interval: Optional[float] = None,
+        max_queue: Optional[int] = None,
+        max_retries: int = 3,
+    ):
+        self.batch_size = batch_size or int(os.getenv("CHROMA_INDEX_BATCH_SIZE", "64"))
+        self.flush_interval = flush_interval if flush_interval is not None else float(
+            os.getenv("CHROMA_INDEX_FLUSH_SECONDS", "1.0")
+        )
+        self.max_retries = max_retries
+        self._queue: "queue.Queue[Any]" = queue.Queue(
+            maxsize=max_queue or int(os.getenv("CHROMA_INDEX_QUEUE_SIZE", "10000"))
+        )
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._stats = {"submitted": 0, "indexed": 0, "deleted": 0, "failed": 0, "dropped": 0, "batches": 0}
+
+    # ----- PUBLIC -----
+
+    def submit(
+        self,
+        entry_id: str,
+        user_id: str,
+        text: str,
+        analysis_result: Dict[str, Any],
+        analysis_id: Optional[str] = None,
+        mood_score: Optional[int] = None,
+        created_at: Optional[str] = None,
+        analyzed_at: Optional[str] = None,
+    ) -> bool:
+        """Girişi indeksleme kuyruğuna ekler (bloklamaz). Kuyruk doluysa False döner."""
+        self._ensure_started()
+        item = {
+            "entry_id": str(entry_id),
+            "user_id": str(user_id),
+            "text": text,
+            "analysis_result": analysis_result,
+            "analysis_id": str(analysis_id) if analysis_id is not None else None,
+            "mood_score": mood_score,
+            "created_at": created_at,
+            "analyzed_at": analyzed_at,
+        }
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            self._count("dropped")
+            logger.warning(f"İndeksleme kuyruğu dolu, entry {entry_id} atlandı (backfill ile tamamlanabilir)")
+            return False
+        self._count("submitted")
+        return True
+
+    def submit_delete(self, entry_id: str, user_id: str, analysis_id: Optional[str] = None) -> bool:
+        """Silinen girişin indekslerden düşülmesini kuyruğa ekler (bloklamaz). Kuyruk doluysa False döner."""
+        self._ensure_started()
+        item = {
+            "op": "delete",
+            "entry_id": str(entry_id),
+            "user_id": str(user_id),
+            "analysis_id": str(analysis_id) if analysis_id is not None else None,
+        }
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            self._count("dropped")
+            logger.warning(f"İndeksleme kuyruğu dolu, entry {entry_id} silmesi atlandı (chroma_maintenance orphans ile temizlenebilir)")
+            return False
+        self._count("submitted")
+        return True
+
+    def stop(self, timeout: float = 10.0) -> None:
+        """Kuyruktaki öğeleri yazıp worker'ı durdurur (uygulama kapanışında)"""
+        thread = self._thread
+        if thread is None:
+            return
+        try:
+            self._queue.put(_STOP, timeout=timeout)
+        except queue.Full:
+            logger.warning("İndeksleyici durdurulamadı: kuyruk dolu")
+            return
+        thread.join(timeout)
+        self._thread = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats["queued"] = self._queue.qsize()
+        stats["running"] = self._thread is not None and self._thread.is_alive()
+        return stats
+
+    # ----- WORKER -----
+
+    def _ensure_started(self) -> None:
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._worker, name="analysis-indexer", daemon=True)
+                self._thread.start()
+
+    def _count(self, key: str, amount: int = 1) -> None:
+        with self._stats_lock:
+            self._stats[key] += amount
+
+    def _next_batch(self) -> Tuple[List[Dict[str, Any]], bool]:
+        """İlk öğeyi bekler, sonra batch dolana ya da flush süresi dolana kadar toplar"""
+        batch: List[Dict[str, Any]] = []
+        first = self._queue.get()
+        if first is _STOP:
+            return batch, True
+
+        batch.append(first)
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is _STOP:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    def _worker(self) -> None:
+        # ChromaService async API'si için thread'e ait event loop
+        loop = asyncio.new_event_loop()
+        try:
+            from services.chroma_service import get_chroma_service
+
+            while True:
+                batch, stopping = self._next_batch()
+                # Ekleme ve silmeler sıralarını koruyarak ardışık gruplar halinde yazılır
+                run: List[Dict[str, Any]] = []
+                for item in batch:
+                    if run and item.get("op") != run[0].get("op"):
+                        self._index(loop, get_chroma_service, run)
+                        run = []
+                    run.append(item)
+                if run:
+                    self._index(loop, get_chroma_service, run)
+                if stopping:
+                    break
+        finally:
+            loop.close()
+
+    def _index(self, loop, get_service, batch: List[Dict[str, Any]]) -> None:
+        for attempt in range(1, self.max_retries + 1):
+            try:
+                # Isınma sürüyorsa model hazır olana kadar burada beklenir (istek thread'i değil)
+                service = get_service()
+                deleting = batch[0].get("op") == "delete"
+                write = service.delete_entries_batch if deleting else service.index_entries_batch
+                indexed = loop.run_until_complete(write(batch))
+                if indexed == len(batch):
+                    self._count("deleted" if deleting else "indexed", indexed)
+                    self._count("batches")
+                    return
+                error = f"{indexed}/{len(batch)} yazıldı"
+            except Exception as e:
+                error = str(e)
+
+            if attempt < self.max_retries:
+                time.sleep(min(2 ** attempt, 30))
+        logger.error(f"{len(batch)} öğelik indeksleme batch'i başarısız: {error}")
+        self._count("failed", len(batch))
+
+
+# Global instance
+analysis_indexer = None
+
+
+def get_analysis_indexer() -> AnalysisIndexer:
+    """AnalysisIndexer singleton instance'ını döndürür"""
+    global analysis_indexer
+    if analysis_indexer is None:
+        analysis_indexer = AnalysisIndexer()
+    return analysis_indexer
@@ -1,69 +1,249 @@
 """
 ChromaDB Servisi - Semantik arama ve vektör veritabanı yönetimi
+chromadb, torch ve embedding modeli modül import'unda değil, servis ilk oluşturulduğunda
+(ya da uygulama açılışındaki arka plan ısınmasında) yüklenir; böylece vektör özellikleri
+olmayan endpoint'ler model yüklenmesini beklemez.
 """
 
 import os
-import chromadb
+import json
+import time
+import queue
+import asyncio
 import logging
-from typing import List, Dict, Any, Optional, Tuple
-from datetime import datetime
-from sentence_transformers import SentenceTransformer
-from chromadb.config import Settings
-from chromadb.utils import embedding_functions
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from datetime import datetime, timezone
+
+from taxonomy import distortion_flag, normalize_distortion
+from services.embedding_cache import QueryEmbeddingCache
+from services.query_batcher import QueryBatcher
+from services.pattern_store import UserPatternStore
+from services.user_vector_store import UserVectorStore
+from services.technique_index import TechniqueIndex
+from services.neighbor_store import NeighborStore
+from services.keyword_index import KeywordIndex, reciprocal_rank_fusion, tokenize
+from services.embedding_backends import EMBEDDING_MODEL_NAME, create_embedding_function
+from services.embedding_transform import load_entry_transform
 
 logger = logging.getLogger(__name__)
 
 
+class ChromaServiceBusyError(RuntimeError):
+    """Chroma executor kuyruğu dolu (backpressure) - çağıran 503 dönebilir"""
+
+
+def to_epoch(value: Any) -> int:
+    """datetime / ISO string / sayı -> epoch saniye (saat dilimsiz değerler UTC kabul edilir, DB utcnow yazar)"""
+    if isinstance(value, (int, float)):
+        return int(value)
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return int(value.timestamp())
+
+
+def utc_now_iso() -> str:
+    """Şu an, saat dilimsiz UTC ISO string (DB'nin utcnow ve to_epoch ile aynı kural)"""
+    return datetime.now(timezone.utc).replace(tzinfo=None).isoformat()
+
+
+# Mantıksal koleksiyon adı -> açıklama. Fiziksel koleksiyon adı alias dosyasından çözülür;
+# reindex CLI yeni koleksiyonu gölge isimle doldurup alias'ı atomik olarak değiştirir.
+COLLECTIONS = {
+    "user_entries": "Kullanıcı günlük yazıları ve analizleri",
+    "therapy_techniques": "BDT teknikleri ve egzersizleri",
+    "analysis_results": "Çarpıtma analizleri ve sonuçları",
+}
+ALIASES_FILE = "collection_aliases.json"
+
+# HNSW ayarı -> (Chroma configuration["hnsw"] anahtarı, tip). Chroma varsayılanları: M=16,
+# ef_construction=100, ef_search=100; space verilmezse embedding fonksiyonunun varsayılanı
+HNSW_SETTINGS = {
+    "SPACE": ("space", str),
+    "M": ("max_neighbors", int),
+    "EF_CONSTRUCTION": ("ef_construction", int),
+    "EF_SEARCH": ("ef_search", int),
+}
+
+
+def hnsw_config(logical_name: str) -> Dict[str, Any]:
+    """Koleksiyonun HNSW configuration'ı: önce CHROMA_HNSW_<KOLEKSİYON>_<AYAR>, yoksa CHROMA_HNSW_<AYAR>.
+
+    Örn. CHROMA_HNSW_USER_ENTRIES_EF_SEARCH=64, CHROMA_HNSW_SPACE=cosine. Ayarlanmayan
+    değerler Chroma varsayılanında kalır. space / M / ef_construction yalnızca koleksiyon
+    oluşturulurken uygulanır (mevcut koleksiyonlar için reindex_chroma.py gerekir).
+
+    Ayarlar metadata (`hnsw:*`) yerine `configuration={"hnsw": ...}` ile verilir: adı bilinen
+    bir embedding fonksiyonuyla oluşturulan koleksiyonda Chroma, `hnsw:space` yoksa metadata'daki
+    diğer HNSW anahtarlarını da yok sayar.
+    """
+    config: Dict[str, Any] = {}
+    for setting, (key, cast) in HNSW_SETTINGS.items():
+        value = os.getenv(f"CHROMA_HNSW_{logical_name.upper()}_{setting}") or os.getenv(f"CHROMA_HNSW_{setting}")
+        if value:
+            config[key] = cast(value.strip())
+    return config
+
+
+def collection_hnsw(collection) -> Dict[str, Any]:
+    """Koleksiyonun geçerli HNSW ayarları (configuration_json; eski metadata anahtarları değil)"""
+    return dict(((collection.configuration_json or {}).get("hnsw") or {}))
+
+
+CHROMA_MODES = ("embedded", "http")
+
+
+def create_chroma_client(persist_directory: str):
+    """CHROMA_MODE'a göre Chroma client'ı.
+
+    embedded: süreç içi PersistentClient (tek worker / geliştirme; varsayılan)
+    http    : CHROMA_HOST:CHROMA_PORT'taki tek Chroma sunucusu (`chroma run --path ...`). Çok
+              worker'lı gunicorn'da indeks her worker'da ayrı yüklenmez ve chroma.sqlite3 yazma
+              kilidi için yarışılmaz; client istekleri httpx keep-alive havuzu üzerinden gider.
+    """
+    import chromadb
+    from chromadb.config import Settings
+
+    mode = os.getenv("CHROMA_MODE", "embedded").strip().lower()
+    if mode not in CHROMA_MODES:
+        logger.warning(f"Bilinmeyen CHROMA_MODE '{mode}', embedded kullanılıyor")
+        mode = "embedded"
+
+    settings = Settings(anonymized_telemetry=False)
+    if mode == "embedded":
+        return chromadb.PersistentClient(path=persist_directory, settings=settings), mode
+
+    token = os.getenv("CHROMA_AUTH_TOKEN")
+    client = chromadb.HttpClient(
+        host=os.getenv("CHROMA_HOST", "127.0.0.1"),
+        port=int(os.getenv("CHROMA_PORT", "8000")),
+        ssl=os.getenv("CHROMA_SSL", "0").strip().lower() in ("1", "true", "yes", "on"),
+        headers={"Authorization": f"Bearer {token}"} if token else None,
+        settings=settings,
+    )
+    client.heartbeat()
+    return client, mode
+
+
+def open_side_stores(persist_directory: str) -> Dict[str, Any]:
+    """Koleksiyonlardan türetilen yan depoları açar (ChromaService ve bakım CLI'ı aynı dosyaları kullanır).
+
+    pattern_store  : get_user_patterns tam tarama yapmasın diye artımlı kalıp sayaçları
+    user_vectors   : SIMILAR_ENTRIES_BACKEND=memmap ise kullanıcı başına tam arama dosyaları (yoksa None)
+    keyword_index  : hibrit arama için Türkçe BM25 ters indeksi
+    neighbor_store : giriş başına önceden hesaplanmış komşu listeleri (ENTRY_NEIGHBORS_K=0 ise None)
+    """
+    similar_entries_backend = os.getenv("SIMILAR_ENTRIES_BACKEND", "chroma").strip().lower()
+    neighbors_k = int(os.getenv("ENTRY_NEIGHBORS_K", "5"))
+    return {
+        "pattern_store": UserPatternStore(os.path.join(persist_directory, "user_patterns.sqlite3")),
+        "user_vectors": (
+            UserVectorStore(os.path.join(persist_directory, "user_vectors"))
+            if similar_entries_backend == "memmap" else None
+        ),
+        "keyword_index": KeywordIndex(os.path.join(persist_directory, "keyword_index.sqlite3")),
+        "neighbor_store": (
+            NeighborStore(os.path.join(persist_directory, "entry_neighbors.sqlite3"), k=neighbors_k)
+            if neighbors_k > 0 else None
+        ),
+    }
+
+
+def read_aliases(persist_directory: str) -> Dict[str, str]:
+    """Mantıksal ad -> fiziksel koleksiyon adı eşlemesi (dosya yoksa boş; birebir kabul edilir)"""
+    try:
+        with open(os.path.join(persist_directory, ALIASES_FILE), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return {}
+
+
 class ChromaService:
     """ChromaDB client servisi"""
     
-    def __init__(self, persist_directory: Optional[str] = None):
-        """ChromaDB client'ını başlatır"""
+    def __init__(self, persist_directory: Optional[str] = None, embedding_function: Optional[Any] = None):
+        """ChromaDB client'ını başlatır.
+        
+        ``embedding_function`` verilmezse EMBEDDING_BACKEND'e göre oluşturulur (model yüklenir);
+        vektörleri kendisi hesaplayan araçlar ConfigOnlyEmbeddingFunction verir.
+        """
         try:
             # Persist directory'yi belirle
             if persist_directory is None:
                 persist_directory = os.path.join(os.getcwd(), "chroma_db")
             
-            # ChromaDB client'ı oluştur
-            self.client = chromadb.PersistentClient(path=persist_directory)
+            # ChromaDB client'ı oluştur (ağır import, lazy; CHROMA_MODE: embedded / http).
+            # http modunda da alias dosyası ve yan SQLite depoları bu dizinde, aynı makinedeki
+            # worker'lar arasında paylaşılır.
+            self.client, self.chroma_mode = create_chroma_client(persist_directory)
+            self.persist_directory = persist_directory
             
-            # Embedding fonksiyonu (sentence-transformers)
-            self.embedding_function = embedding_functions.SentenceTransformerEmbeddingFunction(
-                model_name="paraphrase-multilingual-MiniLM-L12-v2"  # Türkçe destekli model
-            )
+            # Koleksiyonlardan türetilen yan depolar (kalıp sayaçları, memmap vektörler, BM25, komşu listeleri)
+            stores = open_side_stores(persist_directory)
+            self.pattern_store = stores["pattern_store"]
+            self.user_vectors = stores["user_vectors"]
+            self.keyword_index = stores["keyword_index"]
+            self.neighbor_store = stores["neighbor_store"]
+            self.hybrid_keyword_max_terms = int(os.getenv("HYBRID_KEYWORD_MAX_TERMS", "2"))
+            
+            # Embedding fonksiyonu (Türkçe destekli model; EMBEDDING_BACKEND: torch / onnx / onnx-int8 / remote)
+            self.embedding_function = embedding_function or create_embedding_function(model_name=EMBEDDING_MODEL_NAME)
+
+            # user_entries vektörleri için opsiyonel PCA boyut indirgemesi (ENTRY_EMBEDDING_TRANSFORM=pca)
+            self.entry_transform = load_entry_transform(persist_directory)
+            
+            # Toplu eklemelerde tek forward pass'e giren doküman sayısı
+            self.embed_batch_size = int(os.getenv("CHROMA_EMBED_BATCH_SIZE", "64"))
+            
+            # Sorgu embedding'leri için LRU önbellek (aynı user_context tekrar embed edilmez)
+            self.query_cache = QueryEmbeddingCache(int(os.getenv("CHROMA_QUERY_CACHE_SIZE", "1024")))
+            
+            # BDT kataloğu için süreç içi NumPy indeksi (kapalıysa teknik sorguları Chroma'ya gider)
+            self.technique_index_enabled = os.getenv("TECHNIQUE_INDEX", "1").strip().lower() not in ("0", "false", "no", "off")
+            self.technique_index: Optional[TechniqueIndex] = None
+            
+            # Senkron Chroma/embedding çağrıları event loop'u bloklamasın diye ayrı, sınırlı executor
+            self._setup_executor()
+            
+            # Eşzamanlı benzerlik sorgularını tek embedding geçişinde toplayan mikro-batcher (0 ms: kapalı)
+            window_ms = float(os.getenv("CHROMA_QUERY_BATCH_WINDOW_MS", "5"))
+            self.query_batcher = QueryBatcher(
+                self._run_query_batch,
+                window_ms=window_ms,
+                max_batch=int(os.getenv("CHROMA_QUERY_BATCH_MAX", "32")),
+                max_queue=self._max_pending,
+                name="chroma-query-batcher",
+            ) if window_ms > 0 else None
             
             # Koleksiyonları başlat
+            self._collections_lock = threading.RLock()
             self._initialize_collections()
             
-            logger.info(f"ChromaDB başarıyla başlatıldı: {persist_directory}")
+            logger.info(f"ChromaDB başarıyla başlatıldı ({self.chroma_mode}): {persist_directory}")
             
         except Exception as e:
             logger.error(f"ChromaDB başlatma hatası: {e}")
             raise
     
     def _initialize_collections(self):
-        """Gerekli koleksiyonları oluşturur"""
+        """Gerekli koleksiyonları oluşturur (alias dosyasındaki fiziksel isimlerle)"""
         try:
+            self._aliases_mtime = self._aliases_file_mtime()
+            aliases = self.load_aliases()
+            
             # 1. Kullanıcı günlük yazıları koleksiyonu
-            self.entries_collection = self.client.get_or_create_collection(
-                name="user_entries",
-                embedding_function=self.embedding_function,
-                metadata={"description": "Kullanıcı günlük yazıları ve analizleri"}
-            )
+            self.entries_collection = self._get_collection("user_entries", aliases)
             
             # 2. Terapi teknikleri koleksiyonu
-            self.techniques_collection = self.client.get_or_create_collection(
-                name="therapy_techniques",
-                embedding_function=self.embedding_function,
-                metadata={"description": "BDT teknikleri ve egzersizleri"}
-            )
+            self.techniques_collection = self._get_collection("therapy_techniques", aliases)
             
             # 3. Analiz sonuçları koleksiyonu
-            self.analysis_collection = self.client.get_or_create_collection(
-                name="analysis_results",
-                embedding_function=self.embedding_function,
-                metadata={"description": "Çarpıtma analizleri ve sonuçları"}
-            )
+            self.analysis_collection = self._get_collection("analysis_results", aliases)
+            
+            self._rebuild_technique_index()
             
             logger.info("ChromaDB koleksiyonları başarıyla başlatıldı")
             
@@ -71,6 +251,293 @@ class ChromaService:
             logger.error(f"Koleksiyon başlatma hatası: {e}")
             raise
     
+    def _get_collection(self, logical_name: str, aliases: Optional[Dict[str, str]] = None):
+        """Mantıksal koleksiyonun güncel fiziksel koleksiyonunu döndürür (yoksa oluşturur)"""
+        name = (aliases if aliases is not None else self.load_aliases()).get(logical_name, logical_name)
+        return self._open_collection(logical_name, name)
+    
+    def _open_collection(self, logical_name: str, physical_name: str):
+        """Fiziksel koleksiyonu açar; yoksa mantıksal koleksiyonun HNSW ayarlarıyla oluşturur.
+        
+        Mevcut koleksiyonda space / M / ef_construction değiştirilemez; sadece sorgu zamanı
+        parametresi ef_search, koleksiyondakinden farklıysa uygulanır. Koleksiyonun
+        bulunmaması dışındaki hatalar (ör. embedding fonksiyonu uyuşmazlığı) olduğu gibi yükselir.
+        """
+        from chromadb.errors import NotFoundError
+        
+        config = hnsw_config(logical_name)
+        try:
+            collection = self.client.get_collection(name=physical_name, embedding_function=self.embedding_function)
+        except NotFoundError:
+            return self.client.create_collection(
+                name=physical_name,
+                embedding_function=self.embedding_function,
+                configuration={"hnsw": config} if config else None,
+                metadata={"description": COLLECTIONS[logical_name]}
+            )
+        
+        # modify(configuration=...) metadata'yı değil configuration_json'ı günceller
+        ef_search = config.get("ef_search")
+        if ef_search and collection_hnsw(collection).get("ef_search") != ef_search:
+            try:
+                collection.modify(configuration={"hnsw": {"ef_search": ef_search}})
+                logger.info(f"{physical_name} ef_search={ef_search} olarak güncellendi")
+            except Exception as e:
+                logger.warning(f"{physical_name} için ef_search güncellenemedi (reindex gerekebilir): {e}")
+        return collection
+    
+    def _rebuild_technique_index(self) -> None:
+        """therapy_techniques koleksiyonunu (embedding'leriyle) tek matrise yükler"""
+        if not self.technique_index_enabled:
+            return
+        try:
+            results = self.techniques_collection.get(include=["embeddings", "documents", "metadatas"])
+            # Skorlar Chroma yoluyla aynı ölçekte olsun diye koleksiyonun mesafe uzayı kullanılır
+            # (metadata'da `hnsw:space` olmayabilir; geçerli değer configuration'dadır)
+            space = (
+                collection_hnsw(self.techniques_collection).get("space")
+                or (self.techniques_collection.metadata or {}).get("hnsw:space", "l2")
+            )
+            self.technique_index = TechniqueIndex(
+                results["ids"], results["embeddings"], results["documents"], results["metadatas"], space=space
+            )
+            logger.info(f"Teknik indeksi yüklendi: {len(self.technique_index)} teknik")
+        except Exception as e:
+            logger.warning(f"Teknik indeksi oluşturulamadı, Chroma sorgusu kullanılacak: {e}")
+            self.technique_index = None
+    
+    # ----- KOLEKSİYON ALIAS'LARI (REINDEX) -----
+    
+    def _aliases_path(self) -> str:
+        return os.path.join(self.persist_directory, ALIASES_FILE)
+    
+    def _aliases_file_mtime(self) -> float:
+        try:
+            return os.stat(self._aliases_path()).st_mtime
+        except OSError:
+            return 0.0
+    
+    def load_aliases(self) -> Dict[str, str]:
+        """Mantıksal ad -> fiziksel koleksiyon adı eşlemesi (dosya yoksa birebir)"""
+        return read_aliases(self.persist_directory)
+    
+    def create_shadow_collection(self, logical_name: str, physical_name: Optional[str] = None):
+        """Reindex için gölge koleksiyon oluşturur (veya resume'da mevcut olanı açar)"""
+        name = physical_name or f"{logical_name}__{datetime.now().strftime('%Y%m%dT%H%M%S')}"
+        return self._open_collection(logical_name, name)
+    
+    def swap_collection(self, logical_name: str, physical_name: str) -> str:
+        """Tek alias'ı yeni fiziksel koleksiyona çevirir, eski fiziksel adı döndürür"""
+        return self.swap_collections({logical_name: physical_name})[logical_name]
+    
+    def swap_collections(self, mapping: Dict[str, str]) -> Dict[str, str]:
+        """Birden fazla alias'ı tek adımda yeni fiziksel koleksiyonlara çevirir.
+        
+        Tüm eşleme tek tmp dosyasına yazılıp tek os.replace ile yayımlanır; diğer süreçler
+        bir sonraki çağrıda ya eski ya yeni nesli bütün olarak görür (karışık nesil yok).
+        Mantıksal ad -> eski fiziksel ad döndürür.
+        """
+        with self._collections_lock:
+            aliases = self.load_aliases()
+            previous = {name: aliases.get(name, name) for name in mapping}
+            aliases.update(mapping)
+            
+            tmp_path = f"{self._aliases_path()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(aliases, f, ensure_ascii=False, indent=2)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self._aliases_path())
+            
+            self._initialize_collections()
+        for name, physical_name in mapping.items():
+            logger.info(f"{name} koleksiyonu {previous[name]} -> {physical_name} olarak değiştirildi")
+        return previous
+    
+    def drop_collection(self, physical_name: str) -> None:
+        """Artık kullanılmayan fiziksel koleksiyonu siler"""
+        self.client.delete_collection(name=physical_name)
+    
+    def _refresh_collections_if_swapped(self) -> None:
+        """Başka bir süreç (reindex CLI) alias'ı değiştirdiyse koleksiyonları yeniden açar"""
+        if self._aliases_file_mtime() == self._aliases_mtime:
+            return
+        with self._collections_lock:
+            if self._aliases_file_mtime() != self._aliases_mtime:
+                self._initialize_collections()
+                self.reset_derived_indexes()
+                logger.info("Koleksiyon alias'ları değişti, koleksiyonlar yeniden açıldı")
+    
+    def reset_derived_indexes(self) -> None:
+        """Koleksiyonlardan türetilen yan depoları sıfırlar; ilk okumada yeni koleksiyondan yeniden oluşurlar"""
+        self.pattern_store.reset()
+        self.keyword_index.reset()
+        if self.neighbor_store is not None:
+            self.neighbor_store.reset()
+        if self.user_vectors is not None:
+            self.user_vectors.reset()
+    
+    # ----- EXECUTOR -----
+    
+    def _setup_executor(self):
+        """Sınırlı thread havuzu ve kuyruk derinliği (backpressure) ayarları"""
+        workers = int(os.getenv("CHROMA_EXECUTOR_WORKERS", "2"))
+        queue_depth = int(os.getenv("CHROMA_EXECUTOR_QUEUE_DEPTH", "32"))
+        
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="chroma")
+        self._executor_workers = workers
+        self._max_pending = workers + queue_depth
+        self._queue_timeout = float(os.getenv("CHROMA_QUEUE_TIMEOUT", "2.0"))
+        self._slots = threading.BoundedSemaphore(self._max_pending)
+        self._stats_lock = threading.Lock()
+        self._pending = 0
+        self._rejected = 0
+    
+    async def _run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """Senkron çağrıyı executor'da çalıştırır.
+        
+        Çalışan + bekleyen iş sayısı ``workers + queue_depth`` sınırındaysa en fazla
+        ``CHROMA_QUEUE_TIMEOUT`` saniye yer açılmasını bekler, sonra ChromaServiceBusyError atar.
+        Slot, iş bittiğinde (çağıran iptal edilse bile) executor thread'inde serbest bırakılır.
+        """
+        deadline = time.monotonic() + self._queue_timeout
+        delay = 0.001
+        while not self._slots.acquire(blocking=False):
+            if time.monotonic() >= deadline:
+                with self._stats_lock:
+                    self._rejected += 1
+                raise ChromaServiceBusyError("ChromaDB kuyruğu dolu, lütfen tekrar deneyin")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 0.05)
+        
+        with self._stats_lock:
+            self._pending += 1
+        
+        def _call():
+            try:
+                self._refresh_collections_if_swapped()
+                return fn(*args)
+            finally:
+                with self._stats_lock:
+                    self._pending -= 1
+                self._slots.release()
+        
+        try:
+            future = self._executor.submit(_call)
+        except Exception:
+            with self._stats_lock:
+                self._pending -= 1
+            self._slots.release()
+            raise
+        return await asyncio.wrap_future(future)
+    
+    def get_executor_stats(self) -> Dict[str, Any]:
+        """Executor doluluk ve reddedilen istek sayıları"""
+        with self._stats_lock:
+            return {
+                "workers": self._executor_workers,
+                "max_pending": self._max_pending,
+                "pending": self._pending,
+                "rejected": self._rejected,
+            }
+    
+    def shutdown(self):
+        """Executor'ı ve sorgu batcher'ını kapatır (uygulama kapanışında)"""
+        if self.query_batcher is not None:
+            self.query_batcher.stop()
+        self._executor.shutdown(wait=False)
+    
+    # ----- SORGU MİKRO-BATCH -----
+    
+    async def _submit_query(self, item: Dict[str, Any]) -> Any:
+        """Sorguyu mikro-batcher'a verir ve kendi sonucunu bekler"""
+        try:
+            future = self.query_batcher.submit(item)
+        except queue.Full:
+            with self._stats_lock:
+                self._rejected += 1
+            raise ChromaServiceBusyError("ChromaDB sorgu kuyruğu dolu, lütfen tekrar deneyin")
+        return await asyncio.wrap_future(future)
+    
+    def _run_query_batch(self, items: List[Dict[str, Any]]) -> List[Any]:
+        """Batcher thread'inde çalışır: tüm sorgu metinleri tek geçişte embed edilir,
+        Chroma'ya her (koleksiyon, filtre) grubu için tek çok-sorgulu `query` gider.
+        Sayım sorguları (``count_only``) ayrı grupta yalnızca mesafelerle çalışır ve int döner.
+        """
+        results: List[Any] = [0 if item.get("count_only") else [] for item in items]
+        try:
+            self._refresh_collections_if_swapped()
+            embeddings = self.query_cache.get_or_compute_many([item["query_text"] for item in items], self._embed)
+        except Exception as e:
+            logger.error(f"Sorgu batch embedding hatası: {e}")
+            return results
+        
+        groups: Dict[Tuple[str, str, bool], List[int]] = {}
+        technique_index = self.technique_index
+        for position, item in enumerate(items):
+            try:
+                if item["kind"] == "similar_entries":
+                    if self.user_vectors is not None and not item["filters"]:
+                        found = self._find_similar_entries_memmap(
+                            item["user_id"], self._transform_entries(embeddings[position]), item["n_results"]
+                        )
+                        results[position] = (
+                            self._count_within([1 - entry["similarity_score"] for entry in found], item["min_score"])
+                            if item.get("count_only") else found
+                        )
+                        continue
+                    collection_name = "user_entries"
+                    where_filter = self._similar_entries_where(item["user_id"], item["filters"])
+                else:
+                    where_filter = self._technique_where(item["distortion_types"], item["difficulty"])
+                    if technique_index is not None:
+                        results[position] = self._search_technique_index(
+                            technique_index, embeddings[position], item["n_results"], where_filter
+                        )
+                        continue
+                    collection_name = "therapy_techniques"
+                key = (collection_name, json.dumps(where_filter, sort_keys=True), bool(item.get("count_only")))
+                groups.setdefault(key, []).append(position)
+            except Exception as e:
+                logger.error(f"Batch sorgusu hatası ({item['kind']}): {e}")
+        
+        collections = {"user_entries": self.entries_collection, "therapy_techniques": self.techniques_collection}
+        for (collection_name, where_json, count_only), positions in groups.items():
+            score_key = "similarity_score" if collection_name == "user_entries" else "relevance_score"
+            try:
+                # Grup içinde en büyük n_results istenir, her çağıran kendi n'ine kırpılır
+                query_embeddings = [embeddings[position] for position in positions]
+                if collection_name == "user_entries":
+                    query_embeddings = self._transform_entries(query_embeddings)
+                query_kwargs = {"include": ["distances"]} if count_only else {}
+                response = collections[collection_name].query(
+                    query_embeddings=query_embeddings,
+                    n_results=max(items[position]["n_results"] for position in positions),
+                    where=json.loads(where_json),
+                    **query_kwargs
+                )
+                for row, position in enumerate(positions):
+                    n_results = items[position]["n_results"]
+                    if count_only:
+                        results[position] = self._count_within(response["distances"][row][:n_results], items[position]["min_score"])
+                    else:
+                        results[position] = self._format_query_results(response, row, score_key)[:n_results]
+            except Exception as e:
+                logger.error(f"Batch Chroma sorgusu hatası ({collection_name}, {len(positions)} sorgu): {e}")
+        return results
+    
+    def _format_query_results(self, results: Dict[str, Any], row: int, score_key: str) -> List[Dict[str, Any]]:
+        """Chroma query yanıtının `row`. sorgusunu sonuç listesine çevirir (distance -> benzerlik)"""
+        return [
+            {
+                "id": results['ids'][row][i],
+                "text": results['documents'][row][i],
+                "metadata": results['metadatas'][row][i],
+                score_key: 1 - results['distances'][row][i]
+            }
+            for i in range(len(results['documents'][row]))
+        ]
+    
     # ----- USER ENTRIES -----
     
     async def add_user_entry(
@@ -82,70 +549,341 @@ class ChromaService:
         mood_score: Optional[int] = None
     ) -> bool:
         """Kullanıcı girişini ChromaDB'ye ekler"""
-        try:
-            # Metadata hazırla
-            metadata = {
+        added = await self.add_user_entries_batch([{
+            "entry_id": entry_id,
+            "user_id": user_id,
+            "text": text,
+            "analysis_result": analysis_result,
+            "mood_score": mood_score,
+        }])
+        return added == 1
+    
+    async def add_user_entries_batch(self, entries: List[Dict[str, Any]]) -> int:
+        """Birden fazla kullanıcı girişini tek embedding geçişi ve tek add çağrısıyla ekler.
+
+        Her öğe ``entry_id``, ``user_id``, ``text``, ``analysis_result`` ve opsiyonel
+        ``mood_score`` alanlarını içerir. Eklenen giriş sayısını döndürür.
+        """
+        if not entries:
+            return 0
+        return await self._run(self._add_user_entries_batch_sync, entries)
+    
+    def _add_user_entries_batch_sync(self, entries: List[Dict[str, Any]]) -> int:
+        """`add_user_entries_batch` gövdesi (executor thread'inde çalışır).
+
+        Yazma yolu `_index_entries_batch_sync` ile ortaktır (metadata alanları, yan depolar ve
+        komşu listeleri tek yerde güncellenir); analiz koleksiyonuna yazılmaması için
+        ``analysis_id`` düşürülür.
+        """
+        return self._index_entries_batch_sync([{**item, "analysis_id": None} for item in entries])
+    
+    async def find_similar_entries(
+        self, 
+        user_id: str, 
+        query_text: str, 
+        n_results: int = 5,
+        distortion_type: Optional[str] = None,
+        since: Optional[Any] = None,
+        until: Optional[Any] = None,
+        distortion_types: Optional[List[str]] = None
+    ) -> List[Dict[str, Any]]:
+        """Benzer kullanıcı girişlerini bulur.
+        
+        ``since`` / ``until`` (datetime, ISO string veya epoch saniye) ve çarpıtma türleri
+        (``distortion_type`` ve/veya ``distortion_types``; herhangi biri eşleşirse) `where`
+        filtresi olarak vektör sorgusuna iner; aday kümesi skorlamadan önce daralır.
+        """
+        filters = self._entry_filters(distortion_type, distortion_types, since, until)
+        if self.query_batcher is not None:
+            return await self._submit_query({
+                "kind": "similar_entries",
                 "user_id": user_id,
-                "entry_id": entry_id,
-                "mood_score": mood_score or 5,
-                "created_at": datetime.now().isoformat(),
-                "distortions": ",".join([d.get("type", "") for d in analysis_result.get("distortions", [])]),
-                "overall_mood": analysis_result.get("overall_mood", "neutral"),
-                "risk_level": analysis_result.get("risk_level", "low")
-            }
-            
-            # Vektöre çevrilecek text hazırla
-            document_text = f"{text}\n\nAnaliz: {analysis_result.get('overall_mood', '')}"
+                "query_text": query_text,
+                "n_results": n_results,
+                "filters": filters,
+            })
+        return await self._run(self._find_similar_entries_sync, user_id, query_text, n_results, filters)
+    
+    async def count_similar_entries(
+        self,
+        user_id: str,
+        query_text: str,
+        n_results: int = 3,
+        min_score: Optional[float] = None,
+        distortion_type: Optional[str] = None,
+        since: Optional[Any] = None,
+        until: Optional[Any] = None,
+        distortion_types: Optional[List[str]] = None
+    ) -> int:
+        """Yalnızca benzer giriş sayısı gereken çağıranlar için (örn. kişiselleştirme prompt'u).
+
+        Aynı vektör sorgusu `include=["distances"]` ile çalışır: doküman ve metadata
+        okunup taşınmaz. ``min_score`` verilirse yalnızca bu benzerliğe ulaşan sonuçlar sayılır;
+        filtre parametreleri `find_similar_entries` ile aynıdır.
+        """
+        filters = self._entry_filters(distortion_type, distortion_types, since, until)
+        if self.query_batcher is not None:
+            return await self._submit_query({
+                "kind": "similar_entries",
+                "count_only": True,
+                "min_score": min_score,
+                "user_id": user_id,
+                "query_text": query_text,
+                "n_results": n_results,
+                "filters": filters,
+            })
+        return await self._run(self._count_similar_entries_sync, user_id, query_text, n_results, min_score, filters)
+    
+    def _count_similar_entries_sync(
+        self,
+        user_id: str,
+        query_text: str,
+        n_results: int = 3,
+        min_score: Optional[float] = None,
+        filters: Optional[Dict[str, Any]] = None
+    ) -> int:
+        """`count_similar_entries` gövdesi (executor thread'inde çalışır)"""
+        try:
+            query_embedding = self._transform_entries(self._embed_query(query_text))
+            if self.user_vectors is not None and not filters:
+                found = self._find_similar_entries_memmap(user_id, query_embedding, n_results)
+                return self._count_within([1 - item["similarity_score"] for item in found], min_score)
             
-            # ChromaDB'ye ekle
-            self.entries_collection.add(
-                documents=[document_text],
-                metadatas=[metadata],
-                ids=[f"entry_{entry_id}_{user_id}"]
+            results = self.entries_collection.query(
+                query_embeddings=[query_embedding],
+                n_results=n_results,
+                where=self._similar_entries_where(user_id, filters),
+                include=["distances"]
             )
-            
-            logger.info(f"Entry {entry_id} ChromaDB'ye eklendi")
-            return True
+            return self._count_within(results["distances"][0], min_score)
             
         except Exception as e:
-            logger.error(f"Entry ekleme hatası: {e}")
-            return False
+            logger.error(f"Benzer entry sayma hatası: {e}")
+            return 0
     
-    async def find_similar_entries(
+    @staticmethod
+    def _count_within(distances: List[float], min_score: Optional[float]) -> int:
+        """`1 - distance` benzerliği min_score'a ulaşan sonuç sayısı (eşik yoksa tümü)"""
+        if min_score is None:
+            return len(distances)
+        return sum(1 for distance in distances if 1 - distance >= min_score)
+    
+    def _find_similar_entries_sync(
         self, 
         user_id: str, 
         query_text: str, 
         n_results: int = 5,
-        distortion_type: Optional[str] = None
+        filters: Optional[Dict[str, Any]] = None
     ) -> List[Dict[str, Any]]:
-        """Benzer kullanıcı girişlerini bulur"""
+        """`find_similar_entries` gövdesi (executor thread'inde çalışır)"""
         try:
-            # Sadece user_id ile filtrele (distortion_type filtrelemesini kaldır)
-            where_filter = {"user_id": user_id}
+            query_embedding = self._transform_entries(self._embed_query(query_text))
+            if self.user_vectors is not None and not filters:
+                return self._find_similar_entries_memmap(user_id, query_embedding, n_results)
             
             # Semantik arama yap
             results = self.entries_collection.query(
-                query_texts=[query_text],
+                query_embeddings=[query_embedding],
                 n_results=n_results,
-                where=where_filter
+                where=self._similar_entries_where(user_id, filters)
             )
             
-            # Sonuçları formatla
-            similar_entries = []
-            for i in range(len(results['documents'][0])):
-                similar_entries.append({
-                    "id": results['ids'][0][i],
-                    "text": results['documents'][0][i],
-                    "metadata": results['metadatas'][0][i],
-                    "similarity_score": 1 - results['distances'][0][i]  # Distance'ı similarity'ye çevir
-                })
-            
-            return similar_entries
+            return self._format_query_results(results, 0, "similarity_score")
             
         except Exception as e:
             logger.error(f"Benzer entry bulma hatası: {e}")
             return []
     
+    @staticmethod
+    def _entry_filters(
+        distortion_type: Optional[str] = None,
+        distortion_types: Optional[List[str]] = None,
+        since: Optional[Any] = None,
+        until: Optional[Any] = None
+    ) -> Dict[str, Any]:
+        """İstek parametrelerini (zaman aralığı, çarpıtma bayrakları) normalize eder"""
+        types = [t for t in [distortion_type, *(distortion_types or [])] if t]
+        filters: Dict[str, Any] = {}
+        if types:
+            filters["flags"] = sorted({distortion_flag(t) for t in types})
+        if since is not None:
+            filters["since"] = to_epoch(since)
+        if until is not None:
+            filters["until"] = to_epoch(until)
+        return filters
+    
+    @staticmethod
+    def _similar_entries_where(user_id: str, filters: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Benzer giriş araması filtresi: user_id + (varsa) created_at_ts aralığı ve çarpıtma bayrakları"""
+        filters = filters or {}
+        conditions: List[Dict[str, Any]] = [{"user_id": user_id}]
+        if "since" in filters:
+            conditions.append({"created_at_ts": {"$gte": filters["since"]}})
+        if "until" in filters:
+            conditions.append({"created_at_ts": {"$lte": filters["until"]}})
+        flags = filters.get("flags") or []
+        if len(flags) == 1:
+            conditions.append({flags[0]: True})
+        elif flags:
+            conditions.append({"$or": [{flag: True} for flag in flags]})
+        return conditions[0] if len(conditions) == 1 else {"$and": conditions}
+    
+    def _find_similar_entries_memmap(self, user_id: str, query_embedding: Any, n_results: int) -> List[Dict[str, Any]]:
+        """Kullanıcının memmap vektör dosyasında tam top-k (similarity_score: kosinüs benzerliği)"""
+        def load_from_chroma():
+            results = self.entries_collection.get(
+                where={"user_id": user_id}, include=["embeddings", "documents", "metadatas"]
+            )
+            return results["ids"], results["embeddings"], results["documents"], results["metadatas"]
+        
+        # Kullanıcının deposu yoksa Chroma'daki girişleri bir kez aktar
+        self.user_vectors.ensure_user(user_id, load_from_chroma)
+        return self.user_vectors.search(user_id, query_embedding, n_results) or []
+    
+    async def hybrid_search_entries(
+        self,
+        user_id: str,
+        query_text: str,
+        n_results: int = 5,
+        mode: str = "auto"
+    ) -> Dict[str, Any]:
+        """BM25 ve vektör sonuçlarını reciprocal rank fusion ile birleştirir.
+        
+        ``mode``: ``auto`` (kısa anahtar kelime sorguları embedding'siz, diğerleri hibrit),
+        ``keyword``, ``semantic`` veya ``hybrid``.
+        """
+        return await self._run(self._hybrid_search_entries_sync, user_id, query_text, n_results, mode)
+    
+    def _hybrid_search_entries_sync(
+        self,
+        user_id: str,
+        query_text: str,
+        n_results: int = 5,
+        mode: str = "auto"
+    ) -> Dict[str, Any]:
+        """`hybrid_search_entries` gövdesi (executor thread'inde çalışır)"""
+        terms = tokenize(query_text)
+        candidates = max(n_results * 4, 20)
+        keyword_hits: List[Dict[str, Any]] = []
+        
+        try:
+            if mode != "semantic" and terms:
+                # Kullanıcının indeksi yoksa Chroma'daki girişleri bir kez aktar
+                self.keyword_index.ensure_user(user_id, lambda: self._load_keyword_docs(user_id))
+                keyword_hits = self.keyword_index.search(user_id, terms, candidates) or []
+        except Exception as e:
+            logger.error(f"Anahtar kelime arama hatası: {e}")
+        
+        if mode == "auto":
+            # Birkaç somut kelimeden oluşan ve indekste karşılığı olan sorgu: embedding atlanır
+            keyword_only = bool(keyword_hits) and len(set(terms)) <= self.hybrid_keyword_max_terms
+            mode = "keyword" if keyword_only else "hybrid"
+        
+        if mode == "keyword":
+            return {"mode": mode, "terms": terms, "results": keyword_hits[:n_results]}
+        
+        semantic_hits = self._find_similar_entries_sync(user_id, query_text, candidates)
+        if mode == "semantic" or not keyword_hits:
+            return {"mode": mode, "terms": terms, "results": semantic_hits[:n_results]}
+        
+        by_id: Dict[str, Dict[str, Any]] = {}
+        for hit in semantic_hits + keyword_hits:
+            by_id.setdefault(hit["id"], {"id": hit["id"], "text": hit["text"], "metadata": hit["metadata"]}).update(
+                {key: value for key, value in hit.items() if key.endswith("_score")}
+            )
+        fused = reciprocal_rank_fusion([
+            [hit["id"] for hit in keyword_hits],
+            [hit["id"] for hit in semantic_hits],
+        ])
+        results = []
+        for doc_id, score in fused[:n_results]:
+            results.append({**by_id[doc_id], "rrf_score": round(score, 6)})
+        return {"mode": mode, "terms": terms, "results": results}
+    
+    def _load_keyword_docs(self, user_id: str) -> Tuple[List[str], List[str], List[str], List[Dict[str, Any]]]:
+        """Kullanıcının girişlerini (embedding'siz) BM25 indeksine aktarım için okur"""
+        results = self.entries_collection.get(where={"user_id": user_id}, include=["documents", "metadatas"])
+        documents = results["documents"]
+        return results["ids"], [self._keyword_text(d or "") for d in documents], documents, results["metadatas"]
+    
+    async def get_entry_neighbors(self, user_id: str, entry_id: str, limit: int = 5) -> Dict[str, Any]:
+        """Girişin önceden hesaplanmış benzer girişleri (liste yoksa bir kez hesaplanır).
+        
+        Dönen ``neighbors`` öğeleri ``entry_id`` ve ``similarity_score`` içerir; ``source``
+        ``precomputed`` (birincil anahtar okuması) veya ``computed`` (ilk istek) olur.
+        """
+        if self.neighbor_store is None:
+            return {"neighbors": [], "source": "disabled"}
+        
+        # SQLite okuması kilitli ve bloklayıcıdır; sıcak yol da event loop dışında çalışır
+        neighbors, source = await self._run(self._get_entry_neighbors_sync, user_id, entry_id)
+        return {
+            "neighbors": [
+                {"entry_id": neighbor_id, "similarity_score": score}
+                for neighbor_id, score in neighbors[:limit]
+            ],
+            "source": source,
+        }
+    
+    def _get_entry_neighbors_sync(self, user_id: str, entry_id: str) -> Tuple[List[Tuple[str, float]], str]:
+        """`get_entry_neighbors` gövdesi: tek satırlık okuma, liste yoksa hesaplama"""
+        neighbors = self.neighbor_store.get(user_id, entry_id)
+        if neighbors is not None:
+            return neighbors, "precomputed"
+        return self._compute_entry_neighbors_sync(user_id, entry_id), "computed"
+    
+    def _compute_entry_neighbors_sync(self, user_id: str, entry_id: str) -> List[Tuple[str, float]]:
+        """Listesi olmayan giriş için Chroma'daki vektöründen komşuları hesaplayıp saklar"""
+        try:
+            results = self.entries_collection.get(
+                ids=[f"entry_{entry_id}_{user_id}"], include=["embeddings", "documents", "metadatas"]
+            )
+            if not results["ids"]:
+                return []
+            records = [(results["ids"][0], results["documents"][0], results["metadatas"][0])]
+            self._update_entry_neighbors(records, [results["embeddings"][0]])
+            return self.neighbor_store.get(user_id, entry_id) or []
+        except Exception as e:
+            logger.error(f"Komşu listesi hesaplama hatası: {e}")
+            return []
+    
+    def _update_entry_neighbors(self, records: List[Tuple[str, str, Dict[str, Any]]], embeddings: Any) -> None:
+        """Yeni girişlerin top-k listelerini yazar ve komşularının listelerine teklif olarak ekler.
+        
+        Kullanıcı başına tek çok-sorgulu Chroma çağrısı yapılır; kayıtlar koleksiyona yazıldıktan
+        sonra çağrıldığı için aynı batch'teki girişler birbirini de görür.
+        """
+        if self.neighbor_store is None or not records:
+            return
+        k = self.neighbor_store.k
+        by_user: Dict[str, List[int]] = {}
+        for position, record in enumerate(records):
+            by_user.setdefault(record[2]["user_id"], []).append(position)
+        
+        for user_id, positions in by_user.items():
+            try:
+                results = self.entries_collection.query(
+                    query_embeddings=[embeddings[position] for position in positions],
+                    n_results=k + 1,
+                    where={"user_id": user_id},
+                    include=["metadatas", "distances"]
+                )
+                lists, offers = [], []
+                for row, position in enumerate(positions):
+                    own_id = str(records[position][2]["entry_id"])
+                    neighbors = [
+                        (str(metadata["entry_id"]), 1 - distance)
+                        for metadata, distance in zip(results["metadatas"][row], results["distances"][row])
+                        if str(metadata.get("entry_id")) != own_id
+                    ][:k]
+                    lists.append((user_id, own_id, neighbors))
+                    offers.extend((neighbor_id, own_id, score) for neighbor_id, score in neighbors)
+                self.neighbor_store.set_many(lists)
+                self.neighbor_store.offer_many(user_id, offers)
+            except Exception as e:
+                # Komşu listeleri türetilmiş veridir; indekslemeyi bozmaz, ilk istekte hesaplanır
+                logger.warning(f"Komşu listeleri güncellenemedi (user {user_id}): {e}")
+    
     # ----- THERAPY TECHNIQUES -----
     
     async def add_therapy_technique(
@@ -155,37 +893,40 @@ class ChromaService:
         distortion_type: str
     ) -> bool:
         """Terapi tekniğini ChromaDB'ye ekler"""
+        added = await self.add_therapy_techniques_batch([{
+            "technique_id": technique_id,
+            "technique_data": technique_data,
+            "distortion_type": distortion_type,
+        }])
+        return added == 1
+    
+    async def add_therapy_techniques_batch(self, techniques: List[Dict[str, Any]]) -> int:
+        """Birden fazla terapi tekniğini toplu olarak ekler.
+
+        Her öğe ``technique_id``, ``technique_data`` ve ``distortion_type`` alanlarını içerir.
+        """
+        if not techniques:
+            return 0
+        return await self._run(self._add_therapy_techniques_batch_sync, techniques)
+    
+    def _add_therapy_techniques_batch_sync(self, techniques: List[Dict[str, Any]]) -> int:
+        """`add_therapy_techniques_batch` gövdesi (executor thread'inde çalışır)"""
         try:
-            # Technique text hazırla
-            technique_text = f"""
-            Başlık: {technique_data.get('title', '')}
-            Açıklama: {technique_data.get('description', '')}
-            Egzersiz: {technique_data.get('exercise', '')}
-            Çarpıtma Türü: {distortion_type}
-            """
-            
-            # Metadata hazırla
-            metadata = {
-                "technique_id": technique_id,
-                "distortion_type": distortion_type,
-                "title": technique_data.get('title', ''),
-                "difficulty": technique_data.get('difficulty', 'orta'),
-                "duration": technique_data.get('duration', ''),
-                "added_at": datetime.now().isoformat()
-            }
-            
-            # ChromaDB'ye ekle
-            self.techniques_collection.add(
-                documents=[technique_text],
-                metadatas=[metadata],
-                ids=[technique_id]
-            )
-            
-            return True
+            records = [
+                self._technique_record(
+                    technique_id=item["technique_id"],
+                    technique_data=item["technique_data"],
+                    distortion_type=item["distortion_type"],
+                )
+                for item in techniques
+            ]
+            self._upsert_records(self.techniques_collection, records)
+            self._rebuild_technique_index()
+            return len(records)
             
         except Exception as e:
             logger.error(f"Technique ekleme hatası: {e}")
-            return False
+            return 0
     
     async def find_relevant_techniques(
         self, 
@@ -195,38 +936,241 @@ class ChromaService:
         difficulty: Optional[str] = None
     ) -> List[Dict[str, Any]]:
         """İlgili terapi tekniklerini bulur"""
+        if self.query_batcher is not None:
+            return await self._submit_query({
+                "kind": "techniques",
+                "query_text": query_text,
+                "distortion_types": distortion_types,
+                "n_results": n_results,
+                "difficulty": difficulty,
+            })
+        return await self._run(self._find_relevant_techniques_sync, query_text, distortion_types, n_results, difficulty)
+    
+    def _find_relevant_techniques_sync(
+        self, 
+        query_text: str, 
+        distortion_types: List[str] = None, 
+        n_results: int = 3,
+        difficulty: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """`find_relevant_techniques` gövdesi (executor thread'inde çalışır)"""
         try:
-            # Basit filtre - sadece tek condition
-            where_filter = None
-            if distortion_types and len(distortion_types) == 1:
-                # Tek distortion type için basit filtre
-                where_filter = {"distortion_type": distortion_types[0]}
-            elif difficulty:
-                where_filter = {"difficulty": difficulty}
+            where_filter = self._technique_where(distortion_types, difficulty)
+            query_embedding = self._embed_query(query_text)
+            
+            index = self.technique_index
+            if index is not None:
+                return self._search_technique_index(index, query_embedding, n_results, where_filter)
             
             # Semantik arama yap
             results = self.techniques_collection.query(
-                query_texts=[query_text],
+                query_embeddings=[query_embedding],
                 n_results=n_results,
                 where=where_filter
             )
             
-            # Sonuçları formatla
-            relevant_techniques = []
-            for i in range(len(results['documents'][0])):
-                relevant_techniques.append({
-                    "id": results['ids'][0][i],
-                    "text": results['documents'][0][i],
-                    "metadata": results['metadatas'][0][i],
-                    "relevance_score": 1 - results['distances'][0][i]
-                })
-            
-            return relevant_techniques
+            return self._format_query_results(results, 0, "relevance_score")
             
         except Exception as e:
             logger.error(f"Technique bulma hatası: {e}")
             return []
     
+    @staticmethod
+    def _technique_where(distortion_types: Optional[List[str]], difficulty: Optional[str]) -> Optional[Dict[str, Any]]:
+        """Basit filtre - sadece tek condition"""
+        if distortion_types and len(distortion_types) == 1:
+            # Tek distortion type için basit filtre (metadata kanonik anahtarla yazılır)
+            return {"distortion_type": normalize_distortion(distortion_types[0])}
+        if difficulty:
+            return {"difficulty": difficulty}
+        return None
+    
+    @staticmethod
+    def _search_technique_index(
+        index: TechniqueIndex,
+        query_embedding: Any,
+        n_results: int,
+        where_filter: Optional[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        """Süreç içi indeks: Chroma ile aynı filtre, tek matris-vektör çarpımı"""
+        where_filter = where_filter or {}
+        return index.search(
+            query_embedding,
+            n_results=n_results,
+            distortion_types=[where_filter["distortion_type"]] if "distortion_type" in where_filter else None,
+            difficulty=where_filter.get("difficulty"),
+        )
+    
+    async def find_relevant_techniques_multi(
+        self,
+        query_text: str,
+        distortion_types: List[str],
+        n_per_type: int = 3
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """Birden fazla çarpıtma türü için tek sorgu yapar, sonuçları türe göre böler"""
+        return await self._run(self._find_relevant_techniques_multi_sync, query_text, distortion_types, n_per_type)
+    
+    def _find_relevant_techniques_multi_sync(
+        self,
+        query_text: str,
+        distortion_types: List[str],
+        n_per_type: int = 3
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """`find_relevant_techniques_multi` gövdesi (executor thread'inde çalışır)"""
+        types = list(dict.fromkeys(normalize_distortion(t) for t in distortion_types or []))
+        by_type: Dict[str, List[Dict[str, Any]]] = {t: [] for t in types}
+        if not types:
+            return by_type
+        
+        try:
+            query_embedding = self._embed_query(query_text)
+            index = self.technique_index
+            if index is not None:
+                # Katalog küçük: maskeye uyan tüm teknikler sıralanır, her türün top-k'sı garanti
+                hits = index.search(query_embedding, n_results=len(index), distortion_types=types)
+            else:
+                where_filter = (
+                    {"distortion_type": types[0]} if len(types) == 1
+                    else {"distortion_type": {"$in": types}}
+                )
+                results = self.techniques_collection.query(
+                    query_embeddings=[query_embedding],
+                    n_results=n_per_type * len(types),
+                    where=where_filter
+                )
+                hits = self._format_query_results(results, 0, "relevance_score")
+            
+            # Sonuçlar skora göre sıralı geldiği için türe göre bölmek sırayı korur
+            for hit in hits:
+                bucket = by_type.get(hit["metadata"].get("distortion_type"))
+                if bucket is not None and len(bucket) < n_per_type:
+                    bucket.append(hit)
+            return by_type
+            
+        except Exception as e:
+            logger.error(f"Çoklu technique bulma hatası: {e}")
+            return by_type
+    
+    # ----- TEK EMBEDDING İLE İNDEKSLEME -----
+    
+    async def index_entry(
+        self,
+        entry_id: str,
+        user_id: str,
+        text: str,
+        analysis_result: Dict[str, Any],
+        analysis_id: Optional[str] = None,
+        mood_score: Optional[int] = None
+    ) -> bool:
+        """Girişi bir kez embed edip aynı vektörü tüm ilgili koleksiyonlara yazar"""
+        indexed = await self.index_entries_batch([{
+            "entry_id": entry_id,
+            "user_id": user_id,
+            "text": text,
+            "analysis_result": analysis_result,
+            "analysis_id": analysis_id,
+            "mood_score": mood_score,
+        }])
+        return indexed == 1
+    
+    async def index_entries_batch(self, items: List[Dict[str, Any]]) -> int:
+        """Girişleri tek embedding geçişiyle entries ve analysis koleksiyonlarına yazar.
+        
+        Öğeler ``add_user_entries_batch`` alanlarına ek olarak opsiyonel ``analysis_id`` içerir;
+        ``analysis_id`` verilen girişler analysis koleksiyonuna da aynı vektörle eklenir.
+        İndekslenen giriş sayısını döndürür.
+        """
+        if not items:
+            return 0
+        return await self._run(self._index_entries_batch_sync, items)
+    
+    def _index_entries_batch_sync(self, items: List[Dict[str, Any]]) -> int:
+        """`index_entries_batch` gövdesi (executor thread'inde çalışır)"""
+        try:
+            entry_records = [
+                self._entry_record(
+                    entry_id=item["entry_id"],
+                    user_id=item["user_id"],
+                    text=item["text"],
+                    analysis_result=item.get("analysis_result") or {},
+                    mood_score=item.get("mood_score"),
+                    created_at=item.get("created_at"),
+                )
+                for item in items
+            ]
+            embeddings = self._embed([record[1] for record in entry_records])
+            entry_embeddings = self._transform_entries(embeddings)
+            self._upsert_records(self.entries_collection, entry_records, entry_embeddings)
+            self._write_user_vectors(entry_records, entry_embeddings)
+            self._write_keyword_index(entry_records)
+            self._update_entry_neighbors(entry_records, entry_embeddings)
+            
+            # Analiz kayıtları giriş vektörünü (tam boyutlu) yeniden kullanır (ikinci forward pass yok)
+            analysis_records = []
+            analysis_embeddings = []
+            for item, embedding in zip(items, embeddings):
+                if item.get("analysis_id") is None:
+                    continue
+                analysis_records.append(self._analysis_record(
+                    analysis_id=str(item["analysis_id"]),
+                    user_id=item["user_id"],
+                    entry_text=item["text"],
+                    analysis_data=item.get("analysis_result") or {},
+                    analyzed_at=item.get("analyzed_at"),
+                ))
+                analysis_embeddings.append(embedding)
+            if analysis_records:
+                self._upsert_records(self.analysis_collection, analysis_records, analysis_embeddings)
+                self.pattern_store.add_many(record[2] for record in analysis_records)
+            
+            logger.info(f"{len(entry_records)} entry tek embedding ile indekslendi ({len(analysis_records)} analiz)")
+            return len(entry_records)
+            
+        except Exception as e:
+            logger.error(f"Entry indeksleme hatası: {e}")
+            return 0
+    
+    async def delete_entries_batch(self, items: List[Dict[str, Any]]) -> int:
+        """SQL'den silinen girişleri tüm indekslerden düşer.
+
+        Her öğe ``entry_id``, ``user_id`` ve opsiyonel ``analysis_id`` içerir. Entry / analiz
+        vektörleri, kalıp sayaçları, BM25 postingleri ve komşu listeleri güncellenir.
+        İşlenen giriş sayısını döndürür.
+        """
+        if not items:
+            return 0
+        return await self._run(self._delete_entries_batch_sync, items)
+    
+    def _delete_entries_batch_sync(self, items: List[Dict[str, Any]]) -> int:
+        """`delete_entries_batch` gövdesi (executor thread'inde çalışır)"""
+        try:
+            entry_ids = [f"entry_{item['entry_id']}_{item['user_id']}" for item in items]
+            analysis_items = [item for item in items if item.get("analysis_id") is not None]
+            self.entries_collection.delete(ids=entry_ids)
+            if analysis_items:
+                self.analysis_collection.delete(ids=[str(item["analysis_id"]) for item in analysis_items])
+            
+            for item, chroma_id in zip(items, entry_ids):
+                user_id = str(item["user_id"])
+                self.keyword_index.remove(user_id, chroma_id)
+                if self.neighbor_store is not None:
+                    self.neighbor_store.remove(user_id, str(item["entry_id"]))
+            for item in analysis_items:
+                self.pattern_store.remove(str(item["user_id"]), str(item["analysis_id"]))
+            if self.user_vectors is not None:
+                removed: Dict[str, List[str]] = {}
+                for item, chroma_id in zip(items, entry_ids):
+                    removed.setdefault(str(item["user_id"]), []).append(chroma_id)
+                for user_id, ids in removed.items():
+                    self.user_vectors.remove_many(user_id, ids)
+            
+            logger.info(f"{len(items)} entry indekslerden silindi ({len(analysis_items)} analiz)")
+            return len(items)
+            
+        except Exception as e:
+            logger.error(f"Entry silme hatası: {e}")
+            return 0
+    
     # ----- ANALYSIS RESULTS -----
     
     async def add_analysis_result(
@@ -237,104 +1181,291 @@ class ChromaService:
         analysis_data: Dict[str, Any]
     ) -> bool:
         """Analiz sonucunu ChromaDB'ye ekler"""
+        added = await self.add_analysis_results_batch([{
+            "analysis_id": analysis_id,
+            "user_id": user_id,
+            "entry_text": entry_text,
+            "analysis_data": analysis_data,
+        }])
+        return added == 1
+    
+    async def add_analysis_results_batch(self, analyses: List[Dict[str, Any]]) -> int:
+        """Birden fazla analiz sonucunu toplu olarak ekler.
+
+        Her öğe ``analysis_id``, ``user_id``, ``entry_text`` ve ``analysis_data`` alanlarını içerir.
+        """
+        if not analyses:
+            return 0
+        return await self._run(self._add_analysis_results_batch_sync, analyses)
+    
+    def _add_analysis_results_batch_sync(self, analyses: List[Dict[str, Any]]) -> int:
+        """`add_analysis_results_batch` gövdesi (executor thread'inde çalışır)"""
         try:
-            # Analysis text hazırla
-            distortions_text = "\n".join([
-                f"- {d.get('type', '')}: {d.get('explanation', '')}"
-                for d in analysis_data.get('distortions', [])
-            ])
-            
-            analysis_text = f"""
-            Giriş: {entry_text}
-            
-            Tespit Edilen Çarpıtmalar:
-            {distortions_text}
-            
-            Genel Ruh Hali: {analysis_data.get('overall_mood', '')}
-            Risk Seviyesi: {analysis_data.get('risk_level', '')}
-            """
-            
-            # Metadata hazırla
-            metadata = {
-                "analysis_id": analysis_id,
-                "user_id": user_id,
-                "distortion_count": len(analysis_data.get('distortions', [])),
-                "distortion_types": ",".join([d.get("type", "") for d in analysis_data.get("distortions", [])]),
-                "overall_mood": analysis_data.get('overall_mood', ''),
-                "risk_level": analysis_data.get('risk_level', ''),
-                "analyzed_at": datetime.now().isoformat()
-            }
-            
-            # ChromaDB'ye ekle
-            self.analysis_collection.add(
-                documents=[analysis_text],
-                metadatas=[metadata],
-                ids=[analysis_id]
-            )
+            records = [
+                self._analysis_record(
+                    analysis_id=item["analysis_id"],
+                    user_id=item["user_id"],
+                    entry_text=item["entry_text"],
+                    analysis_data=item.get("analysis_data") or {},
+                    analyzed_at=item.get("analyzed_at"),
+                )
+                for item in analyses
+            ]
+            self._upsert_records(self.analysis_collection, records)
+            self.pattern_store.add_many(record[2] for record in records)
+            return len(records)
             
+        except Exception as e:
+            logger.error(f"Analysis ekleme hatası: {e}")
+            return 0
+    
+    async def delete_analysis_result(self, analysis_id: str, user_id: str) -> bool:
+        """Analiz sonucunu koleksiyondan ve kullanıcı kalıp özetinden siler"""
+        return await self._run(self._delete_analysis_result_sync, analysis_id, user_id)
+    
+    def _delete_analysis_result_sync(self, analysis_id: str, user_id: str) -> bool:
+        """`delete_analysis_result` gövdesi (executor thread'inde çalışır)"""
+        try:
+            self.analysis_collection.delete(ids=[analysis_id])
+            self.pattern_store.remove(user_id, analysis_id)
             return True
             
         except Exception as e:
-            logger.error(f"Analysis ekleme hatası: {e}")
+            logger.error(f"Analysis silme hatası: {e}")
             return False
     
     # ----- ANALYTICS -----
     
     async def get_user_patterns(self, user_id: str) -> Dict[str, Any]:
         """Kullanıcının düşünce kalıplarını analiz eder"""
+        return await self._run(self._get_user_patterns_sync, user_id)
+    
+    def _get_user_patterns_sync(self, user_id: str) -> Dict[str, Any]:
+        """`get_user_patterns` gövdesi (executor thread'inde çalışır)"""
         try:
-            # Kullanıcının tüm analiz sonuçlarını al
-            results = self.analysis_collection.get(
-                where={"user_id": user_id}
-            )
-            
-            if not results['metadatas']:
-                return {"message": "Henüz yeterli veri yok"}
-            
-            # İstatistikleri hesapla
-            distortion_counts = {}
-            mood_distribution = {}
-            risk_levels = {}
-            
-            for metadata in results['metadatas']:
-                # Çarpıtma türleri
-                if metadata.get('distortion_types'):
-                    for dtype in metadata['distortion_types'].split(','):
-                        if dtype.strip():
-                            distortion_counts[dtype.strip()] = distortion_counts.get(dtype.strip(), 0) + 1
-                
-                # Ruh hali dağılımı
-                mood = metadata.get('overall_mood', 'unknown')
-                mood_distribution[mood] = mood_distribution.get(mood, 0) + 1
-                
-                # Risk seviyeleri
-                risk = metadata.get('risk_level', 'unknown')
-                risk_levels[risk] = risk_levels.get(risk, 0) + 1
+            patterns = self.pattern_store.get_patterns(user_id)
+            if patterns is None:
+                # Özet henüz yok: kullanıcının analizlerini bir kez tarayıp oluştur
+                self.pattern_store.ensure_user(
+                    user_id,
+                    lambda: self.analysis_collection.get(
+                        where={"user_id": user_id}, include=["metadatas"]
+                    )["metadatas"] or []
+                )
+                patterns = self.pattern_store.get_patterns(user_id)
             
-            return {
-                "total_analyses": len(results['metadatas']),
-                "most_common_distortions": sorted(distortion_counts.items(), key=lambda x: x[1], reverse=True)[:5],
-                "mood_distribution": mood_distribution,
-                "risk_level_distribution": risk_levels,
-                "analysis_period": {
-                    "first_analysis": min([m.get('analyzed_at', '') for m in results['metadatas']]),
-                    "last_analysis": max([m.get('analyzed_at', '') for m in results['metadatas']])
-                }
-            }
+            return patterns
             
         except Exception as e:
             logger.error(f"Pattern analizi hatası: {e}")
             return {"error": "Pattern analizi yapılamadı"}
     
+    # ----- RECORD BUILDERS -----
+    
+    def _entry_record(
+        self,
+        entry_id: str,
+        user_id: str,
+        text: str,
+        analysis_result: Dict[str, Any],
+        mood_score: Optional[int] = None,
+        created_at: Optional[str] = None
+    ) -> Tuple[str, str, Dict[str, Any]]:
+        """Entry için (id, document, metadata) üretir"""
+        distortions = [normalize_distortion(d.get("type")) for d in analysis_result.get("distortions", [])]
+        created_at = created_at or utc_now_iso()
+        metadata = {
+            "user_id": user_id,
+            "entry_id": entry_id,
+            "mood_score": mood_score or 5,
+            "created_at": created_at,
+            # Aralık filtresi için sayısal zaman (Chroma ISO string üzerinde $gte/$lte yapamaz)
+            "created_at_ts": to_epoch(created_at),
+            "distortions": ",".join(distortions),
+            "overall_mood": analysis_result.get("overall_mood", "neutral"),
+            "risk_level": analysis_result.get("risk_level", "low")
+        }
+        # Çarpıtma filtresi vektör sorgusuna insin diye tür başına boolean bayrak
+        for distortion_type in distortions:
+            metadata[distortion_flag(distortion_type)] = True
+        
+        # Vektöre çevrilecek text hazırla
+        document_text = f"{text}\n\nAnaliz: {analysis_result.get('overall_mood', '')}"
+        
+        return f"entry_{entry_id}_{user_id}", document_text, metadata
+    
+    def _technique_record(
+        self,
+        technique_id: str,
+        technique_data: Dict[str, Any],
+        distortion_type: str
+    ) -> Tuple[str, str, Dict[str, Any]]:
+        """Terapi tekniği için (id, document, metadata) üretir"""
+        distortion_type = normalize_distortion(distortion_type)
+        
+        technique_text = f"""
+            Başlık: {technique_data.get('title', '')}
+            Açıklama: {technique_data.get('description', '')}
+            Egzersiz: {technique_data.get('exercise', '')}
+            Çarpıtma Türü: {distortion_type}
+            """
+        
+        metadata = {
+            "technique_id": technique_id,
+            "distortion_type": distortion_type,
+            "title": technique_data.get('title', ''),
+            "difficulty": technique_data.get('difficulty', 'orta'),
+            "duration": technique_data.get('duration', ''),
+            "added_at": datetime.now().isoformat()
+        }
+        
+        return technique_id, technique_text, metadata
+    
+    def _analysis_record(
+        self,
+        analysis_id: str,
+        user_id: str,
+        entry_text: str,
+        analysis_data: Dict[str, Any],
+        analyzed_at: Optional[str] = None
+    ) -> Tuple[str, str, Dict[str, Any]]:
+        """Analiz sonucu için (id, document, metadata) üretir"""
+        distortions_text = "\n".join([
+            f"- {d.get('type', '')}: {d.get('explanation', '')}"
+            for d in analysis_data.get('distortions', [])
+        ])
+        
+        analysis_text = f"""
+            Giriş: {entry_text}
+            
+            Tespit Edilen Çarpıtmalar:
+            {distortions_text}
+            
+            Genel Ruh Hali: {analysis_data.get('overall_mood', '')}
+            Risk Seviyesi: {analysis_data.get('risk_level', '')}
+            """
+        
+        metadata = {
+            "analysis_id": analysis_id,
+            "user_id": user_id,
+            "distortion_count": len(analysis_data.get('distortions', [])),
+            "distortion_types": ",".join([normalize_distortion(d.get("type")) for d in analysis_data.get("distortions", [])]),
+            "overall_mood": analysis_data.get('overall_mood', ''),
+            "risk_level": analysis_data.get('risk_level', ''),
+            "analyzed_at": analyzed_at or utc_now_iso()
+        }
+        
+        return analysis_id, analysis_text, metadata
+    
+    # ----- EMBEDDING / WRITE HELPERS -----
+    
+    def _embed(self, texts: List[str]) -> List[Any]:
+        """Metinleri model boyutlu batch'ler halinde embed eder"""
+        embeddings: List[Any] = []
+        for start in range(0, len(texts), self.embed_batch_size):
+            embeddings.extend(self.embedding_function(texts[start:start + self.embed_batch_size]))
+        return embeddings
+    
+    def _embed_query(self, text: str) -> Any:
+        """Sorgu metnini önbellek üzerinden embed eder"""
+        return self.query_cache.get_or_compute(text, self._embed)
+    
+    def _transform_entries(self, embeddings: Any) -> Any:
+        """user_entries yazma/sorgu vektörlerine (açıksa) PCA projeksiyonunu uygular"""
+        if self.entry_transform is None:
+            return embeddings
+        return self.entry_transform.apply(embeddings)
+    
+    def _upsert_records(
+        self,
+        collection,
+        records: List[Tuple[str, str, Dict[str, Any]]],
+        embeddings: Optional[List[Any]] = None
+    ) -> None:
+        """Kayıtları koleksiyona tek upsert çağrısıyla yazar (Chroma batch limiti aşılırsa bölünür).
+        
+        Upsert sayesinde aynı ID ile tekrar yazmak (yeniden indeksleme, script tekrarı) güvenlidir;
+        ``embeddings`` verilmezse dokümanlar burada embed edilir.
+        """
+        ids = [record[0] for record in records]
+        documents = [record[1] for record in records]
+        metadatas = [record[2] for record in records]
+        if embeddings is None:
+            embeddings = self._embed(documents)
+        
+        max_batch = self._max_write_batch()
+        for start in range(0, len(ids), max_batch):
+            end = start + max_batch
+            collection.upsert(
+                ids=ids[start:end],
+                documents=documents[start:end],
+                metadatas=metadatas[start:end],
+                embeddings=embeddings[start:end]
+            )
+    
+    def _write_user_vectors(self, records: List[Tuple[str, str, Dict[str, Any]]], embeddings: List[Any]) -> None:
+        """Entry kayıtlarını (memmap backend açıksa) kullanıcı vektör dosyalarına da yazar"""
+        if self.user_vectors is None or not records:
+            return
+        self.user_vectors.upsert_many(
+            user_ids=[record[2]["user_id"] for record in records],
+            ids=[record[0] for record in records],
+            embeddings=embeddings,
+            documents=[record[1] for record in records],
+            metadatas=[record[2] for record in records],
+        )
+    
+    def _write_keyword_index(self, records: List[Tuple[str, str, Dict[str, Any]]]) -> None:
+        """Entry kayıtlarını BM25 indeksine yazar (embedding gerektirmez)"""
+        if not records:
+            return
+        self.keyword_index.add_many(
+            user_ids=[record[2]["user_id"] for record in records],
+            doc_ids=[record[0] for record in records],
+            texts=[self._keyword_text(record[1]) for record in records],
+            documents=[record[1] for record in records],
+            metadatas=[record[2] for record in records],
+        )
+    
+    @staticmethod
+    def _keyword_text(document: str) -> str:
+        """Entry dokümanından yalnızca kullanıcının yazdığı metin (eklenen "Analiz: ..." satırı indekslenmez)"""
+        return document.split("\n\nAnaliz:", 1)[0]
+    
+    def _max_write_batch(self) -> int:
+        """Chroma'nın tek çağrıda kabul ettiği en büyük kayıt sayısı"""
+        try:
+            return int(self.client.get_max_batch_size())
+        except Exception:
+            return 5000
+    
     # ----- UTILITY -----
     
     async def get_collection_stats(self) -> Dict[str, Any]:
         """Koleksiyon istatistiklerini döndürür"""
+        return await self._run(self._get_collection_stats_sync)
+    
+    def _get_collection_stats_sync(self) -> Dict[str, Any]:
+        """`get_collection_stats` gövdesi (executor thread'inde çalışır)"""
         try:
             stats = {
+                "mode": self.chroma_mode,
+                "embedding_backend": type(self.embedding_function).__name__,
                 "entries": self.entries_collection.count(),
                 "techniques": self.techniques_collection.count(),
                 "analyses": self.analysis_collection.count(),
+                "executor": self.get_executor_stats(),
+                "query_cache": self.query_cache.get_stats(),
+                "query_batcher": self.query_batcher.get_stats() if self.query_batcher is not None else None,
+                "technique_index": len(self.technique_index) if self.technique_index is not None else None,
+                "hnsw": {
+                    name: collection_hnsw(collection)
+                    for name, collection in (
+                        ("user_entries", self.entries_collection),
+                        ("therapy_techniques", self.techniques_collection),
+                        ("analysis_results", self.analysis_collection),
+                    )
+                },
                 "timestamp": datetime.now().isoformat()
             }
             return stats
@@ -345,12 +1476,22 @@ class ChromaService:
     
     async def clear_user_data(self, user_id: str) -> bool:
         """Kullanıcının tüm verilerini temizler"""
+        return await self._run(self._clear_user_data_sync, user_id)
+    
+    def _clear_user_data_sync(self, user_id: str) -> bool:
+        """`clear_user_data` gövdesi (executor thread'inde çalışır)"""
         try:
             # Entries
             self.entries_collection.delete(where={"user_id": user_id})
             
             # Analyses  
             self.analysis_collection.delete(where={"user_id": user_id})
+            self.pattern_store.remove_user(user_id)
+            self.keyword_index.remove_user(user_id)
+            if self.neighbor_store is not None:
+                self.neighbor_store.remove_user(user_id)
+            if self.user_vectors is not None:
+                self.user_vectors.remove_user(user_id)
             
             logger.info(f"Kullanıcı {user_id} verileri temizlendi")
             return True
@@ -363,9 +1504,67 @@ class ChromaService:
 # Global instance
 chroma_service = None
 
+# Lazy yükleme / ısınma durumu: idle -> loading -> ready | failed
+_service_lock = threading.Lock()
+_warmup_thread: Optional[threading.Thread] = None
+_service_status: Dict[str, Any] = {"state": "idle", "error": None, "load_seconds": None}
+
+
 def get_chroma_service() -> ChromaService:
-    """ChromaService singleton instance'ını döndürür"""
+    """ChromaService singleton instance'ını döndürür (ilk çağrıda modeli yükler)"""
     global chroma_service
-    if chroma_service is None:
-        chroma_service = ChromaService()
+    if chroma_service is not None:
+        return chroma_service
+    
+    with _service_lock:
+        if chroma_service is None:
+            if _service_status["state"] == "failed":
+                raise RuntimeError(f"ChromaDB başlatılamamıştı: {_service_status['error']}")
+            
+            _service_status["state"] = "loading"
+            start = time.monotonic()
+            try:
+                service = ChromaService()
+                # İlk forward pass'i de burada yap, ilk kullanıcı isteği ödemesin
+                service._embed(["ısınma"])
+            except Exception as e:
+                _service_status.update(state="failed", error=str(e))
+                raise
+            chroma_service = service
+            _service_status.update(state="ready", load_seconds=round(time.monotonic() - start, 2))
     return chroma_service
+
+
+def start_warmup() -> None:
+    """ChromaService'i arka plan thread'inde yükler (uygulama açılışında çağrılır)"""
+    global _warmup_thread
+    with _service_lock:
+        if _warmup_thread is not None or _service_status["state"] != "idle":
+            return
+        # Thread başlamadan "loading" işaretlenir; istekler bu sürede yüklemeyi beklemez
+        _service_status["state"] = "loading"
+        
+        def _warmup():
+            try:
+                get_chroma_service()
+                logger.info(f"ChromaDB ısınması tamamlandı ({_service_status['load_seconds']} sn)")
+            except Exception as e:
+                logger.warning(f"ChromaDB ısınması başarısız: {e}")
+        
+        _warmup_thread = threading.Thread(target=_warmup, name="chroma-warmup", daemon=True)
+        _warmup_thread.start()
+
+
+def is_ready() -> bool:
+    """Vektör özellikleri (ChromaDB + embedding modeli) kullanıma hazır mı"""
+    return chroma_service is not None
+
+
+def is_loading() -> bool:
+    """Servis şu anda (arka planda) yükleniyor mu"""
+    return _service_status["state"] == "loading"
+
+
+def get_service_status() -> Dict[str, Any]:
+    """Readiness probe için yükleme durumu"""
+    return dict(_service_status)
@@ -0,0 +1,295 @@
+"""
+Embedding Backend'leri - Çok dilli MiniLM modeli için seçilebilir çalışma zamanı
+EMBEDDING_BACKEND ile seçilir:
+    torch      : sentence-transformers + PyTorch (varsayılan, eski davranış)
+    onnx       : modeli bir kez ONNX'e export eder, onnxruntime ile çalıştırır
+    onnx-int8  : ONNX modeline dinamik int8 quantization uygular (en düşük CPU/bellek)
+    remote     : model bu süreçte yüklenmez; metinler EMBEDDING_SERVER_URL'deki paylaşılan
+                 embedding sunucusuna (scripts/embedding_server.py) gönderilir. Sunucuya
+                 ulaşılamazsa başlatma hata verir; yerel modele düşmek için
+                 EMBEDDING_REMOTE_FALLBACK=local açıkça verilmelidir.
+
+ONNX modelleri EMBEDDING_ONNX_DIR (varsayılan: ./onnx_models) altında saklanır; ilk
+çalıştırmada export edilir, sonraki worker'lar hazır dosyayı yükler.
+"""
+
+import os
+import logging
+import threading
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+EMBEDDING_MODEL_NAME = "paraphrase-multilingual-MiniLM-L12-v2"
+EMBEDDING_BACKENDS = ("torch", "onnx", "onnx-int8", "remote")
+DEFAULT_EMBEDDING_SERVER_URL = "http://127.0.0.1:8790"
+
+# Export sırasında aynı süreçteki eşzamanlı başlatmaların dosyayı iki kez yazmasını önler
+_export_lock = threading.Lock()
+
+# Sınıf -> bu süreçte oluşturulmuş embedder (Chroma config'ten yeniden kurarken kullanılır)
+_live_instances: Dict[type, Any] = {}
+
+
+def _model_dir(model_name: str, onnx_dir: Optional[str] = None) -> str:
+    base = onnx_dir or os.getenv("EMBEDDING_ONNX_DIR", os.path.join(os.getcwd(), "onnx_models"))
+    return os.path.join(base, model_name.replace("/", "__"))
+
+
+def export_onnx(model_name: str = EMBEDDING_MODEL_NAME, onnx_dir: Optional[str] = None, quantize: bool = False) -> str:
+    """Modeli ONNX'e export eder (gerekirse int8 quantize eder) ve dosya yolunu döndürür.
+
+    Dosyalar zaten varsa tekrar üretilmez.
+    """
+    target_dir = _model_dir(model_name, onnx_dir)
+    fp32_path = os.path.join(target_dir, "model.onnx")
+    int8_path = os.path.join(target_dir, "model.int8.onnx")
+
+    with _export_lock:
+        if not os.path.exists(fp32_path):
+            import torch
+            from sentence_transformers import SentenceTransformer
+
+            logger.info(f"{model_name} ONNX'e export ediliyor: {fp32_path}")
+            os.makedirs(target_dir, exist_ok=True)
+            st_model = SentenceTransformer(model_name, device="cpu")
+            transformer = st_model[0].auto_model.eval()
+            tokenizer = st_model.tokenizer
+            tokenizer.save_pretrained(target_dir)
+
+            dummy = tokenizer(["örnek cümle"], return_tensors="pt")
+            tmp_path = f"{fp32_path}.tmp"
+            with torch.no_grad():
+                torch.onnx.export(
+                    transformer,
+                    (dummy["input_ids"], dummy["attention_mask"]),
+                    tmp_path,
+                    input_names=["input_ids", "attention_mask"],
+                    output_names=["last_hidden_state"],
+                    dynamic_axes={
+                        "input_ids": {0: "batch", 1: "sequence"},
+                        "attention_mask": {0: "batch", 1: "sequence"},
+                        "last_hidden_state": {0: "batch", 1: "sequence"},
+                    },
+                    opset_version=17,
+                )
+            os.replace(tmp_path, fp32_path)
+
+        if quantize and not os.path.exists(int8_path):
+            from onnxruntime.quantization import QuantType, quantize_dynamic
+
+            logger.info(f"ONNX modeli int8'e quantize ediliyor: {int8_path}")
+            tmp_path = f"{int8_path}.tmp"
+            quantize_dynamic(fp32_path, tmp_path, weight_type=QuantType.QInt8)
+            os.replace(tmp_path, int8_path)
+
+    return int8_path if quantize else fp32_path
+
+
+class _SentenceTransformerCompatibleFunction:
+    """ONNX ve remote embedder'larının ortak Chroma embedding_function arayüzü.
+
+    Chroma koleksiyonu oluştururken embedding fonksiyonunun adını ve config'ini kalıcı yazar,
+    sonraki açılışlarda adları karşılaştırır. Bu backend'ler torch backend'iyle
+    (SentenceTransformerEmbeddingFunction) aynı vektör uzayını ürettiği için aynı adı ve aynı
+    config'i kullanır; hangi backend'le oluşturulmuş olursa olsun koleksiyon diğerleriyle
+    yeniden indekslenmeden açılır. chromadb'nin EmbeddingFunction sınıfından türetilmez:
+    chromadb bu modül import edilirken değil, client oluşturulurken yüklenir.
+    """
+
+    model_name: Optional[str] = EMBEDDING_MODEL_NAME
+
+    @staticmethod
+    def name() -> str:
+        return "sentence_transformer"
+
+    def default_space(self) -> str:
+        return "cosine"
+
+    def supported_spaces(self) -> List[str]:
+        return ["cosine", "l2", "ip"]
+
+    def is_legacy(self) -> bool:
+        return False
+
+    def get_config(self) -> Dict[str, Any]:
+        # SentenceTransformerEmbeddingFunction.get_config ile aynı alanlar
+        return {
+            "model_name": self.model_name or EMBEDDING_MODEL_NAME,
+            "device": "cpu",
+            "normalize_embeddings": False,
+            "kwargs": {},
+        }
+
+    @classmethod
+    def build_from_config(cls, config: Dict[str, Any]) -> Any:
+        live = _live_instances.get(cls)
+        if live is not None:
+            return live
+        return create_embedding_function(model_name=config.get("model_name") or EMBEDDING_MODEL_NAME)
+
+    @staticmethod
+    def validate_config(config: Dict[str, Any]) -> None:
+        return
+
+    def validate_config_update(self, old_config: Dict[str, Any], new_config: Dict[str, Any]) -> None:
+        return
+
+
+class ConfigOnlyEmbeddingFunction(_SentenceTransformerCompatibleFunction):
+    """Model yüklemeyen embedder: Chroma'ya yalnızca koleksiyon config'ini (ad, space) bildirir.
+
+    Vektörleri başka süreçlerde hesaplayıp açıkça yazan araçlar (reindex_chroma.py) içindir;
+    koleksiyonlar ChromaService'in oluşturacağıyla aynı config'le açılır. Çağrılırsa hata verir.
+    """
+
+    def __init__(self, model_name: str = EMBEDDING_MODEL_NAME):
+        self.model_name = model_name
+
+    def __call__(self, input: List[str]) -> List[Any]:
+        raise RuntimeError("ConfigOnlyEmbeddingFunction metin embed etmez; vektörler açıkça verilmelidir")
+
+
+class OnnxEmbeddingFunction(_SentenceTransformerCompatibleFunction):
+    """onnxruntime ile çalışan, Chroma embedding_function arayüzüyle uyumlu MiniLM embedder.
+
+    sentence-transformers pipeline'ı (mean pooling, normalize yok) birebir uygulanır,
+    böylece vektörler PyTorch backend'iyle aynı uzayda kalır ve mevcut koleksiyonlar
+    yeniden indekslenmeden kullanılabilir.
+    """
+
+    def __init__(
+        self,
+        model_name: str = EMBEDDING_MODEL_NAME,
+        quantize: bool = False,
+        onnx_dir: Optional[str] = None,
+        max_length: int = 128,
+        num_threads: Optional[int] = None,
+    ):
+        import onnxruntime as ort
+        from transformers import AutoTokenizer
+
+        model_path = export_onnx(model_name, onnx_dir, quantize=quantize)
+        self.model_name = model_name
+        self.quantize = quantize
+        self.max_length = max_length
+        self.tokenizer = AutoTokenizer.from_pretrained(os.path.dirname(model_path))
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        threads = num_threads if num_threads is not None else int(os.getenv("EMBEDDING_ONNX_THREADS", "0"))
+        if threads > 0:
+            options.intra_op_num_threads = threads
+        self.session = ort.InferenceSession(model_path, options, providers=["CPUExecutionProvider"])
+        self._input_names = {i.name for i in self.session.get_inputs()}
+
+    def __call__(self, input: List[str]) -> List[Any]:
+        if not input:
+            return []
+        encoded = self.tokenizer(
+            list(input),
+            padding=True,
+            truncation=True,
+            max_length=self.max_length,
+            return_tensors="np",
+        )
+        feeds = {
+            name: encoded[name].astype(np.int64)
+            for name in ("input_ids", "attention_mask", "token_type_ids")
+            if name in self._input_names and name in encoded
+        }
+        hidden = self.session.run(None, feeds)[0]
+
+        # Mean pooling (attention mask ile)
+        mask = encoded["attention_mask"][..., None].astype(np.float32)
+        pooled = (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+        return [vector.astype(np.float32) for vector in pooled]
+
+
+class RemoteEmbeddingFunction(_SentenceTransformerCompatibleFunction):
+    """Paylaşılan embedding sunucusuna giden, Chroma embedding_function arayüzüyle uyumlu istemci.
+
+    Çok worker'lı gunicorn kurulumunda model yalnızca sunucu sürecinde yüklenir. httpx.Client
+    keep-alive bağlantı havuzu tutar; vektörler ham float32 bayt olarak döner (JSON listesi yok).
+    """
+
+    def __init__(self, url: Optional[str] = None, timeout: Optional[float] = None, pool_size: Optional[int] = None):
+        import httpx
+
+        self.url = (url or os.getenv("EMBEDDING_SERVER_URL", DEFAULT_EMBEDDING_SERVER_URL)).rstrip("/")
+        timeout = timeout if timeout is not None else float(os.getenv("EMBEDDING_SERVER_TIMEOUT", "10"))
+        pool_size = pool_size if pool_size is not None else int(os.getenv("EMBEDDING_SERVER_POOL_SIZE", "8"))
+        self._client = httpx.Client(
+            base_url=self.url,
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size),
+        )
+        # Sunucu ayakta değilse burada hata verir (yerel yedek yalnızca EMBEDDING_REMOTE_FALLBACK=local ile)
+        info = self._client.get("/health").raise_for_status().json()
+        self.model_name = info.get("model")
+        self.dim = int(info["dim"])
+        if self.model_name and self.model_name != EMBEDDING_MODEL_NAME:
+            logger.warning(f"Embedding sunucusu farklı model kullanıyor: {self.model_name}")
+
+    def __call__(self, input: List[str]) -> List[Any]:
+        if not input:
+            return []
+        response = self._client.post("/embed", json={"texts": list(input)})
+        response.raise_for_status()
+        matrix = np.frombuffer(response.content, dtype=np.float32).reshape(len(input), self.dim)
+        return list(matrix)
+
+
+def register_with_chroma(embedding_function: Any) -> None:
+    """Embedder'ı Chroma'nın `sentence_transformer` kaydına bağlar.
+
+    Chroma kalıcı config'ten embedder kurduğunda (ör. `collection.modify` sonrası) torch
+    modelini yüklemek yerine bu süreçteki örneği yeniden kullanır.
+    """
+    from chromadb.utils.embedding_functions import register_embedding_function
+
+    _live_instances[type(embedding_function)] = embedding_function
+    register_embedding_function(type(embedding_function))
+
+
+def create_embedding_function(backend: Optional[str] = None, model_name: str = EMBEDDING_MODEL_NAME):
+    """EMBEDDING_BACKEND'e göre embedding fonksiyonu döndürür.
+
+    ONNX backend'i başlatılamazsa (eksik paket, export hatası) PyTorch backend'ine düşülür.
+    remote backend'inde sunucuya ulaşılamazsa hata yükseltilir: sessizce yerel modele düşmek
+    her worker'da modeli yeniden yükler. EMBEDDING_REMOTE_FALLBACK=local bunu açıkça izin verir.
+    """
+    backend = (backend or os.getenv("EMBEDDING_BACKEND", "torch")).strip().lower()
+    if backend not in EMBEDDING_BACKENDS:
+        logger.warning(f"Bilinmeyen EMBEDDING_BACKEND '{backend}', torch kullanılıyor")
+        backend = "torch"
+
+    if backend == "remote":
+        try:
+            embedding_function = RemoteEmbeddingFunction()
+            register_with_chroma(embedding_function)
+            logger.info(f"Embedding backend: remote ({embedding_function.url})")
+            return embedding_function
+        except Exception as e:
+            if os.getenv("EMBEDDING_REMOTE_FALLBACK", "none").strip().lower() != "local":
+                raise RuntimeError(
+                    f"Embedding sunucusuna ulaşılamadı ({e}); sunucuyu başlatın veya "
+                    "EMBEDDING_REMOTE_FALLBACK=local ile yerel modele düşmeye izin verin"
+                ) from e
+            logger.warning(f"Embedding sunucusuna ulaşılamadı, EMBEDDING_REMOTE_FALLBACK=local: model bu süreçte yüklenecek (torch): {e}")
+            backend = "torch"
+
+    if backend != "torch":
+        try:
+            embedding_function = OnnxEmbeddingFunction(model_name, quantize=backend == "onnx-int8")
+            register_with_chroma(embedding_function)
+            logger.info(f"Embedding backend: {backend}")
+            return embedding_function
+        except Exception as e:
+            logger.warning(f"{backend} embedding backend'i başlatılamadı, torch kullanılıyor: {e}")
+
+    from chromadb.utils import embedding_functions
+
+    return embedding_functions.SentenceTransformerEmbeddingFunction(model_name=model_name)
@@ -0,0 +1,97 @@
+"""
+Sorgu Embedding Önbelleği - Aynı sorgu metninin tekrar tekrar embed edilmesini önler
+Tek bir `/rag/techniques/` isteği aynı `user_context`'i hem teknik aramasında hem de
+geçmiş girişler aramasında kullanır; vektör bir kez hesaplanıp Chroma'ya
+`query_embeddings` olarak verilir.
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List
+
+
+class QueryEmbeddingCache:
+    """Metin hash'i ile anahtarlanan, boyut sınırlı, thread-safe LRU önbellek"""
+
+    def __init__(self, max_size: int = 1024):
+        self.max_size = max_size
+        self._items: "OrderedDict[str, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    @staticmethod
+    def _key(text: str) -> str:
+        return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+    def get_or_compute(self, text: str, embed: Callable[[List[str]], List[Any]]) -> Any:
+        """Önbellekte varsa vektörü döndürür, yoksa `embed` ile hesaplayıp saklar."""
+        if self.max_size <= 0:
+            return embed([text])[0]
+
+        key = self._key(text)
+        with self._lock:
+            vector = self._items.get(key)
+            if vector is not None:
+                self._items.move_to_end(key)
+                self._hits += 1
+                return vector
+            self._misses += 1
+
+        # Embedding kilit dışında hesaplanır; eşzamanlı aynı sorgu en kötü ihtimalle iki kez embed edilir
+        vector = embed([text])[0]
+        with self._lock:
+            self._items[key] = vector
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_size:
+                self._items.popitem(last=False)
+        return vector
+
+    def get_or_compute_many(self, texts: List[str], embed: Callable[[List[str]], List[Any]]) -> List[Any]:
+        """Birden fazla metin için önbellekte olmayanları tek `embed` çağrısıyla hesaplar."""
+        if self.max_size <= 0:
+            return list(embed(texts)) if texts else []
+
+        keys = [self._key(text) for text in texts]
+        vectors: List[Any] = [None] * len(texts)
+        missing: Dict[str, List[int]] = {}
+        with self._lock:
+            for position, key in enumerate(keys):
+                vector = self._items.get(key)
+                if vector is not None:
+                    self._items.move_to_end(key)
+                    self._hits += 1
+                    vectors[position] = vector
+                else:
+                    # Aynı batch'te tekrar eden metin bir kez embed edilir
+                    missing.setdefault(key, []).append(position)
+            self._misses += sum(len(positions) for positions in missing.values())
+
+        if missing:
+            computed = embed([texts[positions[0]] for positions in missing.values()])
+            with self._lock:
+                for (key, positions), vector in zip(missing.items(), computed):
+                    for position in positions:
+                        vectors[position] = vector
+                    self._items[key] = vector
+                    self._items.move_to_end(key)
+                while len(self._items) > self.max_size:
+                    self._items.popitem(last=False)
+        return vectors
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Boyut ve isabet oranı metrikleri"""
+        with self._lock:
+            total = self._hits + self._misses
+            return {
+                "size": len(self._items),
+                "max_size": self.max_size,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate_percent": round(self._hits / total * 100, 2) if total else 0.0,
+            }
@@ -0,0 +1,99 @@
+"""
+Giriş Embedding Dönüşümü - user_entries vektörlerini düşük boyutta saklama
+384 boyutlu float32 giriş vektörleri HNSW indeksinde ve bellekte en büyük yer kaplayan
+veridir. Korpustan öğrenilen bir PCA projeksiyonu (ortalama + ilk k bileşen) ile vektörler
+k boyuta indirilir; aynı dönüşüm yazma ve sorgu yolunda uygulanır.
+
+Projeksiyon normalize edilmez: merkezlenmiş PCA, tutulan varyans oranında L2 mesafelerini
+korur; böylece `1 - distance` benzerlik skorları tam boyuttaki ölçeğe yakın kalır.
+Chroma'nın HNSW indeksi yalnızca float32 saklar; float16 kazancı ancak memmap backend'inde
+(SIMILAR_ENTRIES_BACKEND=memmap) elde edilir. `scripts/fit_entry_pca.py` iki seçeneğin
+recall/bellek ödünleşimini raporlar.
+
+Dönüşüm açıkken koleksiyon boyutu değişir; mevcut vektörler `reindex_chroma.py` ile yeniden
+yazılmalıdır.
+"""
+
+import os
+import logging
+from typing import Any, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+ENTRY_TRANSFORMS = ("none", "pca")
+DEFAULT_PCA_FILE = "entry_pca.npz"
+
+
+class PCATransform:
+    """Ortalama + bileşen matrisiyle (k, d) doğrusal projeksiyon"""
+
+    def __init__(self, mean: Any, components: Any, explained_variance_ratio: Optional[Any] = None):
+        self.mean = np.asarray(mean, dtype=np.float32)
+        self.components = np.ascontiguousarray(np.asarray(components, dtype=np.float32))
+        self.explained_variance_ratio = (
+            np.asarray(explained_variance_ratio, dtype=np.float32) if explained_variance_ratio is not None else None
+        )
+
+    @property
+    def input_dim(self) -> int:
+        return int(self.components.shape[1])
+
+    @property
+    def dim(self) -> int:
+        return int(self.components.shape[0])
+
+    def apply(self, vectors: Any) -> np.ndarray:
+        """(n, d) veya (d,) vektörleri (n, k) / (k,) float32'ye projekte eder"""
+        matrix = np.asarray(vectors, dtype=np.float32)
+        return ((matrix - self.mean) @ self.components.T).astype(np.float32)
+
+    def save(self, path: str) -> None:
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        tmp_path = f"{path}.tmp.npz"
+        np.savez(
+            tmp_path,
+            mean=self.mean,
+            components=self.components,
+            explained_variance_ratio=(
+                self.explained_variance_ratio if self.explained_variance_ratio is not None else np.zeros(0)
+            ),
+        )
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> "PCATransform":
+        with np.load(path) as data:
+            ratio = data["explained_variance_ratio"]
+            return cls(data["mean"], data["components"], ratio if ratio.size else None)
+
+
+def fit_pca(vectors: Any, dim: int) -> PCATransform:
+    """Örnek vektörlerden (n, d) ilk `dim` temel bileşeni SVD ile öğrenir"""
+    matrix = np.asarray(vectors, dtype=np.float64)
+    if dim >= matrix.shape[1]:
+        raise ValueError(f"PCA boyutu ({dim}) giriş boyutundan ({matrix.shape[1]}) küçük olmalı")
+    mean = matrix.mean(axis=0)
+    _, singular_values, vt = np.linalg.svd(matrix - mean, full_matrices=False)
+    variance = singular_values ** 2
+    return PCATransform(mean, vt[:dim], variance[:dim] / variance.sum())
+
+
+def load_entry_transform(persist_directory: str) -> Optional[PCATransform]:
+    """ENTRY_EMBEDDING_TRANSFORM=pca ise kayıtlı projeksiyonu yükler (yoksa / hatada None)"""
+    mode = os.getenv("ENTRY_EMBEDDING_TRANSFORM", "none").strip().lower()
+    if mode == "none":
+        return None
+    if mode not in ENTRY_TRANSFORMS:
+        logger.warning(f"Bilinmeyen ENTRY_EMBEDDING_TRANSFORM '{mode}', dönüşüm kapalı")
+        return None
+
+    path = os.getenv("ENTRY_PCA_PATH") or os.path.join(persist_directory, DEFAULT_PCA_FILE)
+    try:
+        transform = PCATransform.load(path)
+    except (OSError, KeyError, ValueError) as e:
+        logger.warning(f"PCA dosyası yüklenemedi ({path}), tam boyut kullanılacak: {e}")
+        return None
+    logger.info(f"Giriş embedding'leri PCA ile {transform.input_dim} -> {transform.dim} boyuta indirgenecek")
+    return transform
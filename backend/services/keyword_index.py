@@ -0,0 +1,269 @@
+"""
+Anahtar Kelime İndeksi - Kullanıcı girişleri için Türkçe uyumlu BM25 ters indeksi
+"patron", "sınav" gibi somut kelimelerle yapılan aramalarda MiniLM embedding'leri tam
+terimi kaçırabilir ve her sorgu bir forward pass ister. Bu depo her kullanıcının girişleri
+için (terim -> giriş, tf) posting listelerini SQLite'ta artımlı olarak tutar; BM25 skoru
+tek bir sorguyla hesaplanır, embedding gerekmez.
+
+Normalizasyon: Türkçe küçük harf (I -> ı, İ -> i), ASCII katlama (ç/ğ/ı/ö/ş/ü -> c/g/i/o/s/u;
+"sinav" yazan kullanıcı "sınav"ı bulur), stopword temizliği ve hafif ek atma
+("patronumdan" -> "patron"). Aynı işlem hem dokümana hem sorguya uygulandığı için
+köklerin dilbilgisel olarak doğru olması değil, tutarlı olması yeterlidir.
+
+Depo devreye girmeden önce indekslenmiş kullanıcılar ilk aramada Chroma'dan bir kez aktarılır.
+"""
+
+import re
+import json
+import math
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from services.sqlite_store import SQLiteStore
+
+# BM25 parametreleri
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Reciprocal rank fusion sabiti (Cormack vd.: 60)
+RRF_K = 60
+
+MIN_STEM_LENGTH = 3
+MAX_SUFFIX_PASSES = 3
+
+_TOKEN_RE = re.compile(r"[^\W_]+", re.UNICODE)
+_FOLD = str.maketrans("çğıöşüâîû", "cgiosuaiu")
+
+# Katlanmış biçimde (ünlü uyumu katlamayla büyük ölçüde birleşir); uzun ekler önce denenir
+_SUFFIXES = sorted({
+    "lar", "ler",
+    "dan", "den", "tan", "ten", "da", "de", "ta", "te",
+    "nin", "nun", "in", "un",
+    "yla", "yle", "la", "le",
+    "imiz", "umuz", "iniz", "unuz", "im", "um",
+    "yi", "yu", "ya", "ye", "na", "ne", "si", "su",
+    "dir", "dur", "tir", "tur",
+    "ken", "ki",
+    "i", "u", "a", "e", "m",
+}, key=len, reverse=True)
+
+_STOPWORDS = {
+    "ve", "veya", "ile", "ama", "fakat", "ancak", "cunku", "gibi", "icin", "kadar", "daha",
+    "cok", "az", "en", "bir", "bu", "su", "o", "ben", "sen", "biz", "siz", "onlar", "bana",
+    "beni", "benim", "sana", "seni", "onu", "ona", "de", "da", "ki", "mi", "mu", "ne", "her",
+    "sey", "hic", "hep", "bile", "ise", "olan", "oldu", "olarak", "diye", "sonra",
+    "once", "simdi", "yine", "artik", "analiz",
+}
+
+
+def normalize_token(token: str) -> str:
+    """Tek kelimeyi küçük harfe çevirir, ASCII'ye katlar ve eklerini atar"""
+    word = token.replace("I", "ı").replace("İ", "i").lower().translate(_FOLD)
+    for _ in range(MAX_SUFFIX_PASSES):
+        for suffix in _SUFFIXES:
+            if word.endswith(suffix) and len(word) - len(suffix) >= MIN_STEM_LENGTH:
+                word = word[:-len(suffix)]
+                break
+        else:
+            break
+    return word
+
+
+def tokenize(text: str) -> List[str]:
+    """Metni normalize edilmiş terimlere böler (stopword'ler atılır, sıra korunur)"""
+    terms = []
+    for token in _TOKEN_RE.findall(text or ""):
+        folded = token.replace("I", "ı").replace("İ", "i").lower().translate(_FOLD)
+        if folded in _STOPWORDS or len(folded) < 2:
+            continue
+        terms.append(normalize_token(token))
+    return terms
+
+
+def reciprocal_rank_fusion(rankings: Iterable[Sequence[str]], k: int = RRF_K) -> List[Tuple[str, float]]:
+    """Sıralı ID listelerini RRF ile birleştirir: skor = Σ 1 / (k + sıra)"""
+    scores: Dict[str, float] = {}
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking, start=1):
+            scores[doc_id] = scores.get(doc_id, 0.0) + 1.0 / (k + rank)
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)
+
+
+class KeywordIndex(SQLiteStore):
+    """Kullanıcı başına BM25 ters indeksi (aynı doc_id ile tekrar yazmak upsert gibi davranır)"""
+
+    SCHEMA = [
+        """CREATE TABLE IF NOT EXISTS keyword_users (
+            user_id TEXT PRIMARY KEY,
+            doc_count INTEGER NOT NULL DEFAULT 0,
+            total_length INTEGER NOT NULL DEFAULT 0
+        )""",
+        """CREATE TABLE IF NOT EXISTS keyword_docs (
+            user_id TEXT NOT NULL,
+            doc_id TEXT NOT NULL,
+            length INTEGER NOT NULL,
+            document TEXT,
+            metadata TEXT,
+            PRIMARY KEY (user_id, doc_id)
+        )""",
+        """CREATE TABLE IF NOT EXISTS keyword_postings (
+            user_id TEXT NOT NULL,
+            term TEXT NOT NULL,
+            doc_id TEXT NOT NULL,
+            tf INTEGER NOT NULL,
+            PRIMARY KEY (user_id, term, doc_id)
+        )""",
+        "CREATE INDEX IF NOT EXISTS idx_keyword_postings_doc ON keyword_postings (user_id, doc_id)",
+    ]
+
+    # ----- YAZMA -----
+
+    def add_many(
+        self,
+        user_ids: Sequence[str],
+        doc_ids: Sequence[str],
+        texts: Sequence[str],
+        documents: Sequence[str],
+        metadatas: Sequence[Dict[str, Any]],
+    ) -> None:
+        """Girişleri tek transaction'da indeksler; `texts` tokenize edilir, `documents` aynen saklanır.
+
+        İndeksi henüz oluşturulmamış kullanıcılar atlanır; ilk aramadaki aktarım bu
+        girişleri zaten Chroma'dan okuyacaktır.
+        """
+        with self.transaction() as conn:
+            built: Dict[str, bool] = {}
+            for user_id, doc_id, text, document, metadata in zip(user_ids, doc_ids, texts, documents, metadatas):
+                user_id = str(user_id)
+                if user_id not in built:
+                    built[user_id] = self._is_built(conn, user_id)
+                if built[user_id]:
+                    self._add_doc(conn, user_id, str(doc_id), text, document, metadata)
+
+    def ensure_user(
+        self,
+        user_id: str,
+        load: Callable[[], Tuple[List[str], List[str], List[str], List[Dict[str, Any]]]],
+    ) -> None:
+        """Kullanıcının indeksi yoksa `load` ile (doc_ids, texts, documents, metadatas) bir kez doldurur"""
+        with self.transaction() as conn:
+            if self._is_built(conn, user_id):
+                return
+            conn.execute("INSERT INTO keyword_users (user_id) VALUES (?)", (user_id,))
+            for doc_id, text, document, metadata in zip(*load()):
+                self._add_doc(conn, user_id, str(doc_id), text, document, metadata)
+
+    def remove(self, user_id: str, doc_id: str) -> None:
+        with self.transaction() as conn:
+            self._remove_doc(conn, user_id, doc_id)
+
+    def remove_user(self, user_id: str) -> None:
+        with self.transaction() as conn:
+            for table in ("keyword_postings", "keyword_docs", "keyword_users"):
+                conn.execute(f"DELETE FROM {table} WHERE user_id = ?", (user_id,))
+
+    def reset(self) -> None:
+        """Tüm indeksi siler (koleksiyonlar yeniden indekslendiğinde); ilk aramada yeniden oluşur"""
+        with self.transaction() as conn:
+            for table in ("keyword_postings", "keyword_docs", "keyword_users"):
+                conn.execute(f"DELETE FROM {table}")
+
+    # ----- OKUMA -----
+
+    def search(self, user_id: str, terms: Sequence[str], n_results: int = 5) -> Optional[List[Dict[str, Any]]]:
+        """Normalize edilmiş terimlerle BM25 top-k (indeks hiç oluşturulmamışsa None)"""
+        unique_terms = list(dict.fromkeys(terms))
+        with self._lock:
+            user = self._conn.execute(
+                "SELECT doc_count, total_length FROM keyword_users WHERE user_id = ?", (user_id,)
+            ).fetchone()
+            if user is None:
+                return None
+            doc_count, total_length = user
+            if not doc_count or not unique_terms or n_results <= 0:
+                return []
+
+            postings = self._conn.execute(
+                f"SELECT p.term, p.doc_id, p.tf, d.length FROM keyword_postings p "
+                f"JOIN keyword_docs d ON d.user_id = p.user_id AND d.doc_id = p.doc_id "
+                f"WHERE p.user_id = ? AND p.term IN ({','.join('?' * len(unique_terms))})",
+                (user_id, *unique_terms),
+            ).fetchall()
+
+        doc_freq: Dict[str, int] = {}
+        for term, _, _, _ in postings:
+            doc_freq[term] = doc_freq.get(term, 0) + 1
+
+        avg_length = total_length / doc_count
+        scores: Dict[str, float] = {}
+        for term, doc_id, tf, length in postings:
+            df = doc_freq[term]
+            idf = math.log(1 + (doc_count - df + 0.5) / (df + 0.5))
+            norm = tf + BM25_K1 * (1 - BM25_B + BM25_B * length / avg_length)
+            scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (BM25_K1 + 1) / norm
+
+        top = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:n_results]
+        if not top:
+            return []
+
+        with self._lock:
+            rows = {
+                doc_id: (document, metadata)
+                for doc_id, document, metadata in self._conn.execute(
+                    f"SELECT doc_id, document, metadata FROM keyword_docs WHERE user_id = ? "
+                    f"AND doc_id IN ({','.join('?' * len(top))})",
+                    (user_id, *[doc_id for doc_id, _ in top]),
+                )
+            }
+
+        results = []
+        for doc_id, score in top:
+            if doc_id not in rows:
+                continue
+            document, metadata = rows[doc_id]
+            results.append({
+                "id": doc_id,
+                "text": document,
+                "metadata": json.loads(metadata) if metadata else {},
+                "bm25_score": round(score, 4),
+            })
+        return results
+
+    # ----- YARDIMCILAR -----
+
+    @staticmethod
+    def _is_built(conn, user_id: str) -> bool:
+        return conn.execute("SELECT 1 FROM keyword_users WHERE user_id = ?", (user_id,)).fetchone() is not None
+
+    def _add_doc(self, conn, user_id: str, doc_id: str, text: str, document: str, metadata: Dict[str, Any]) -> None:
+        self._remove_doc(conn, user_id, doc_id)
+
+        terms = tokenize(text)
+        counts: Dict[str, int] = {}
+        for term in terms:
+            counts[term] = counts.get(term, 0) + 1
+
+        conn.execute(
+            "INSERT INTO keyword_docs (user_id, doc_id, length, document, metadata) VALUES (?, ?, ?, ?, ?)",
+            (user_id, doc_id, len(terms), document, json.dumps(metadata or {}, ensure_ascii=False)),
+        )
+        conn.executemany(
+            "INSERT INTO keyword_postings (user_id, term, doc_id, tf) VALUES (?, ?, ?, ?)",
+            [(user_id, term, doc_id, tf) for term, tf in counts.items()],
+        )
+        conn.execute(
+            "UPDATE keyword_users SET doc_count = doc_count + 1, total_length = total_length + ? WHERE user_id = ?",
+            (len(terms), user_id),
+        )
+
+    def _remove_doc(self, conn, user_id: str, doc_id: str) -> None:
+        row = conn.execute(
+            "SELECT length FROM keyword_docs WHERE user_id = ? AND doc_id = ?", (user_id, doc_id)
+        ).fetchone()
+        if row is None:
+            return
+        conn.execute("DELETE FROM keyword_postings WHERE user_id = ? AND doc_id = ?", (user_id, doc_id))
+        conn.execute("DELETE FROM keyword_docs WHERE user_id = ? AND doc_id = ?", (user_id, doc_id))
+        conn.execute(
+            "UPDATE keyword_users SET doc_count = doc_count - 1, total_length = total_length - ? WHERE user_id = ?",
+            (row[0], user_id),
+        )
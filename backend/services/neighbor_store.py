@@ -0,0 +1,118 @@
+"""
+Giriş Komşu Listeleri - Arşivdeki "benzer geçmiş deneyimler" görünümü için önceden hesaplanmış top-k
+Her giriş indekslenirken aynı kullanıcının en benzer k girişi bir kez bulunur ve kompakt bir
+JSON listesi olarak saklanır; yeni giriş, bulduğu komşuların listelerine de (skoru yeterliyse)
+eklenir. `GET /entries/{id}/similar` böylece ANN sorgusu yerine tek birincil anahtar okumasıdır.
+
+Özellik devreye girmeden önce indekslenmiş girişlerin listesi ilk istekte hesaplanır.
+"""
+
+import json
+import time
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from services.sqlite_store import SQLiteStore
+
+# (komşu entry_id, benzerlik skoru)
+Neighbor = Tuple[str, float]
+
+
+class NeighborStore(SQLiteStore):
+    """Kullanıcı + giriş başına en fazla k komşuluk listesi"""
+
+    SCHEMA = [
+        """CREATE TABLE IF NOT EXISTS entry_neighbors (
+            user_id TEXT NOT NULL,
+            entry_id TEXT NOT NULL,
+            neighbors TEXT NOT NULL,
+            updated_at REAL NOT NULL,
+            PRIMARY KEY (user_id, entry_id)
+        )""",
+    ]
+
+    def __init__(self, path: str, k: int = 5):
+        self.k = k
+        super().__init__(path)
+
+    # ----- YAZMA -----
+
+    def set_many(self, lists: Iterable[Tuple[str, str, Sequence[Neighbor]]]) -> None:
+        """(user_id, entry_id, komşular) listelerini yazar (var olanın üzerine)"""
+        now = time.time()
+        with self.transaction() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO entry_neighbors (user_id, entry_id, neighbors, updated_at) VALUES (?, ?, ?, ?)",
+                [(user_id, entry_id, self._dump(neighbors), now) for user_id, entry_id, neighbors in lists],
+            )
+
+    def offer_many(self, user_id: str, offers: Iterable[Tuple[str, str, float]]) -> None:
+        """(hedef entry_id, yeni komşu entry_id, skor) tekliflerini mevcut listelere işler.
+
+        Listesi henüz olmayan hedefler atlanır; ilk istekte hesaplanan liste yeni girişi zaten görür.
+        """
+        by_target: Dict[str, List[Neighbor]] = {}
+        for target_id, neighbor_id, score in offers:
+            if target_id != neighbor_id:
+                by_target.setdefault(target_id, []).append((neighbor_id, score))
+        if not by_target:
+            return
+
+        now = time.time()
+        with self.transaction() as conn:
+            for target_id, candidates in by_target.items():
+                row = conn.execute(
+                    "SELECT neighbors FROM entry_neighbors WHERE user_id = ? AND entry_id = ?", (user_id, target_id)
+                ).fetchone()
+                if row is None:
+                    continue
+                merged = dict(self._load(row[0]))
+                merged.update(candidates)
+                top = sorted(merged.items(), key=lambda item: item[1], reverse=True)[:self.k]
+                conn.execute(
+                    "UPDATE entry_neighbors SET neighbors = ?, updated_at = ? WHERE user_id = ? AND entry_id = ?",
+                    (self._dump(top), now, user_id, target_id),
+                )
+
+    def remove(self, user_id: str, entry_id: str) -> None:
+        """Girişin listesini siler ve diğer listelerden çıkarır (kullanıcının listeleri küçüktür)"""
+        with self.transaction() as conn:
+            conn.execute("DELETE FROM entry_neighbors WHERE user_id = ? AND entry_id = ?", (user_id, entry_id))
+            for target_id, neighbors in conn.execute(
+                "SELECT entry_id, neighbors FROM entry_neighbors WHERE user_id = ?", (user_id,)
+            ).fetchall():
+                current = self._load(neighbors)
+                kept = [neighbor for neighbor in current if neighbor[0] != entry_id]
+                if len(kept) != len(current):
+                    conn.execute(
+                        "UPDATE entry_neighbors SET neighbors = ? WHERE user_id = ? AND entry_id = ?",
+                        (self._dump(kept), user_id, target_id),
+                    )
+
+    def remove_user(self, user_id: str) -> None:
+        with self.transaction() as conn:
+            conn.execute("DELETE FROM entry_neighbors WHERE user_id = ?", (user_id,))
+
+    def reset(self) -> None:
+        """Tüm listeleri siler (koleksiyonlar yeniden indekslendiğinde); ilk istekte yeniden hesaplanır"""
+        with self.transaction() as conn:
+            conn.execute("DELETE FROM entry_neighbors")
+
+    # ----- OKUMA -----
+
+    def get(self, user_id: str, entry_id: str) -> Optional[List[Neighbor]]:
+        """Girişin komşu listesi (hiç hesaplanmamışsa None)"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT neighbors FROM entry_neighbors WHERE user_id = ? AND entry_id = ?", (user_id, entry_id)
+            ).fetchone()
+        return self._load(row[0]) if row is not None else None
+
+    # ----- YARDIMCILAR -----
+
+    @staticmethod
+    def _dump(neighbors: Sequence[Neighbor]) -> str:
+        return json.dumps([[str(entry_id), round(float(score), 4)] for entry_id, score in neighbors], separators=(",", ":"))
+
+    @staticmethod
+    def _load(data: str) -> List[Neighbor]:
+        return [(entry_id, score) for entry_id, score in json.loads(data)]
@@ -0,0 +1,220 @@
+"""
+Kullanıcı Kalıp Özetleri - get_user_patterns için artımlı olarak tutulan sayaçlar
+Her analiz indekslendiğinde / silindiğinde kullanıcının çarpıtma, ruh hali ve risk
+sayaçları ile ilk/son analiz zamanı O(1) güncellenir. Okuma kullanıcı başına sabit
+sayıda satır döndürür; analysis_collection'ın tamamını taramaya gerek kalmaz.
+
+Depo devreye girmeden önce indekslenmiş kullanıcılar ilk okumada Chroma metadata'sından
+bir kez yeniden oluşturulur.
+"""
+
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from services.sqlite_store import SQLiteStore
+
+# Sayaç türleri
+DISTORTION = "distortion"
+MOOD = "mood"
+RISK = "risk"
+
+
+class UserPatternStore(SQLiteStore):
+    """Kullanıcı başına kalıp sayaçları (members tablosu tekrar eklemeleri upsert gibi uygular)"""
+
+    SCHEMA = [
+        """CREATE TABLE IF NOT EXISTS pattern_users (
+            user_id TEXT PRIMARY KEY,
+            total INTEGER NOT NULL DEFAULT 0,
+            first_at TEXT,
+            last_at TEXT
+        )""",
+        """CREATE TABLE IF NOT EXISTS pattern_members (
+            user_id TEXT NOT NULL,
+            analysis_id TEXT NOT NULL,
+            distortion_types TEXT NOT NULL DEFAULT '',
+            overall_mood TEXT NOT NULL,
+            risk_level TEXT NOT NULL,
+            analyzed_at TEXT NOT NULL DEFAULT '',
+            PRIMARY KEY (user_id, analysis_id)
+        )""",
+        "CREATE INDEX IF NOT EXISTS idx_pattern_members_time ON pattern_members (user_id, analyzed_at)",
+        """CREATE TABLE IF NOT EXISTS pattern_counts (
+            user_id TEXT NOT NULL,
+            kind TEXT NOT NULL,
+            value TEXT NOT NULL,
+            count INTEGER NOT NULL,
+            PRIMARY KEY (user_id, kind, value)
+        )""",
+    ]
+
+    # ----- YAZMA -----
+
+    def add_many(self, metadatas: Iterable[Dict[str, Any]]) -> None:
+        """Chroma analiz metadata'larını (user_id, analysis_id dahil) tek transaction'da sayaçlara ekler.
+
+        Özeti henüz oluşturulmamış kullanıcılar atlanır; ilk okumadaki yeniden oluşturma
+        bu analizleri zaten Chroma'dan okuyacaktır.
+        """
+        with self.transaction() as conn:
+            built: Dict[str, bool] = {}
+            for metadata in metadatas:
+                user_id = metadata.get("user_id")
+                if user_id not in built:
+                    built[user_id] = self._is_built(conn, user_id)
+                if built[user_id]:
+                    self._add_member(conn, user_id, str(metadata.get("analysis_id")), metadata)
+
+    def remove(self, user_id: str, analysis_id: str) -> None:
+        """Analizi kullanıcının sayaçlarından düşer"""
+        with self.transaction() as conn:
+            self._remove_member(conn, user_id, analysis_id)
+
+    def remove_user(self, user_id: str) -> None:
+        """Kullanıcının tüm özetini siler"""
+        with self.transaction() as conn:
+            for table in ("pattern_members", "pattern_counts", "pattern_users"):
+                conn.execute(f"DELETE FROM {table} WHERE user_id = ?", (user_id,))
+
+    def ensure_user(self, user_id: str, load_metadatas: Callable[[], List[Dict[str, Any]]]) -> None:
+        """Özet yoksa `load_metadatas` ile (tek seferlik tam tarama) oluşturur.
+
+        Tarama kilit altında yapılır; bu sırada gelen eklemeler bekler ve ardından
+        members tablosu sayesinde çift sayılmadan uygulanır.
+        """
+        with self.transaction() as conn:
+            if self._is_built(conn, user_id):
+                return
+            conn.execute("INSERT INTO pattern_users (user_id, total) VALUES (?, 0)", (user_id,))
+            for metadata in load_metadatas():
+                self._add_member(conn, user_id, str(metadata.get("analysis_id")), metadata)
+
+    def reset(self) -> None:
+        """Tüm özetleri siler (koleksiyonlar yeniden indekslendiğinde); ilk okumada yeniden oluşur"""
+        with self.transaction() as conn:
+            for table in ("pattern_members", "pattern_counts", "pattern_users"):
+                conn.execute(f"DELETE FROM {table}")
+
+    # ----- OKUMA -----
+
+    def get_patterns(self, user_id: str, top_n: int = 5) -> Optional[Dict[str, Any]]:
+        """get_user_patterns formatında özet (özet hiç oluşturulmamışsa None)"""
+        with self._lock:
+            user = self._conn.execute(
+                "SELECT total, first_at, last_at FROM pattern_users WHERE user_id = ?", (user_id,)
+            ).fetchone()
+            if user is None:
+                return None
+            total, first_at, last_at = user
+            if not total:
+                return {"message": "Henüz yeterli veri yok"}
+
+            counts: Dict[str, Dict[str, int]] = {DISTORTION: {}, MOOD: {}, RISK: {}}
+            for kind, value, count in self._conn.execute(
+                "SELECT kind, value, count FROM pattern_counts WHERE user_id = ?", (user_id,)
+            ):
+                counts[kind][value] = count
+
+        return {
+            "total_analyses": total,
+            "most_common_distortions": sorted(counts[DISTORTION].items(), key=lambda x: x[1], reverse=True)[:top_n],
+            "mood_distribution": counts[MOOD],
+            "risk_level_distribution": counts[RISK],
+            "analysis_period": {
+                "first_analysis": first_at or "",
+                "last_analysis": last_at or "",
+            },
+        }
+
+    # ----- YARDIMCILAR -----
+
+    @staticmethod
+    def _is_built(conn, user_id: str) -> bool:
+        return conn.execute("SELECT 1 FROM pattern_users WHERE user_id = ?", (user_id,)).fetchone() is not None
+
+    @staticmethod
+    def _counter_keys(distortion_types: str, mood: str, risk: str):
+        for dtype in (distortion_types or "").split(","):
+            if dtype.strip():
+                yield DISTORTION, dtype.strip()
+        yield MOOD, mood
+        yield RISK, risk
+
+    @staticmethod
+    def _boundary(conn, user_id: str, order: str) -> Optional[str]:
+        row = conn.execute(
+            f"SELECT analyzed_at FROM pattern_members WHERE user_id = ? ORDER BY analyzed_at {order} LIMIT 1",
+            (user_id,),
+        ).fetchone()
+        return row[0] if row else None
+
+    def _remove_member(self, conn, user_id: str, analysis_id: str) -> None:
+        row = conn.execute(
+            "SELECT distortion_types, overall_mood, risk_level, analyzed_at FROM pattern_members "
+            "WHERE user_id = ? AND analysis_id = ?",
+            (user_id, analysis_id),
+        ).fetchone()
+        if row is None:
+            return
+        distortion_types, mood, risk, analyzed_at = row
+        conn.execute(
+            "DELETE FROM pattern_members WHERE user_id = ? AND analysis_id = ?", (user_id, analysis_id)
+        )
+        for kind, value in self._counter_keys(distortion_types, mood, risk):
+            conn.execute(
+                "UPDATE pattern_counts SET count = count - 1 WHERE user_id = ? AND kind = ? AND value = ?",
+                (user_id, kind, value),
+            )
+        conn.execute(
+            "DELETE FROM pattern_counts WHERE user_id = ? AND count <= 0", (user_id,)
+        )
+        conn.execute("UPDATE pattern_users SET total = total - 1 WHERE user_id = ?", (user_id,))
+
+        # İlk/son zaman silinen satırsa (user_id, analyzed_at) index'inden tekrar bul
+        first_at, last_at = conn.execute(
+            "SELECT first_at, last_at FROM pattern_users WHERE user_id = ?", (user_id,)
+        ).fetchone()
+        if analyzed_at in (first_at, last_at):
+            first_at = self._boundary(conn, user_id, "ASC")
+            last_at = self._boundary(conn, user_id, "DESC")
+            conn.execute(
+                "UPDATE pattern_users SET first_at = ?, last_at = ? WHERE user_id = ?",
+                (first_at, last_at, user_id),
+            )
+
+    def _add_member(self, conn, user_id: str, analysis_id: str, metadata: Dict[str, Any]) -> None:
+        distortion_types = metadata.get("distortion_types") or ""
+        mood = metadata.get("overall_mood", "unknown")
+        risk = metadata.get("risk_level", "unknown")
+        analyzed_at = metadata.get("analyzed_at", "")
+
+        existing = conn.execute(
+            "SELECT distortion_types, overall_mood, risk_level, analyzed_at FROM pattern_members "
+            "WHERE user_id = ? AND analysis_id = ?",
+            (user_id, analysis_id),
+        ).fetchone()
+        if existing == (distortion_types, mood, risk, analyzed_at):
+            return
+        if existing is not None:
+            # Upsert: analiz değişmişse önce eski sayaçları düş
+            self._remove_member(conn, user_id, analysis_id)
+
+        conn.execute(
+            "INSERT INTO pattern_members "
+            "(user_id, analysis_id, distortion_types, overall_mood, risk_level, analyzed_at) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (user_id, analysis_id, distortion_types, mood, risk, analyzed_at),
+        )
+
+        for kind, value in self._counter_keys(distortion_types, mood, risk):
+            conn.execute(
+                "INSERT INTO pattern_counts (user_id, kind, value, count) VALUES (?, ?, ?, 1) "
+                "ON CONFLICT (user_id, kind, value) DO UPDATE SET count = count + 1",
+                (user_id, kind, value),
+            )
+        conn.execute(
+            "UPDATE pattern_users SET total = total + 1, "
+            "first_at = CASE WHEN first_at IS NULL OR ? < first_at THEN ? ELSE first_at END, "
+            "last_at = CASE WHEN last_at IS NULL OR ? > last_at THEN ? ELSE last_at END "
+            "WHERE user_id = ?",
+            (analyzed_at, analyzed_at, analyzed_at, analyzed_at, user_id),
+        )
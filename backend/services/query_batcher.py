@@ -0,0 +1,141 @@
+"""
+Sorgu Mikro-Batcher'ı - Eşzamanlı benzerlik sorgularını tek embedding geçişinde toplar
+Yük altında her `/rag/similar-entries/` ve `/rag/techniques/semantic-search/` isteği kendi
+tek metinlik embedding'ini ve tek sorguluk Chroma çağrısını yapar. Batcher ilk sorgu
+geldikten sonra CHROMA_QUERY_BATCH_WINDOW_MS kadar (ya da CHROMA_QUERY_BATCH_MAX sorguya
+ulaşana kadar) bekler, toplanan sorguları tek `handler(items)` çağrısına verir ve her
+çağıranın future'ını kendi sonucuyla tamamlar.
+
+Batch'in nasıl çalıştırılacağı (embedding, koleksiyon/filtre gruplaması) handler'ın işidir;
+bu sınıf yalnızca toplama, dağıtma ve metriklerden sorumludur.
+"""
+
+import time
+import queue
+import logging
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+class QueryBatcher:
+    """Kuyruk + tek worker thread ile zaman pencereli sorgu batch'leyici"""
+
+    def __init__(
+        self,
+        handler: Callable[[List[Any]], List[Any]],
+        window_ms: float = 5.0,
+        max_batch: int = 32,
+        max_queue: int = 256,
+        name: str = "query-batcher",
+    ):
+        self.handler = handler
+        self.window = max(window_ms, 0.0) / 1000.0
+        self.max_batch = max(max_batch, 1)
+        self.name = name
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=max_queue)
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._stats = {"queries": 0, "batches": 0, "largest_batch": 0, "failed_batches": 0}
+
+    # ----- PUBLIC -----
+
+    def submit(self, item: Any) -> Future:
+        """Sorguyu kuyruğa ekler (bloklamaz); sonuç döndürülen future ile gelir.
+
+        Kuyruk doluysa queue.Full yükseltilir; çağıran bunu backpressure olarak ele alır.
+        """
+        self._ensure_started()
+        future: Future = Future()
+        self._queue.put_nowait((item, future))
+        return future
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Kuyruktaki sorguları çalıştırıp worker'ı durdurur (uygulama kapanışında)"""
+        thread = self._thread
+        if thread is None:
+            return
+        try:
+            self._queue.put(_STOP, timeout=timeout)
+        except queue.Full:
+            logger.warning("Sorgu batcher'ı durdurulamadı: kuyruk dolu")
+            return
+        thread.join(timeout)
+        self._thread = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats["avg_batch_size"] = round(stats["queries"] / stats["batches"], 2) if stats["batches"] else 0.0
+        stats["queued"] = self._queue.qsize()
+        stats["window_ms"] = self.window * 1000.0
+        stats["max_batch"] = self.max_batch
+        return stats
+
+    # ----- WORKER -----
+
+    def _ensure_started(self) -> None:
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._worker, name=self.name, daemon=True)
+                self._thread.start()
+
+    def _next_batch(self) -> Tuple[List[Tuple[Any, Future]], bool]:
+        """İlk sorguyu bekler, sonra pencere dolana ya da max_batch'e ulaşana kadar toplar"""
+        batch: List[Tuple[Any, Future]] = []
+        first = self._queue.get()
+        if first is _STOP:
+            return batch, True
+
+        batch.append(first)
+        deadline = time.monotonic() + self.window
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            try:
+                # Pencere dolduysa yalnızca zaten kuyrukta bekleyenler alınır
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is _STOP:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    def _worker(self) -> None:
+        while True:
+            batch, stopping = self._next_batch()
+            if batch:
+                self._dispatch(batch)
+            if stopping:
+                break
+
+    def _dispatch(self, batch: List[Tuple[Any, Future]]) -> None:
+        # İptal edilmiş (çağıranı vazgeçmiş) sorgular çalıştırılmaz
+        live = [(item, future) for item, future in batch if future.set_running_or_notify_cancel()]
+        if not live:
+            return
+
+        with self._stats_lock:
+            self._stats["queries"] += len(live)
+            self._stats["batches"] += 1
+            self._stats["largest_batch"] = max(self._stats["largest_batch"], len(live))
+
+        try:
+            results = self.handler([item for item, _ in live])
+        except Exception as e:
+            logger.error(f"{len(live)} sorguluk batch başarısız: {e}")
+            with self._stats_lock:
+                self._stats["failed_batches"] += 1
+            for _, future in live:
+                future.set_exception(e)
+            return
+
+        for (_, future), result in zip(live, results):
+            future.set_result(result)
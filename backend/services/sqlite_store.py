@@ -0,0 +1,51 @@
+"""
+SQLite Yan Depo Tabanı - ChromaDB dizininde tutulan küçük, süreç içi yardımcı tablolar
+Chroma'nın metadata taramasıyla pahalıya hesaplanan türev veriler (kullanıcı kalıp
+özetleri vb.) burada artımlı olarak saklanır. Tek bağlantı + kilit ile thread-safe'tir;
+ChromaService executor thread'lerinden eşzamanlı çağrılabilir.
+"""
+
+import os
+import sqlite3
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Iterator, List
+
+logger = logging.getLogger(__name__)
+
+
+class SQLiteStore:
+    """Alt sınıfların `SCHEMA` ile tablolarını tanımladığı SQLite deposu"""
+
+    SCHEMA: List[str] = []
+
+    def __init__(self, path: str):
+        self.path = path
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        with self.transaction() as conn:
+            for statement in self.SCHEMA:
+                conn.execute(statement)
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        """Kilit altında tek bir transaction açar (hata olursa geri alır)"""
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                yield self._conn
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            else:
+                self._conn.execute("COMMIT")
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -12,6 +12,7 @@ from sqlalchemy.orm import Session
 from sqlalchemy import func, desc
 
 from models import Entry, Analysis, User
+from taxonomy import normalize_distortion, display_name
 from agents.cognitive_agent import CognitiveAnalysisAgent
 
 # Logging konfigürasyonu
@@ -88,9 +89,12 @@ class StatisticsService:
                         except:
                             continue
                     
-                    # Çarpıtmaları topla
+                    # Çarpıtmaları topla (türler bir kez kanonik anahtara indirgenir)
                     distortions = analysis_data.get('distortions', [])
-                    all_distortions.extend(distortions)
+                    all_distortions.extend(
+                        {**d, "type": normalize_distortion(d.get('type'))}
+                        for d in distortions if isinstance(d, dict)
+                    )
                     
                     # Risk seviyesi
                     risk = analysis_data.get('risk_level', 'belirsiz')
@@ -143,7 +147,7 @@ class StatisticsService:
         
         # En yaygın çarpıtmalar (top 5)
         most_common = [
-            {"type": distortion_type, "count": count, "percentage": round((count / len(distortions)) * 100, 1)}
+            {"type": distortion_type, "name": display_name(distortion_type), "count": count, "percentage": round((count / len(distortions)) * 100, 1)}
             for distortion_type, count in type_counts.most_common(5)
         ]
         
@@ -544,7 +548,7 @@ Düşünce kalıplarınızı gözlemlemeye devam edin. Bu farkındalık, gelecek
                     "büyütme/küçültme": "Büyütme/küçültme, olumsuz yanları abartıp olumlu yanları küçümsemenizdir.",
                     "kehanetçilik": "Kehanetçilik, geleceği olumsuz tahmin etmenizdir. Bu, umutsuzluk yaratır.",
                     "keyfi çıkarsama": "Keyfi çıkarsama, yeterli kanıt olmadan sonuçlara varmanızdır.",
-                    "-meli/-malı düşünceleri": "-meli/-malı düşünceleri, katı kurallar koyup bunlara uymayı beklemenizdir."
+                    "meli/malı düşünceleri": "-meli/-malı düşünceleri, katı kurallar koyup bunlara uymayı beklemenizdir."
                 }
                 
                 explanation = distortion_explanations.get(distortion_type.lower(), f"{distortion_type} çarpıtması, düşünce kalıplarınızda tekrarlanan bir hatadır.")
@@ -560,7 +564,7 @@ Düşünce kalıplarınızı gözlemlemeye devam edin. Bu farkındalık, gelecek
                     "büyütme/küçültme": "Olumlu yanları da görün. Başarılarınızı küçümsemeyin, hatalarınızı da abartmayın.",
                     "kehanetçilik": "Geleceği tahmin etmeye çalışmayın. Şu ana odaklanın ve kontrol edebileceğiniz şeylere konsantre olun.",
                     "keyfi çıkarsama": "Kanıtları değerlendirin. Düşüncelerinizi destekleyen ve çürüten argümanları listeleyin.",
-                    "-meli/-malı düşünceleri": "Kurallarınızı esnek hale getirin. 'Yapmalıyım' yerine 'Yapmak istiyorum' deyin."
+                    "meli/malı düşünceleri": "Kurallarınızı esnek hale getirin. 'Yapmalıyım' yerine 'Yapmak istiyorum' deyin."
                 }
                 
                 recommendation = specific_recommendations.get(distortion_type.lower(), "Bu çarpıtma türü hakkında daha fazla bilgi edinmek ve pratik yapmak faydalı olacaktır.")
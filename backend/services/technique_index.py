@@ -0,0 +1,118 @@
+"""
+BDT Teknik İndeksi - therapy_techniques kataloğu için süreç içi NumPy indeksi
+Katalog yalnızca birkaç düzine teknikten oluşur; her sorguda Chroma'nın SQLite + HNSW
+katmanlarına gitmek yerine tüm teknikler tek, bitişik bir matriste tutulur. distortion_type ve difficulty filtreleri önceden hesaplanmış boolean maskelerdir;
+top-k tek bir matris-vektör çarpımıdır.
+
+Sonuçlar find_relevant_techniques ile aynı formattadır
+({"id", "text", "metadata", "relevance_score"}). Mesafe koleksiyonun HNSW uzayıyla (l2 /
+cosine / ip) aynı formülle hesaplanır ve relevance_score Chroma yolundaki gibi `1 - distance`
+olur; böylece skorun ölçeği sorguyu hangi yolun yanıtladığına bağlı değildir.
+"""
+
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+SPACES = ("l2", "cosine", "ip")
+
+
+class TechniqueIndex:
+    """Değişmez (immutable) teknik indeksi; güncellemede yenisi oluşturulup referans değiştirilir"""
+
+    def __init__(
+        self,
+        ids: Sequence[str],
+        embeddings: Sequence[Any],
+        documents: Sequence[str],
+        metadatas: Sequence[Dict[str, Any]],
+        space: str = "l2",
+    ):
+        if space not in SPACES:
+            raise ValueError(f"Bilinmeyen HNSW uzayı: {space}")
+        self.space = space
+        self.ids = list(ids)
+        self.documents = list(documents)
+        self.metadatas = [dict(metadata or {}) for metadata in metadatas]
+
+        if self.ids:
+            matrix = np.ascontiguousarray(np.asarray(embeddings, dtype=np.float32))
+            norms = np.linalg.norm(matrix, axis=1)
+            if space == "cosine":
+                matrix /= np.clip(norms, 1e-12, None)[:, None]
+        else:
+            matrix = np.zeros((0, 0), dtype=np.float32)
+            norms = np.zeros(0, dtype=np.float32)
+        self.matrix = matrix
+        # l2 (Chroma: kare öklid mesafesi) için satır normlarının kareleri
+        self.squared_norms = (norms ** 2).astype(np.float32)
+
+        self._masks: Dict[str, Dict[str, np.ndarray]] = {"distortion_type": {}, "difficulty": {}}
+        for field, masks in self._masks.items():
+            for row, metadata in enumerate(self.metadatas):
+                value = metadata.get(field)
+                if value is None:
+                    continue
+                if value not in masks:
+                    masks[value] = np.zeros(len(self.ids), dtype=bool)
+                masks[value][row] = True
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def mask(self, distortion_types: Optional[Sequence[str]] = None, difficulty: Optional[str] = None) -> np.ndarray:
+        """Filtrelerin kesişimi; distortion_types içindeki türler kendi aralarında VEYA'lanır"""
+        selected = np.ones(len(self.ids), dtype=bool)
+        if distortion_types:
+            any_type = np.zeros(len(self.ids), dtype=bool)
+            for distortion_type in distortion_types:
+                type_mask = self._masks["distortion_type"].get(distortion_type)
+                if type_mask is not None:
+                    any_type |= type_mask
+            selected &= any_type
+        if difficulty:
+            difficulty_mask = self._masks["difficulty"].get(difficulty)
+            if difficulty_mask is None:
+                return np.zeros(len(self.ids), dtype=bool)
+            selected &= difficulty_mask
+        return selected
+
+    def distances(self, query_embedding: Any) -> np.ndarray:
+        """Tüm tekniklere Chroma'nın HNSW uzayındaki mesafe (l2: kare öklid, cosine: 1 - cos, ip: 1 - iç çarpım)"""
+        query = np.asarray(query_embedding, dtype=np.float32)
+        if self.space == "cosine":
+            query = query / max(float(np.linalg.norm(query)), 1e-12)
+            return 1.0 - self.matrix @ query
+        if self.space == "ip":
+            return 1.0 - self.matrix @ query
+        return np.maximum(self.squared_norms + float(query @ query) - 2.0 * (self.matrix @ query), 0.0)
+
+    def search(
+        self,
+        query_embedding: Any,
+        n_results: int = 3,
+        distortion_types: Optional[Sequence[str]] = None,
+        difficulty: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """Filtreye uyan teknikler içinde `1 - distance` skoruna göre top-k"""
+        if not self.ids or n_results <= 0:
+            return []
+
+        scores = 1.0 - self.distances(query_embedding)
+
+        candidates = np.flatnonzero(self.mask(distortion_types, difficulty))
+        if candidates.size == 0:
+            return []
+        k = min(n_results, candidates.size)
+        top = candidates[np.argpartition(-scores[candidates], k - 1)[:k]]
+        top = top[np.argsort(-scores[top])]
+
+        return [
+            {
+                "id": self.ids[row],
+                "text": self.documents[row],
+                "metadata": dict(self.metadatas[row]),
+                "relevance_score": float(scores[row]),
+            }
+            for row in top
+        ]
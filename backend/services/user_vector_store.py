@@ -0,0 +1,267 @@
+"""
+Kullanıcı Başına Vektör Deposu - Benzer giriş aramasında tam (exact) arama katmanı
+Her kullanıcının normalize edilmiş giriş embedding'leri ayrı bir float16 dosyada
+(`<kök>/<hash[:2]>/<hash>.f16`) tutulur ve np.memmap ile açılır. Bir kullanıcının birkaç
+yüz / bin girişi için top-k tek bir vektörize nokta çarpımıdır; global HNSW indeksinde
+user_id filtresiyle arama yapmaya göre koleksiyon büyüdükçe yavaşlamaz ve recall kaybı yoktur.
+
+Doküman/metadata ve satır numaraları SQLite yan tablosunda saklanır. Depo devreye
+girmeden önce indekslenmiş kullanıcılar ilk aramada Chroma'dan bir kez aktarılır.
+
+Silinen satırların yerine dosyanın son satırları taşınır ve `count` küçültülür. Dosya
+kısaltılmaz (açık memmap'i olan bir arama dosya sonunu aşıp SIGBUS almasın); sondaki
+artık baytlar sonraki eklemelerde `count` ofsetinden itibaren üzerine yazılır.
+"""
+
+import os
+import json
+import shutil
+import hashlib
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from services.sqlite_store import SQLiteStore
+
+VECTOR_DTYPE = np.float16
+
+
+def normalize_rows(vectors: Any) -> np.ndarray:
+    """Satırları L2 normalize edilmiş float32 matrise çevirir"""
+    matrix = np.asarray(vectors, dtype=np.float32)
+    if matrix.ndim == 1:
+        matrix = matrix[None, :]
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.clip(norms, 1e-12, None)
+
+
+class UserVectorStore(SQLiteStore):
+    """Kullanıcı başına memory-mapped float16 vektör dosyaları + SQLite doküman tablosu"""
+
+    SCHEMA = [
+        """CREATE TABLE IF NOT EXISTS vector_users (
+            user_id TEXT PRIMARY KEY,
+            dim INTEGER,
+            count INTEGER NOT NULL DEFAULT 0
+        )""",
+        """CREATE TABLE IF NOT EXISTS vector_rows (
+            user_id TEXT NOT NULL,
+            row INTEGER NOT NULL,
+            id TEXT NOT NULL,
+            document TEXT,
+            metadata TEXT,
+            PRIMARY KEY (user_id, row)
+        )""",
+        "CREATE UNIQUE INDEX IF NOT EXISTS idx_vector_rows_id ON vector_rows (user_id, id)",
+    ]
+
+    def __init__(self, root_dir: str):
+        self.root_dir = root_dir
+        super().__init__(os.path.join(root_dir, "rows.sqlite3"))
+
+    # ----- YAZMA -----
+
+    def upsert_many(
+        self,
+        user_ids: Sequence[str],
+        ids: Sequence[str],
+        embeddings: Sequence[Any],
+        documents: Sequence[str],
+        metadatas: Sequence[Dict[str, Any]],
+    ) -> None:
+        """Girişleri kullanıcılarına göre gruplayıp yazar.
+
+        Deposu henüz oluşturulmamış kullanıcılar atlanır; ilk aramadaki aktarım bu
+        girişleri zaten Chroma'dan okuyacaktır.
+        """
+        groups: Dict[str, List[int]] = {}
+        for position, user_id in enumerate(user_ids):
+            groups.setdefault(str(user_id), []).append(position)
+
+        with self.transaction() as conn:
+            for user_id, positions in groups.items():
+                if not self._is_built(conn, user_id):
+                    continue
+                self._write(
+                    conn, user_id,
+                    [ids[i] for i in positions],
+                    [embeddings[i] for i in positions],
+                    [documents[i] for i in positions],
+                    [metadatas[i] for i in positions],
+                )
+
+    def ensure_user(
+        self,
+        user_id: str,
+        load: Callable[[], Tuple[List[str], List[Any], List[str], List[Dict[str, Any]]]],
+    ) -> None:
+        """Kullanıcının deposu yoksa `load` ile (ids, embeddings, documents, metadatas) bir kez doldurur"""
+        with self.transaction() as conn:
+            if self._is_built(conn, user_id):
+                return
+            conn.execute("INSERT INTO vector_users (user_id, count) VALUES (?, 0)", (user_id,))
+            ids, embeddings, documents, metadatas = load()
+            if ids:
+                self._write(conn, user_id, ids, embeddings, documents, metadatas)
+
+    def remove_many(self, user_id: str, ids: Sequence[str]) -> None:
+        """Girişlerin satırlarını siler; boşluklar dosyanın son satırlarıyla doldurulur"""
+        with self.transaction() as conn:
+            user = conn.execute("SELECT dim, count FROM vector_users WHERE user_id = ?", (user_id,)).fetchone()
+            if user is None or not ids:
+                return
+            dim, count = user
+
+            removed = set()
+            for start in range(0, len(ids), 500):
+                chunk = [str(i) for i in ids[start:start + 500]]
+                removed.update(row for (row,) in conn.execute(
+                    f"SELECT row FROM vector_rows WHERE user_id = ? AND id IN ({','.join('?' * len(chunk))})",
+                    (user_id, *chunk),
+                ))
+            if not removed:
+                return
+
+            remaining = count - len(removed)
+            holes = sorted(row for row in removed if row < remaining)
+            movers = sorted(row for row in range(remaining, count) if row not in removed)
+            conn.executemany(
+                "DELETE FROM vector_rows WHERE user_id = ? AND row = ?",
+                [(user_id, row) for row in removed],
+            )
+            if holes:
+                mapped = np.memmap(self._vector_path(user_id), dtype=VECTOR_DTYPE, mode="r+", shape=(count, dim))
+                for hole, mover in zip(holes, movers):
+                    mapped[hole] = mapped[mover]
+                    conn.execute(
+                        "UPDATE vector_rows SET row = ? WHERE user_id = ? AND row = ?",
+                        (hole, user_id, mover),
+                    )
+                mapped.flush()
+                del mapped
+            conn.execute("UPDATE vector_users SET count = ? WHERE user_id = ?", (remaining, user_id))
+
+    def remove_user(self, user_id: str) -> None:
+        with self.transaction() as conn:
+            conn.execute("DELETE FROM vector_rows WHERE user_id = ?", (user_id,))
+            conn.execute("DELETE FROM vector_users WHERE user_id = ?", (user_id,))
+            path = self._vector_path(user_id)
+            if os.path.exists(path):
+                os.remove(path)
+
+    def reset(self) -> None:
+        """Tüm kullanıcı depolarını siler (koleksiyonlar yeniden indekslendiğinde)"""
+        with self.transaction() as conn:
+            conn.execute("DELETE FROM vector_rows")
+            conn.execute("DELETE FROM vector_users")
+            for name in os.listdir(self.root_dir):
+                path = os.path.join(self.root_dir, name)
+                if os.path.isdir(path):
+                    shutil.rmtree(path, ignore_errors=True)
+
+    # ----- OKUMA -----
+
+    def has_user(self, user_id: str) -> bool:
+        with self._lock:
+            return self._is_built(self._conn, user_id)
+
+    def search(self, user_id: str, query_embedding: Any, n_results: int = 5) -> Optional[List[Dict[str, Any]]]:
+        """Kullanıcının girişleri içinde kosinüs benzerliğine göre tam top-k (depo yoksa None)"""
+        with self._lock:
+            user = self._conn.execute(
+                "SELECT dim, count FROM vector_users WHERE user_id = ?", (user_id,)
+            ).fetchone()
+        if user is None:
+            return None
+        dim, count = user
+        if not count or n_results <= 0:
+            return []
+
+        vectors = np.memmap(self._vector_path(user_id), dtype=VECTOR_DTYPE, mode="r", shape=(count, dim))
+        query = normalize_rows(query_embedding)[0]
+        scores = vectors.astype(np.float32) @ query
+
+        k = min(n_results, count)
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+
+        with self._lock:
+            rows = {
+                row: (entry_id, document, metadata)
+                for row, entry_id, document, metadata in self._conn.execute(
+                    f"SELECT row, id, document, metadata FROM vector_rows WHERE user_id = ? "
+                    f"AND row IN ({','.join('?' * len(top))})",
+                    (user_id, *[int(i) for i in top]),
+                )
+            }
+
+        results = []
+        for row in top:
+            entry_id, document, metadata = rows[int(row)]
+            results.append({
+                "id": entry_id,
+                "text": document,
+                "metadata": json.loads(metadata) if metadata else {},
+                "similarity_score": float(scores[row]),
+            })
+        return results
+
+    # ----- YARDIMCILAR -----
+
+    def _vector_path(self, user_id: str) -> str:
+        digest = hashlib.sha1(str(user_id).encode("utf-8")).hexdigest()
+        return os.path.join(self.root_dir, digest[:2], f"{digest}.f16")
+
+    @staticmethod
+    def _is_built(conn, user_id: str) -> bool:
+        return conn.execute("SELECT 1 FROM vector_users WHERE user_id = ?", (user_id,)).fetchone() is not None
+
+    def _write(self, conn, user_id: str, ids, embeddings, documents, metadatas) -> None:
+        """Var olan ID'lerin satırlarını yerinde günceller, yenilerini dosya sonuna ekler"""
+        vectors = normalize_rows(embeddings).astype(VECTOR_DTYPE)
+        dim = vectors.shape[1]
+        count = conn.execute("SELECT count FROM vector_users WHERE user_id = ?", (user_id,)).fetchone()[0]
+
+        existing = {}
+        for start in range(0, len(ids), 500):
+            chunk = [str(i) for i in ids[start:start + 500]]
+            existing.update(conn.execute(
+                f"SELECT id, row FROM vector_rows WHERE user_id = ? AND id IN ({','.join('?' * len(chunk))})",
+                (user_id, *chunk),
+            ).fetchall())
+
+        path = self._vector_path(user_id)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        appended = []
+        updates = []
+        for position, entry_id in enumerate(ids):
+            row = existing.get(str(entry_id))
+            if row is None:
+                # Aynı batch'te tekrar eden ID son yazılanla güncellenir
+                row = count + len(appended)
+                existing[str(entry_id)] = row
+                appended.append(position)
+            else:
+                updates.append((row, position))
+            conn.execute(
+                "INSERT OR REPLACE INTO vector_rows (user_id, row, id, document, metadata) VALUES (?, ?, ?, ?, ?)",
+                (user_id, row, str(entry_id), documents[position], json.dumps(metadatas[position], ensure_ascii=False)),
+            )
+
+        if appended:
+            # Silmelerden kalan artık satırlar varsa dosya sonuna değil `count` ofsetine yazılır
+            with open(path, "r+b" if os.path.exists(path) else "wb") as f:
+                f.seek(count * dim * vectors.itemsize)
+                f.write(vectors[appended].tobytes())
+        if updates:
+            mapped = np.memmap(path, dtype=VECTOR_DTYPE, mode="r+", shape=(count + len(appended), dim))
+            for row, position in updates:
+                mapped[row] = vectors[position]
+            mapped.flush()
+            del mapped
+
+        conn.execute(
+            "UPDATE vector_users SET dim = ?, count = ? WHERE user_id = ?",
+            (dim, count + len(appended), user_id),
+        )
@@ -0,0 +1,144 @@
+"""
+Bilişsel Çarpıtma Taksonomisi - Tüm alt sistemlerin paylaştığı kanonik çarpıtma türleri
+LLM'in ürettiği serbest yazımlar ("Felaketleştirme", "felaketlestirme", "Felaketleştirme ")
+Türkçe-duyarlı küçük harfe çevirme, aksan katlama ve alias tablosu ile tek bir kanonik
+anahtara indirgenir. Normalizasyon analiz, istatistik ve indeksleme sırasında yazım anında
+bir kez uygulanır; toplama aşamasında tekrar normalize etmeye gerek kalmaz.
+"""
+
+import re
+import unicodedata
+from functools import lru_cache
+from typing import Any, Dict, List
+
+# -----------------------------------------------------------------------------
+# Kanonik çarpıtma türleri (anahtarlar BDT_TECHNIQUES anahtarlarıyla aynıdır)
+# -----------------------------------------------------------------------------
+CANONICAL_DISTORTIONS: Dict[str, str] = {
+    "felaketleştirme": "Felaketleştirme",
+    "zihin okuma": "Zihin Okuma",
+    "genelleme": "Genelleme",
+    "kişiselleştirme": "Kişiselleştirme",
+    "etiketleme": "Etiketleme",
+    "ya hep ya hiç": "Ya Hep Ya Hiç Düşüncesi",
+    "büyütme/küçültme": "Büyütme/Küçültme",
+    "kehanetçilik": "Kehanetçilik",
+    "keyfi çıkarsama": "Keyfi Çıkarsama",
+    "meli/malı düşünceleri": "-meli/-malı Düşünceleri",
+}
+
+UNKNOWN_DISTORTION = "bilinmeyen"
+
+# Kanonik anahtar -> bilinen ek yazımlar (Türkçe varyantlar ve İngilizce BDT terimleri)
+_ALIASES: Dict[str, List[str]] = {
+    "felaketleştirme": ["felaket", "felaketleştirme düşüncesi", "catastrophizing", "catastrophising"],
+    "zihin okuma": ["zihin okumak", "akıl okuma", "mind reading"],
+    "genelleme": ["aşırı genelleme", "genelleştirme", "overgeneralization", "overgeneralisation", "generalization"],
+    "kişiselleştirme": ["kişiselleştirmek", "personalization", "personalisation"],
+    "etiketleme": ["etiketlemek", "yaftalama", "labeling", "labelling"],
+    "ya hep ya hiç": [
+        "ya hep ya hiç düşüncesi", "hep ya da hiç", "siyah beyaz düşünce", "siyah-beyaz düşünme",
+        "all or nothing", "all-or-nothing thinking", "black and white thinking",
+    ],
+    "büyütme/küçültme": [
+        "büyütme", "küçültme", "büyütme küçültme", "büyütme ve küçültme", "büyütme-küçültme",
+        "magnification", "minimization", "magnification/minimization",
+    ],
+    "kehanetçilik": ["kehanet", "falcılık", "geleceği okuma", "fortune telling", "fortune-telling"],
+    "keyfi çıkarsama": ["keyfi sonuç çıkarma", "aceleci sonuç çıkarma", "arbitrary inference", "jumping to conclusions"],
+    "meli/malı düşünceleri": [
+        "meli malı", "meli/malı", "meli-malı", "-meli/-malı", "-meli/-malı düşünceleri",
+        "meli malı düşünceleri", "meli/malı düşüncesi", "olmalı düşünceleri", "should statements", "should",
+    ],
+}
+
+# Sonda tek başına anlam taşımayan dolgu kelimeleri ("... düşüncesi", "... çarpıtması")
+_FILLER_SUFFIXES = ("dusuncesi", "dusunceleri", "dusunce", "carpitmasi", "carpitma")
+
+# -----------------------------------------------------------------------------
+# Önceden derlenmiş dönüşüm tabloları
+# -----------------------------------------------------------------------------
+# Türkçe büyük/küçük harf: str.lower() "I" -> "i" ve "İ" -> "i̇" üretir, önce düzeltilir
+_TR_CASE = str.maketrans({"I": "ı", "İ": "i"})
+_TR_FOLD = str.maketrans("çğıöşüâîû", "cgiosuaiu")
+_NON_WORD = re.compile(r"[^\w\s]+")
+_SEPARATORS = re.compile(r"[\s_\-/]+")
+
+
+def turkish_lower(text: str) -> str:
+    """Türkçe-duyarlı küçük harfe çevirme (I -> ı, İ -> i)."""
+    return text.translate(_TR_CASE).lower()
+
+
+def fold(text: str) -> str:
+    """Karşılaştırma anahtarı: Türkçe küçük harf + aksan katlama + ayraç/noktalama sadeleştirme."""
+    folded = turkish_lower(text).translate(_TR_FOLD)
+    # Kalan birleşik aksanları (é, ā ...) düşür
+    folded = "".join(c for c in unicodedata.normalize("NFKD", folded) if not unicodedata.combining(c))
+    folded = _SEPARATORS.sub(" ", folded)
+    folded = _NON_WORD.sub("", folded)
+    return " ".join(folded.split())
+
+
+def _build_lookup() -> Dict[str, str]:
+    lookup: Dict[str, str] = {}
+    for canonical, display in CANONICAL_DISTORTIONS.items():
+        for spelling in [canonical, display, *_ALIASES.get(canonical, [])]:
+            lookup[fold(spelling)] = canonical
+    return lookup
+
+
+_LOOKUP: Dict[str, str] = _build_lookup()
+
+
+@lru_cache(maxsize=4096)
+def normalize_distortion(raw: Any) -> str:
+    """Serbest yazılmış çarpıtma türünü kanonik anahtara çevirir.
+
+    Bilinmeyen türler Türkçe küçük harfe çevrilip boşlukları sadeleştirilmiş haliyle döner,
+    böylece yazım farkları yine tek bir kovada toplanır.
+    """
+    if not raw or not isinstance(raw, str):
+        return UNKNOWN_DISTORTION
+
+    key = fold(raw)
+    canonical = _LOOKUP.get(key)
+    if canonical is not None:
+        return canonical
+
+    # "... düşüncesi" / "... çarpıtması" gibi dolgu eklerini at ve tekrar dene
+    words = key.split()
+    if len(words) > 1 and words[-1] in _FILLER_SUFFIXES:
+        canonical = _LOOKUP.get(" ".join(words[:-1]))
+        if canonical is not None:
+            return canonical
+
+    return " ".join(turkish_lower(raw).split()) or UNKNOWN_DISTORTION
+
+
+def is_canonical(distortion_type: str) -> bool:
+    """Türün bilinen kanonik anahtarlardan biri olup olmadığını döndürür."""
+    return distortion_type in CANONICAL_DISTORTIONS
+
+
+def display_name(distortion_type: str) -> str:
+    """Kanonik anahtar için gösterim adını döndürür."""
+    return CANONICAL_DISTORTIONS.get(distortion_type, distortion_type)
+
+
+def distortion_flag(distortion_type: Any) -> str:
+    """Çarpıtma türü için boolean metadata alanı adı ("ya hep ya hiç" -> "dist_ya_hep_ya_hic").
+
+    Chroma virgülle birleştirilmiş `distortions` alanında içerik araması yapamadığı için
+    girişler her çarpıtma türü için ayrı bir bayrakla indekslenir; filtre vektör sorgusuna
+    `where={"dist_...": True}` olarak iner.
+    """
+    return "dist_" + fold(normalize_distortion(distortion_type)).replace(" ", "_")
+
+
+def normalize_analysis(analysis: Dict[str, Any]) -> Dict[str, Any]:
+    """Analiz sonucundaki çarpıtma türlerini yerinde kanonik anahtarlara çevirir."""
+    for distortion in analysis.get("distortions") or []:
+        if isinstance(distortion, dict):
+            distortion["type"] = normalize_distortion(distortion.get("type"))
+    return analysis
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Koleksiyon Açma Testi - Eksik koleksiyonun HNSW ayarlarıyla oluşturulması ve ef_search'ün
+yalnızca değiştiğinde uygulanması
+"""
+
+import os
+import sys
+import logging
+
+import pytest
+
+# Backend klasörünü Python path'ine ekle
+sys.path.insert(0, os.path.dirname(__file__))
+
+chromadb = pytest.importorskip("chromadb")
+pytest.importorskip("numpy")
+
+from chromadb.config import Settings
+
+from services.chroma_service import ChromaService
+from services.embedding_backends import EMBEDDING_MODEL_NAME, OnnxEmbeddingFunction, register_with_chroma
+
+
+def make_service(path):
+    service = ChromaService.__new__(ChromaService)
+    service.client = chromadb.PersistentClient(path=str(path), settings=Settings(anonymized_telemetry=False))
+    embedding_function = OnnxEmbeddingFunction.__new__(OnnxEmbeddingFunction)
+    embedding_function.model_name = EMBEDDING_MODEL_NAME
+    register_with_chroma(embedding_function)
+    service.embedding_function = embedding_function
+    return service
+
+
+def updates(caplog):
+    return [record for record in caplog.records if "olarak güncellendi" in record.getMessage()]
+
+
+def test_ef_search_applied_only_when_changed(tmp_path, monkeypatch, caplog):
+    caplog.set_level(logging.INFO, logger="services.chroma_service")
+    monkeypatch.setenv("CHROMA_HNSW_EF_SEARCH", "64")
+    monkeypatch.setenv("CHROMA_HNSW_USER_ENTRIES_M", "32")
+
+    created = make_service(tmp_path)._open_collection("user_entries", "user_entries")
+    assert created.configuration_json["hnsw"]["ef_search"] == 64
+    assert created.configuration_json["hnsw"]["max_neighbors"] == 32
+
+    make_service(tmp_path)._open_collection("user_entries", "user_entries")
+    assert updates(caplog) == []
+
+    monkeypatch.setenv("CHROMA_HNSW_EF_SEARCH", "80")
+    make_service(tmp_path)._open_collection("user_entries", "user_entries")
+    assert len(updates(caplog)) == 1
+
+    reopened = make_service(tmp_path)._open_collection("user_entries", "user_entries")
+    assert len(updates(caplog)) == 1
+    assert reopened.configuration_json["hnsw"]["ef_search"] == 80
+
+
+def test_open_errors_are_not_treated_as_missing(tmp_path):
+    """Yalnızca NotFoundError koleksiyon oluşturur; diğer hatalar olduğu gibi yükselir"""
+    service = make_service(tmp_path)
+    service._open_collection("user_entries", "user_entries")
+
+    class BrokenEmbedder:
+        def __call__(self, input):
+            return []
+
+    service.embedding_function = BrokenEmbedder()
+    with pytest.raises(AttributeError):
+        service._open_collection("user_entries", "user_entries")
@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""
+Chroma Bakım Testi - `compact --drop-unaliased` süren reindex'in gölge koleksiyonlarını silmez
+"""
+
+import os
+import sys
+import json
+from datetime import datetime, timedelta
+
+# Backend klasörünü Python path'ine ekle
+sys.path.insert(0, os.path.dirname(__file__))
+
+from scripts.chroma_maintenance import droppable_collections, reindex_shadows
+
+NOW = datetime(2024, 6, 2, 12, 0, 0)
+DAY = timedelta(hours=24)
+
+
+def test_drops_only_old_unaliased_shadows():
+    names = [
+        "user_entries",                       # ilk swap'tan kalan asıl koleksiyon
+        "user_entries__20240520T090000",      # alias'taki canlı koleksiyon
+        "user_entries__20240510T090000",      # eski gölge
+        "user_entries__20240602T110000",      # bir saatlik gölge
+        "analysis_results__20240501T090000",  # checkpoint'teki gölge
+        "user_entries__backup",
+        "other__20240101T000000",
+    ]
+    live = {"user_entries__20240520T090000", "analysis_results", "therapy_techniques"}
+    protected = {"analysis_results__20240501T090000"}
+
+    dropped = droppable_collections(names, live, protected, DAY, now=NOW)
+
+    assert dropped == ["user_entries", "user_entries__20240510T090000"]
+
+
+def test_reindex_shadows_reads_checkpoint(tmp_path):
+    path = tmp_path / "reindex.json"
+    assert reindex_shadows(str(path)) == set()
+
+    path.write_text(json.dumps({
+        "job_key": {"collections": ["entries"]},
+        "state": {"shadows": {"user_entries": "user_entries__20240602T110000", "analysis_results": None}},
+    }))
+    assert reindex_shadows(str(path)) == {"user_entries__20240602T110000"}
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Embedding Backend Testi - ONNX / remote embedder'larıyla kalıcı koleksiyonun yeniden açılması
+"""
+
+import os
+import sys
+
+import pytest
+
+# Backend klasörünü Python path'ine ekle
+sys.path.insert(0, os.path.dirname(__file__))
+
+chromadb = pytest.importorskip("chromadb")
+pytest.importorskip("numpy")
+
+from chromadb.api.types import EmbeddingFunction
+from chromadb.config import Settings
+
+from services.embedding_backends import (
+    EMBEDDING_MODEL_NAME,
+    OnnxEmbeddingFunction,
+    RemoteEmbeddingFunction,
+    register_with_chroma,
+)
+
+VECTOR = [0.1, 0.2, 0.3, 0.4]
+
+
+def bare(cls):
+    """Modeli / sunucuyu yüklemeden embedder örneği (vektörler testte açıkça verilir)"""
+    embedding_function = cls.__new__(cls)
+    embedding_function.model_name = EMBEDDING_MODEL_NAME
+    return embedding_function
+
+
+def open_client(path):
+    return chromadb.PersistentClient(path=str(path), settings=Settings(anonymized_telemetry=False))
+
+
+@pytest.mark.parametrize("cls", [OnnxEmbeddingFunction, RemoteEmbeddingFunction])
+def test_existing_collection_reopens(tmp_path, cls):
+    """İlk açılışta oluşturulan koleksiyon sonraki açılışlarda aynı embedder ile açılır"""
+    created = open_client(tmp_path).create_collection(name="user_entries", embedding_function=bare(cls))
+    created.add(ids=["entry_1_7"], embeddings=[VECTOR], documents=["sınav stresi"])
+
+    for _ in range(2):
+        collection = open_client(tmp_path).get_collection(name="user_entries", embedding_function=bare(cls))
+        assert collection.count() == 1
+        collection = open_client(tmp_path).get_or_create_collection(name="user_entries", embedding_function=bare(cls))
+        assert collection.count() == 1
+
+    persisted = collection.configuration_json["embedding_function"]
+    assert persisted["type"] == "known"
+    assert persisted["name"] == "sentence_transformer"
+    assert persisted["config"]["model_name"] == EMBEDDING_MODEL_NAME
+
+
+def test_backends_share_collections(tmp_path):
+    """ONNX ile oluşturulan koleksiyon remote backend ile (ve tersi) yeniden indekslenmeden açılır"""
+    open_client(tmp_path).create_collection(name="user_entries", embedding_function=bare(OnnxEmbeddingFunction))
+    open_client(tmp_path).create_collection(name="analysis_results", embedding_function=bare(RemoteEmbeddingFunction))
+
+    client = open_client(tmp_path)
+    client.get_collection(name="user_entries", embedding_function=bare(RemoteEmbeddingFunction))
+    client.get_collection(name="analysis_results", embedding_function=bare(OnnxEmbeddingFunction))
+
+
+class LegacyEmbedder(EmbeddingFunction):
+    """name()/get_config() tanımlamayan eski tarz embedder (Chroma legacy config yazar)"""
+
+    def __init__(self):
+        pass
+
+    def __call__(self, input):
+        return [VECTOR for _ in input]
+
+
+def test_legacy_collection_reopens(tmp_path):
+    """Eski embedder'larla oluşturulmuş (legacy config'li) koleksiyonlar da açılır"""
+    open_client(tmp_path).create_collection(name="therapy_techniques", embedding_function=LegacyEmbedder())
+
+    collection = open_client(tmp_path).get_collection(name="therapy_techniques", embedding_function=bare(OnnxEmbeddingFunction))
+    assert collection.configuration_json["embedding_function"]["type"] == "legacy"
+
+
+def test_modify_reuses_live_embedder(tmp_path):
+    """modify sonrası Chroma config'ten embedder kurarken torch modeli yerine mevcut örneği kullanır"""
+    embedding_function = bare(OnnxEmbeddingFunction)
+    register_with_chroma(embedding_function)
+    open_client(tmp_path).create_collection(name="user_entries", embedding_function=embedding_function)
+
+    collection = open_client(tmp_path).get_collection(name="user_entries", embedding_function=embedding_function)
+    collection.modify(configuration={"hnsw": {"ef_search": 64}})
+
+    assert collection.configuration["embedding_function"] is embedding_function
+    reopened = open_client(tmp_path).get_collection(name="user_entries", embedding_function=embedding_function)
+    assert reopened.configuration_json["hnsw"]["ef_search"] == 64
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Entry Silme Testi - Silinen girişin kalıp sayaçları ve yan indekslerden düşülmesi
+"""
+
+import os
+import sys
+
+import pytest
+
+# Backend klasörünü Python path'ine ekle
+sys.path.insert(0, os.path.dirname(__file__))
+
+# chroma_service modülü numpy'ye bağlı yan depoları import eder
+pytest.importorskip("numpy")
+
+from services.chroma_service import ChromaService
+from services.keyword_index import KeywordIndex
+from services.neighbor_store import NeighborStore
+from services.pattern_store import UserPatternStore
+from services.user_vector_store import UserVectorStore
+
+USER_ID = "7"
+
+
+class RecordingCollection:
+    """Silinen ID'leri kaydeden koleksiyon yerine geçen nesne"""
+
+    def __init__(self):
+        self.deleted = []
+
+    def delete(self, ids):
+        self.deleted.extend(ids)
+
+
+def analysis_metadata(analysis_id, distortion_types, mood, analyzed_at):
+    return {
+        "analysis_id": analysis_id,
+        "user_id": USER_ID,
+        "distortion_types": distortion_types,
+        "overall_mood": mood,
+        "risk_level": "düşük",
+        "analyzed_at": analyzed_at,
+    }
+
+
+@pytest.fixture
+def service(tmp_path):
+    service = ChromaService.__new__(ChromaService)
+    service.entries_collection = RecordingCollection()
+    service.analysis_collection = RecordingCollection()
+    service.pattern_store = UserPatternStore(str(tmp_path / "patterns.sqlite3"))
+    service.keyword_index = KeywordIndex(str(tmp_path / "keywords.sqlite3"))
+    service.neighbor_store = NeighborStore(str(tmp_path / "neighbors.sqlite3"), k=5)
+    service.user_vectors = None
+    return service
+
+
+def test_deleted_entry_restores_patterns(service):
+    """Giriş oluşturulup silindiğinde kalıplar önceki değerlerine döner"""
+    first = analysis_metadata("1", "felaketleştirme", "kaygılı", "2025-01-01T10:00:00")
+    service.pattern_store.ensure_user(USER_ID, lambda: [first])
+    service.keyword_index.ensure_user(
+        USER_ID, lambda: (["entry_1_7"], ["sınav stresi"], ["sınav stresi"], [{"entry_id": "1"}])
+    )
+    service.neighbor_store.set_many([(USER_ID, "1", [])])
+    before = service.pattern_store.get_patterns(USER_ID)
+
+    # Yeni giriş + analiz indekslenir
+    service.pattern_store.add_many([
+        analysis_metadata("2", "felaketleştirme,etiketleme", "üzgün", "2025-02-01T10:00:00")
+    ])
+    service.keyword_index.add_many([USER_ID], ["entry_2_7"], ["sınav kaygısı"], ["sınav kaygısı"], [{"entry_id": "2"}])
+    service.neighbor_store.set_many([(USER_ID, "2", [("1", 0.8)])])
+    service.neighbor_store.offer_many(USER_ID, [("1", "2", 0.8)])
+    assert service.pattern_store.get_patterns(USER_ID) != before
+
+    removed = service._delete_entries_batch_sync([{"entry_id": "2", "user_id": USER_ID, "analysis_id": "2"}])
+
+    assert removed == 1
+    assert service.pattern_store.get_patterns(USER_ID) == before
+    assert service.entries_collection.deleted == ["entry_2_7"]
+    assert service.analysis_collection.deleted == ["2"]
+    assert [hit["id"] for hit in service.keyword_index.search(USER_ID, ["sinav"])] == ["entry_1_7"]
+    assert service.neighbor_store.get(USER_ID, "2") is None
+    assert service.neighbor_store.get(USER_ID, "1") == []
+
+
+def test_deleted_entries_keep_user_vector_file(service, tmp_path):
+    """Silinen satırlar dosyadan düşülür; kullanıcı deposu yeniden kurulmadan aranmaya devam eder"""
+    service.user_vectors = UserVectorStore(str(tmp_path / "user_vectors"))
+    ids = [f"entry_{i}_7" for i in range(1, 6)]
+    embeddings = [[1.0 if j == i else 0.0 for j in range(5)] for i in range(5)]
+    service.user_vectors.ensure_user(
+        USER_ID, lambda: (ids, embeddings, ids, [{"entry_id": str(i)} for i in range(1, 6)])
+    )
+
+    service._delete_entries_batch_sync([
+        {"entry_id": "2", "user_id": USER_ID},
+        {"entry_id": "5", "user_id": USER_ID},
+    ])
+
+    assert service.user_vectors.has_user(USER_ID)
+    hits = service.user_vectors.search(USER_ID, [1.0, 1.0, 1.0, 1.0, 1.0], n_results=10)
+    assert sorted(hit["id"] for hit in hits) == ["entry_1_7", "entry_3_7", "entry_4_7"]
+    for position, entry_id in enumerate(ids):
+        top = service.user_vectors.search(USER_ID, embeddings[position], n_results=1)[0]
+        if entry_id in ("entry_2_7", "entry_5_7"):
+            assert top["similarity_score"] < 0.5
+        else:
+            assert top["id"] == entry_id and top["similarity_score"] > 0.99
+
+    # Yeni giriş silinenlerden kalan artık satırların yerine yazılır
+    service.user_vectors.upsert_many([USER_ID], ["entry_6_7"], [[0.0, 1.0, 0.0, 0.0, 0.0]], ["yeni"], [{"entry_id": "6"}])
+    assert service.user_vectors.search(USER_ID, [0.0, 1.0, 0.0, 0.0, 0.0], n_results=1)[0]["id"] == "entry_6_7"
+    assert len(service.user_vectors.search(USER_ID, [1.0] * 5, n_results=10)) == 4
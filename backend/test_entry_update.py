@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Entry Düzenleme Testi - Metni değişen girişin indeksleme kuyruğuna yeniden gönderilmesi
+"""
+
+import os
+import sys
+import tempfile
+from datetime import datetime
+
+import pytest
+
+# Backend klasörünü Python path'ine ekle
+sys.path.insert(0, os.path.dirname(__file__))
+
+pytest.importorskip("fastapi")
+pytest.importorskip("sqlalchemy")
+pytest.importorskip("langchain_openai")
+
+# main import'u veritabanı motorunu ve LLM ajanlarını kurar
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{tempfile.mkdtemp()}/entries.sqlite3")
+os.environ.setdefault("OPENAI_API_KEY", "test")
+
+from fastapi.testclient import TestClient
+
+import main
+import services.analysis_indexer as analysis_indexer
+from auth import get_current_user
+from database import SessionLocal
+from models import Analysis, Entry, User
+
+
+class RecordingIndexer:
+    """Gönderilen indeksleme öğelerini kaydeden indeksleyici yerine geçen nesne"""
+
+    def __init__(self):
+        self.submitted = []
+
+    def submit(self, **item):
+        self.submitted.append(item)
+        return True
+
+
+@pytest.fixture
+def setup(monkeypatch):
+    db = SessionLocal()
+    user = User(email=f"user{datetime.utcnow().timestamp()}@example.com", password_hash="x")
+    db.add(user)
+    db.commit()
+    entry = Entry(user_id=user.id, text="Sınavdan kalacağım", mood_score=3)
+    db.add(entry)
+    db.commit()
+    analysis = Analysis(entry_id=entry.id, result={"distortions": [], "overall_mood": "kaygılı"}, analyzed_at=datetime.utcnow())
+    db.add(analysis)
+    db.commit()
+    ids = (user.id, entry.id, analysis.id)
+    db.close()
+
+    indexer = RecordingIndexer()
+    monkeypatch.setattr(analysis_indexer, "get_analysis_indexer", lambda: indexer)
+    main.app.dependency_overrides[get_current_user] = lambda: SessionLocal().get(User, ids[0])
+    yield TestClient(main.app), indexer, ids
+    main.app.dependency_overrides.clear()
+
+
+def test_text_edit_resubmits_entry(setup):
+    client, indexer, (user_id, entry_id, analysis_id) = setup
+
+    response = client.put(f"/entries/{entry_id}", json={"text": "Sınavım iyi geçti"})
+
+    assert response.status_code == 200
+    assert len(indexer.submitted) == 1
+    item = indexer.submitted[0]
+    assert item["entry_id"] == str(entry_id)
+    assert item["user_id"] == str(user_id)
+    assert item["text"] == "Sınavım iyi geçti"
+    assert item["analysis_id"] == str(analysis_id)
+    assert item["analysis_result"]["overall_mood"] == "kaygılı"
+
+
+def test_unchanged_edit_does_not_resubmit(setup):
+    client, indexer, (_, entry_id, _) = setup
+
+    response = client.put(f"/entries/{entry_id}", json={"text": "Sınavdan kalacağım", "mood_score": 3})
+
+    assert response.status_code == 200
+    assert indexer.submitted == []
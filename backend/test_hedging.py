@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Hedging Politikası Testi - Hedge bütçesi ve kaybeden çağrının iptali
+"""
+
+import os
+import sys
+import asyncio
+import importlib.util
+
+import pytest
+
+
+def _load_hedging():
+    """agents/hedging.py'yi paket üzerinden değil doğrudan yükler.
+
+    agents paketinin __init__'i LLM ajanlarını (langchain) import eder; hedging modülünün
+    kendisi yalnızca standart kütüphaneye bağlıdır.
+    """
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "agents", "hedging.py")
+    spec = importlib.util.spec_from_file_location("hedging_under_test", path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+HedgingPolicy = _load_hedging().HedgingPolicy
+
+
+def fast_policy(budget_percent):
+    # Eşik çok kısa: her yavaş çağrı hedge adayı olur, sınırı yalnızca bütçe koyar
+    return HedgingPolicy(enabled=True, budget_percent=budget_percent, initial_delay=0.005, min_delay=0.005)
+
+
+def test_budget_caps_hedges():
+    policy = fast_policy(budget_percent=10)
+
+    async def slow_call():
+        await asyncio.sleep(0.02)
+        return "ok"
+
+    async def run_all():
+        for _ in range(20):
+            assert await policy.run(slow_call) == "ok"
+
+    asyncio.run(run_all())
+    stats = policy.get_stats()
+    assert stats["requests"] == 20
+    assert stats["hedges"] == 2
+    assert stats["budget_denied"] == 18
+
+
+def test_zero_budget_never_hedges():
+    policy = fast_policy(budget_percent=0)
+    calls = []
+
+    async def slow_call():
+        calls.append(1)
+        await asyncio.sleep(0.02)
+        return "ok"
+
+    asyncio.run(policy.run(slow_call))
+    assert len(calls) == 1
+    assert policy.get_stats()["hedges"] == 0
+
+
+def test_hedge_wins_and_primary_is_cancelled():
+    policy = fast_policy(budget_percent=100)
+    cancelled = []
+    attempts = []
+
+    async def call():
+        attempt = len(attempts)
+        attempts.append(attempt)
+        try:
+            # İlk çağrı takılır, hedge hızlı döner
+            await asyncio.sleep(1.0 if attempt == 0 else 0.01)
+        except asyncio.CancelledError:
+            cancelled.append(attempt)
+            raise
+        return attempt
+
+    async def run():
+        result = await policy.run(call)
+        await asyncio.sleep(0)  # iptalin işlenmesi için
+        return result
+
+    assert asyncio.run(run()) == 1
+    assert cancelled == [0]
+    assert policy.get_stats()["hedge_wins"] == 1
+
+
+def test_disabled_policy_passes_through():
+    policy = HedgingPolicy(enabled=False)
+
+    async def call():
+        return 42
+
+    assert asyncio.run(policy.run(call)) == 42
+    assert policy.get_stats()["requests"] == 0
+
+
+def test_invalid_percentile():
+    with pytest.raises(ValueError):
+        HedgingPolicy(percentile=100)
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Anahtar Kelime İndeksi Testi - Türkçe tokenizasyon ve BM25 sıralaması
+"""
+
+import os
+import sys
+
+# Backend klasörünü Python path'ine ekle
+sys.path.insert(0, os.path.dirname(__file__))
+
+from services.keyword_index import KeywordIndex, normalize_token, reciprocal_rank_fusion, tokenize
+
+
+def test_tokenize_folds_case_and_suffixes():
+    """Büyük/küçük harf, Türkçe karakter ve çekim ekleri aynı terime iner"""
+    assert tokenize("SINAV") == tokenize("sınav") == ["sinav"]
+    assert normalize_token("sınavlarım") == normalize_token("sınav")
+
+
+def test_tokenize_drops_stopwords():
+    assert tokenize("ve bu bir") == []
+
+
+def make_index(tmp_path, docs):
+    index = KeywordIndex(str(tmp_path / "keywords.sqlite3"))
+    ids = [doc_id for doc_id, _ in docs]
+    texts = [text for _, text in docs]
+    index.ensure_user("u1", lambda: (ids, texts, texts, [{} for _ in docs]))
+    return index
+
+
+def test_bm25_ranks_term_frequency_higher(tmp_path):
+    index = make_index(tmp_path, [
+        ("a", "İş yerinde toplantı vardı."),
+        ("b", "Sınav sınav sınav, yine sınav kaygısı."),
+        ("c", "Yarın sınav var."),
+    ])
+    results = index.search("u1", tokenize("sınav"))
+    assert [hit["id"] for hit in results] == ["b", "c"]
+    assert results[0]["bm25_score"] > results[1]["bm25_score"]
+
+
+def test_search_is_scoped_to_user_and_tracks_removal(tmp_path):
+    index = make_index(tmp_path, [("a", "sınav"), ("b", "sınav stresi")])
+    assert index.search("u2", tokenize("sınav")) is None
+
+    index.remove("u1", "a")
+    assert [hit["id"] for hit in index.search("u1", tokenize("sınav"))] == ["b"]
+
+
+def test_reciprocal_rank_fusion_prefers_agreement():
+    fused = [doc_id for doc_id, _ in reciprocal_rank_fusion([["x", "y", "z"], ["y", "x"]])]
+    assert set(fused[:2]) == {"x", "y"}
+    assert fused[-1] == "z"
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Kalıp Deposu Testi - Artımlı sayaçların ekleme / silme ile tutarlı kalması
+"""
+
+import os
+import sys
+
+# Backend klasörünü Python path'ine ekle
+sys.path.insert(0, os.path.dirname(__file__))
+
+from services.pattern_store import UserPatternStore
+
+
+def metadata(analysis_id, distortion_types, mood, analyzed_at, user_id="u1"):
+    return {
+        "analysis_id": analysis_id,
+        "user_id": user_id,
+        "distortion_types": distortion_types,
+        "overall_mood": mood,
+        "risk_level": "düşük",
+        "analyzed_at": analyzed_at,
+    }
+
+
+def make_store(tmp_path, *initial):
+    store = UserPatternStore(str(tmp_path / "patterns.sqlite3"))
+    store.ensure_user("u1", lambda: list(initial))
+    return store
+
+
+def test_unbuilt_user_returns_none(tmp_path):
+    store = UserPatternStore(str(tmp_path / "patterns.sqlite3"))
+    store.add_many([metadata("1", "etiketleme", "üzgün", "2025-01-01")])
+    assert store.get_patterns("u1") is None
+
+
+def test_increment_counts(tmp_path):
+    store = make_store(tmp_path, metadata("1", "felaketleştirme", "kaygılı", "2025-01-01"))
+    store.add_many([metadata("2", "felaketleştirme,etiketleme", "üzgün", "2025-02-01")])
+
+    patterns = store.get_patterns("u1")
+    assert patterns["total_analyses"] == 2
+    assert patterns["most_common_distortions"][0] == ("felaketleştirme", 2)
+    assert patterns["mood_distribution"] == {"kaygılı": 1, "üzgün": 1}
+    assert patterns["analysis_period"] == {"first_analysis": "2025-01-01", "last_analysis": "2025-02-01"}
+
+
+def test_add_then_remove_round_trip(tmp_path):
+    store = make_store(tmp_path, metadata("1", "felaketleştirme", "kaygılı", "2025-01-01"))
+    before = store.get_patterns("u1")
+
+    store.add_many([metadata("2", "etiketleme", "üzgün", "2025-03-01")])
+    store.remove("u1", "2")
+
+    assert store.get_patterns("u1") == before
+
+
+def test_readding_same_analysis_is_idempotent(tmp_path):
+    store = make_store(tmp_path)
+    store.add_many([metadata("1", "etiketleme", "üzgün", "2025-01-01")])
+    store.add_many([metadata("1", "etiketleme", "üzgün", "2025-01-01")])
+    assert store.get_patterns("u1")["total_analyses"] == 1
+
+
+def test_remove_last_analysis(tmp_path):
+    store = make_store(tmp_path, metadata("1", "etiketleme", "üzgün", "2025-01-01"))
+    store.remove("u1", "1")
+    assert store.get_patterns("u1") == {"message": "Henüz yeterli veri yok"}
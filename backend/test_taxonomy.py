@@ -0,0 +1,34 @@
+#!/usr/bin/env python3
+"""
+Taksonomi Testi - Çarpıtma adlarının kanonik anahtara normalize edilmesi
+"""
+
+import os
+import sys
+
+# Backend klasörünü Python path'ine ekle
+sys.path.insert(0, os.path.dirname(__file__))
+
+from taxonomy import UNKNOWN_DISTORTION, distortion_flag, normalize_analysis, normalize_distortion
+
+
+def test_case_and_ascii_folding():
+    """Türkçe büyük harf ve ASCII yazımlar aynı kanonik anahtara iner"""
+    assert normalize_distortion("FELAKETLEŞTİRME") == "felaketleştirme"
+    assert normalize_distortion("felaketlestirme") == "felaketleştirme"
+    assert normalize_distortion("  Felaketleştirme ") == "felaketleştirme"
+
+
+def test_unknown_distortion():
+    assert normalize_distortion("") == UNKNOWN_DISTORTION
+    assert normalize_distortion(None) == UNKNOWN_DISTORTION
+
+
+def test_distortion_flag_is_ascii_slug():
+    """Metadata bayrağı yazım biçiminden bağımsız ve ASCII'dir"""
+    assert distortion_flag("FELAKETLEŞTİRME") == distortion_flag("felaketlestirme") == "dist_felaketlestirme"
+
+
+def test_normalize_analysis_rewrites_types():
+    analysis = normalize_analysis({"distortions": [{"type": "FELAKETLEŞTİRME"}]})
+    assert analysis["distortions"][0]["type"] == "felaketleştirme"
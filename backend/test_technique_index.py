@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Teknik İndeksi Testi - relevance_score'un Chroma'nın `1 - distance` ölçeğiyle aynı olması
+"""
+
+import os
+import sys
+
+import pytest
+
+# Backend klasörünü Python path'ine ekle
+sys.path.insert(0, os.path.dirname(__file__))
+
+np = pytest.importorskip("numpy")
+
+from services.technique_index import TechniqueIndex
+
+EMBEDDINGS = [[3.0, 0.0], [0.0, 2.0], [1.0, 1.0]]
+METADATAS = [{"distortion_type": "etiketleme"}, {"distortion_type": "felaketleştirme"}, {"distortion_type": "etiketleme"}]
+
+
+def build(space):
+    return TechniqueIndex(["a", "b", "c"], EMBEDDINGS, ["A", "B", "C"], METADATAS, space=space)
+
+
+def test_l2_score_is_one_minus_squared_distance():
+    query = np.array([1.0, 0.0])
+    hits = build("l2").search(query, n_results=3)
+    expected = {doc_id: 1 - float(((np.array(vector) - query) ** 2).sum()) for doc_id, vector in zip("abc", EMBEDDINGS)}
+    assert [hit["id"] for hit in hits] == sorted(expected, key=expected.get, reverse=True)
+    for hit in hits:
+        assert hit["relevance_score"] == pytest.approx(expected[hit["id"]])
+
+
+def test_cosine_score_is_cosine_similarity():
+    hits = build("cosine").search([1.0, 0.0], n_results=1)
+    assert hits[0]["id"] == "a"
+    assert hits[0]["relevance_score"] == pytest.approx(1.0)
+
+
+def test_filter_masks():
+    hits = build("l2").search([0.0, 1.0], n_results=3, distortion_types=["etiketleme"])
+    assert {hit["id"] for hit in hits} == {"a", "c"}
+
+
+def test_scores_match_chroma_query(tmp_path):
+    """Koleksiyonun space'i metadata'da olmasa da skorlar Chroma sorgusuyla aynıdır"""
+    chromadb = pytest.importorskip("chromadb")
+    from chromadb.config import Settings
+
+    from services.chroma_service import ChromaService
+    from services.embedding_backends import EMBEDDING_MODEL_NAME, OnnxEmbeddingFunction, register_with_chroma
+
+    service = ChromaService.__new__(ChromaService)
+    service.client = chromadb.PersistentClient(path=str(tmp_path), settings=Settings(anonymized_telemetry=False))
+    service.embedding_function = OnnxEmbeddingFunction.__new__(OnnxEmbeddingFunction)
+    service.embedding_function.model_name = EMBEDDING_MODEL_NAME
+    register_with_chroma(service.embedding_function)
+    service.technique_index_enabled = True
+    service.techniques_collection = service._open_collection("therapy_techniques", "therapy_techniques")
+    service.techniques_collection.add(ids=["a", "b", "c"], embeddings=EMBEDDINGS, documents=["A", "B", "C"], metadatas=METADATAS)
+    service._rebuild_technique_index()
+
+    query = [1.0, 0.5]
+    response = service.techniques_collection.query(query_embeddings=[query], n_results=3)
+    expected = {doc_id: 1 - distance for doc_id, distance in zip(response["ids"][0], response["distances"][0])}
+    hits = service.technique_index.search(query, n_results=3)
+    assert [hit["id"] for hit in hits] == response["ids"][0]
+    for hit in hits:
+        assert hit["relevance_score"] == pytest.approx(expected[hit["id"]], abs=1e-5)